@@ -0,0 +1,133 @@
+"""
+Benchmark: columnar ASC parser vs. the original per-cell loader
+
+Writes a synthetic test-bench ASC export (decimal comma, tab separated, a few
+header lines in front of the data) and reports the throughput of both parsers
+in MB/s. Run from the repository root:
+
+    python Tests/benchmark_asc_parser.py --rows 500000 --columns 60
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+import chardet
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.asc_parser import parse_asc_file, format_timings
+
+
+def legacy_load_asc(file_name):
+    """The loader as it was before the columnar parser (kept for comparison)"""
+    with open(file_name, 'rb') as file:
+        raw_data = file.read()
+    file_encoding = chardet.detect(raw_data)['encoding']
+    try:
+        with open(file_name, 'r', encoding=file_encoding) as file:
+            content = file.read()
+    except UnicodeDecodeError:
+        with open(file_name, 'r', encoding='latin-1') as file:
+            content = file.read()
+
+    lines = content.split('\n')
+    data_start = 0
+    for i, line in enumerate(lines):
+        if '\t' in line and re.match(r'^[\d,.]+\t', line.strip()):
+            data_start = i
+            break
+
+    header = lines[data_start - 1].split('\t')
+    data = [line.split('\t') for line in lines[data_start:] if line.strip()]
+    data = [row for row in data if len(row) == len(header)]
+
+    new_header = []
+    seen = {}
+    for item in header:
+        item = item.strip()
+        if item in seen:
+            seen[item] += 1
+            new_header.append(f"{item}_{seen[item]}")
+        else:
+            seen[item] = 0
+            new_header.append(item)
+
+    df = pd.DataFrame(data, columns=new_header)
+    for col in df.columns:
+        df[col] = df[col].apply(lambda x: x.replace(',', '.') if isinstance(x, str) else x)
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def write_synthetic_asc(file_name, rows, columns, seed=0):
+    """Write a synthetic ASC file with decimal-comma values"""
+    rng = np.random.default_rng(seed)
+    names = ['Time'] + [f"Channel {i}" for i in range(1, columns)]
+    data = rng.normal(100.0, 25.0, size=(rows, columns))
+    data[:, 0] = np.arange(rows) * 0.001
+
+    with open(file_name, 'w', encoding='latin-1', newline='\n') as file:
+        file.write("Test bench export\n")
+        file.write("Date:\t2024-01-01\n")
+        file.write("\n")
+        file.write('\t'.join(names) + '\n')
+        block = 50000
+        for start in range(0, rows, block):
+            text = pd.DataFrame(data[start:start + block]).to_csv(
+                sep='\t', header=False, index=False, float_format='%.6f')
+            file.write(text.replace('.', ','))
+
+
+def measure(label, func, file_name, size_mb):
+    started = time.perf_counter()
+    result = func(file_name)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed:8.2f} s   {size_mb / elapsed:8.1f} MB/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--columns', type=int, default=60)
+    parser.add_argument('--workers', type=int, nargs='*', default=[2, 4, 8, 16],
+                        help="Worker counts for the parallel mode")
+    parser.add_argument('--skip-legacy', action='store_true', help="Only run the columnar parser")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_name = os.path.join(tmp_dir, 'benchmark.asc')
+        write_synthetic_asc(file_name, args.rows, args.columns)
+        size_mb = os.path.getsize(file_name) / 1e6
+        print(f"File: {args.rows} rows x {args.columns} columns, {size_mb:.1f} MB\n")
+
+        df_fast, timings = measure("columnar (float64)",
+                                   lambda name: parse_asc_file(name, workers=1), file_name, size_mb)
+        print(f"    phases: {format_timings(timings)}")
+        df_f32, timings = measure("columnar (float32)",
+                                  lambda name: parse_asc_file(name, dtype=np.float32, workers=1),
+                                  file_name, size_mb)
+        print(f"    phases: {format_timings(timings)}")
+
+        for workers in args.workers:
+            df_parallel, timings = measure(f"parallel ({workers} workers)",
+                                           lambda name: parse_asc_file(name, workers=workers), file_name, size_mb)
+            print(f"    phases: {format_timings(timings)}")
+            if not df_parallel.equals(df_fast):
+                print("    WARNING: parallel result differs from the single-process parse")
+
+        if not args.skip_legacy:
+            df_legacy = measure("legacy (per-cell)", legacy_load_asc, file_name, size_mb)
+            identical = (list(df_legacy.columns) == list(df_fast.columns)
+                         and np.allclose(df_legacy.values, df_fast.values, equal_nan=True))
+            print(f"\nResults identical: {identical}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: one-step bootstrap in the process pool vs. refitting every replicate
+
+Fits a noisy signal, then computes the confidence band of the fit at a few X
+values twice: with utils.bootstrap (shared memory inputs, replicate batches
+on --workers processes) and by refitting resampled residuals --refits times
+on the GUI side, which is what a straightforward bootstrap does. The refit
+time is scaled to --replicates. Run from the repository root:
+
+    python Tests/benchmark_bootstrap.py --samples 1000000 --replicates 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.batch_fit import fit_column, fit_function
+from utils.bootstrap import (REPLICATES_PER_TASK, BootstrapBands, SharedInputs, band_spec, bootstrap_batch,
+                             prepare_bootstrap)
+from utils.process_pool import default_worker_count, get_process_pool, shutdown_process_pool
+
+
+def pool_bands(result, x, y, replicates, method, workers):
+    spec = band_spec(result)
+    inputs = SharedInputs(spec, x, y)
+    try:
+        pool = get_process_pool(workers)
+        r, quantiles = pool.submit(prepare_bootstrap, spec, inputs.name, inputs.n).result()
+        seeds = np.random.SeedSequence(0).spawn(-(-replicates // REPLICATES_PER_TASK))
+        futures = [pool.submit(bootstrap_batch, spec, inputs.name, inputs.n, REPLICATES_PER_TASK, seed, method)
+                   for seed in seeds]
+        return BootstrapBands(spec, r, [future.result() for future in futures], quantiles, method=method)
+    finally:
+        inputs.close()
+
+
+def refit_band(result, x, y, refits, rng, x_eval):
+    fitted = fit_function(result)(x)
+    residuals = y - fitted
+    curves = []
+    for _ in range(refits):
+        y_star = fitted + residuals[rng.integers(0, len(x), len(x))]
+        curves.append(fit_function(fit_column('y', x, y_star, result['fit_type'], len(result['coeffs']) - 1))(x_eval))
+    return np.quantile(curves, [0.025, 0.975], axis=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, default=1_000_000)
+    parser.add_argument('--replicates', type=int, default=200)
+    parser.add_argument('--refits', type=int, default=20, help="replicates actually refitted (time is scaled)")
+    parser.add_argument('--workers', type=int, default=default_worker_count())
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 10, args.samples)
+    x_eval = np.linspace(0, 10, 5)
+    cases = {
+        ('Polynomial', 3): 1 + 0.5 * x - 0.1 * x ** 2 + 0.01 * x ** 3,
+        ('Exponential + Offset', 1): 2 * np.exp(-0.3 * x) + 1,
+    }
+
+    print(f"{args.samples:,} samples, {args.replicates} replicates, {args.workers} workers\n")
+    print(f"{'fit':<24} {'method':<10} {'pool s':>8} {'refit s':>9} {'band width (pool / refit)':>28}")
+    get_process_pool(args.workers).submit(int).result()
+    for (fit_type, degree), truth in cases.items():
+        y = truth + 0.2 * rng.standard_normal(len(x))
+        result = fit_column('y', x, y, fit_type, degree)
+
+        start = time.perf_counter()
+        lower, upper = refit_band(result, x, y, args.refits, rng, x_eval)
+        refit_seconds = (time.perf_counter() - start) * args.replicates / args.refits
+        refit_width = np.median(upper - lower)
+
+        for method in ('Residuals', 'Cases'):
+            start = time.perf_counter()
+            bands = pool_bands(result, x, y, args.replicates, method, args.workers)
+            seconds = time.perf_counter() - start
+            conf_lower, conf_upper, _, _ = bands.evaluate(x_eval)
+            print(f"{fit_type:<24} {method:<10} {seconds:>8.2f} {refit_seconds:>9.2f} "
+                  f"{np.median(conf_upper - conf_lower):>13.2e} / {refit_width:.2e}")
+    shutdown_process_pool()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: min/max (M4) level-of-detail decimation of plot curves
+
+Builds the M4 pyramid of a synthetic signal (noise, a slow sine and a few
+single-sample spikes) and reports the frame time of a pan/zoom sequence:
+decimating the visible span plus drawing it into an offscreen pyqtgraph plot.
+For comparison the same frames are drawn with all samples, up to --max-full
+points. Run from the repository root:
+
+    python Tests/benchmark_decimation.py --points 1000000 10000000 50000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication
+import pyqtgraph as pg
+
+from utils.decimation import M4Pyramid
+
+
+def make_signal(n_points, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n_points, dtype=np.float64) * 1e-3
+    y = np.sin(x / max(x[-1], 1.0) * 20 * np.pi) + 0.1 * rng.standard_normal(n_points)
+    y[rng.integers(0, n_points, 10)] = 25.0  # spikes the decimation must keep
+    return x, y
+
+
+def view_sequence(x, n_frames):
+    """Full view, then zooming in towards the middle, then panning"""
+    x0, x1 = float(x[0]), float(x[-1])
+    views = []
+    for i in range(n_frames // 2):
+        half = (x1 - x0) / 2 / (1.5 ** i)
+        mid = (x0 + x1) / 2
+        views.append((mid - half, mid + half))
+    width = views[-1][1] - views[-1][0]
+    for i in range(n_frames - len(views)):
+        start = x0 + (x1 - x0 - width) * i / max(n_frames - len(views) - 1, 1)
+        views.append((start, start + width))
+    return views
+
+
+def time_frames(plot_widget, curve, views, data_for_view):
+    """Mean and max milliseconds per frame (data update + render)"""
+    times = []
+    for x_min, x_max in views:
+        start = time.perf_counter()
+        curve.setData(*data_for_view(x_min, x_max))
+        plot_widget.setXRange(x_min, x_max, padding=0)
+        plot_widget.grab()
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.mean(times)), float(np.max(times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--points', type=int, nargs='+', default=[1_000_000, 10_000_000, 50_000_000])
+    parser.add_argument('--width', type=int, default=1600, help="plot width in pixels")
+    parser.add_argument('--frames', type=int, default=20)
+    parser.add_argument('--max-full', type=int, default=10_000_000,
+                        help="largest size also drawn without decimation")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    plot_widget = pg.PlotWidget()
+    plot_widget.resize(args.width, 600)
+    plot_widget.show()
+    app.processEvents()
+    curve = plot_widget.plot(pen=pg.mkPen('b', width=1))
+    n_pixels = int(plot_widget.getViewBox().width()) or args.width
+
+    print(f"{'points':>12} {'build s':>9} {'index MB':>9} {'drawn':>8} "
+          f"{'M4 ms/frame':>12} {'M4 max':>8} {'full ms/frame':>14}")
+    for n_points in args.points:
+        x, y = make_signal(n_points)
+
+        start = time.perf_counter()
+        pyramid = M4Pyramid(x, y)
+        build_s = time.perf_counter() - start
+
+        views = view_sequence(x, args.frames)
+        drawn = len(pyramid.decimate(views[0][0], views[0][1], n_pixels)[0])
+        assert np.max(pyramid.decimate(views[0][0], views[0][1], n_pixels)[1]) == np.max(y)
+
+        m4_mean, m4_max = time_frames(
+            plot_widget, curve, views, lambda a, b: pyramid.decimate(a, b, n_pixels))
+
+        full = '-'
+        if n_points <= args.max_full:
+            full_mean, _ = time_frames(plot_widget, curve, views[:3], lambda a, b: (x, y))
+            full = f"{full_mean:.1f}"
+
+        print(f"{n_points:>12,} {build_s:>9.2f} {pyramid.nbytes / 1e6:>9.1f} {drawn:>8,} "
+              f"{m4_mean:>12.1f} {m4_max:>8.1f} {full:>14}")
+        curve.setData([], [])
+        del x, y, pyramid
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: anchor-grid LOWESS vs. statsmodels
+
+Smooths a noisy test signal (slow sine, noise and a few outliers) with
+utils.lowess.fast_lowess and, up to --max-exact samples, with statsmodels'
+exact lowess (same frac, 3 robustifying iterations), and reports run time
+and the largest deviation. Run from the repository root:
+
+    python Tests/benchmark_lowess.py --samples 10000 50000 1000000 --frac 0.05
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.lowess import fast_lowess, DEFAULT_RELATIVE_ERROR
+
+try:
+    from statsmodels.nonparametric.smoothers_lowess import lowess as statsmodels_lowess
+except ImportError:
+    statsmodels_lowess = None
+
+
+def make_signal(n_samples, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_samples, dtype=np.float64)
+    y = np.sin(t / n_samples * 6 * np.pi) + 0.3 * rng.standard_normal(n_samples)
+    y[rng.integers(0, n_samples, max(1, n_samples // 10000))] += 8.0  # outliers
+    return y
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--samples', type=int, nargs='+', default=[10000, 50000, 200000, 1000000, 5000000])
+    parser.add_argument('--frac', type=float, default=0.05)
+    parser.add_argument('--max-error', type=float, default=None,
+                        help=f"error bound (default {DEFAULT_RELATIVE_ERROR:g} x std of the signal)")
+    parser.add_argument('--max-exact', type=int, default=50000,
+                        help="largest size also smoothed with statsmodels")
+    args = parser.parse_args()
+
+    if statsmodels_lowess is None:
+        print("statsmodels not installed, only the fast engine is timed\n")
+
+    print(f"frac = {args.frac}\n")
+    print(f"{'samples':>10} {'fast s':>9} {'statsmodels s':>14} {'speed-up':>9} {'max |diff|':>11} {'bound':>9}")
+    for n_samples in args.samples:
+        y = make_signal(n_samples)
+        bound = args.max_error if args.max_error is not None else DEFAULT_RELATIVE_ERROR * np.std(y)
+        fast, fast_s = timed(lambda: fast_lowess(y, frac=args.frac, max_error=args.max_error))
+
+        exact_s = diff = speed_up = '-'
+        if statsmodels_lowess is not None and n_samples <= args.max_exact:
+            x = np.arange(n_samples, dtype=np.float64)
+            exact, seconds = timed(lambda: statsmodels_lowess(y, x, frac=args.frac, return_sorted=False))
+            exact_s = f"{seconds:.2f}"
+            speed_up = f"{seconds / fast_s:.0f}x"
+            diff = f"{np.max(np.abs(fast - exact)):.2e}"
+
+        print(f"{n_samples:>10,} {fast_s:>9.2f} {exact_s:>14} {speed_up:>9} {diff:>11} {bound:>9.1e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: nonlinear model library vs. curve_fit with a fixed start
+
+For every model of utils.nonlinear_fit, fits --trials noisy signals with
+random parameters and X ranges (some on epoch-second time stamps) once with
+fit_nonlinear and once the way the fitting panel used to: curve_fit from a
+fixed starting point (p0 = [1, 0.1] for the exponential, ones otherwise)
+with finite-difference Jacobians. A fit fails if it raises or its curve
+misses the true one by more than --tolerance of the signal range. Run from
+the repository root:
+
+    python Tests/benchmark_nonlinear_fit.py --samples 20000 --trials 20
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+from scipy.optimize import curve_fit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.nonlinear_fit import NONLINEAR_MODELS, evaluate_model, fit_nonlinear
+
+
+def random_case(name, rng, n_samples):
+    """X samples, true parameters (in X - offset) and the offset of X"""
+    offset = 1.7e9 if rng.random() < 0.3 and NONLINEAR_MODELS[name].shift_x else 0.0
+    span = 10.0 ** rng.uniform(0, 4)
+    if name == 'Exponential':
+        params = [rng.uniform(0.5, 5) * rng.choice([-1, 1]), rng.uniform(-3, 3) / span]
+    elif name == 'Exponential + Offset':
+        params = [rng.uniform(0.5, 5) * rng.choice([-1, 1]), rng.uniform(-4, -0.5) / span, rng.uniform(-10, 10)]
+    elif name == 'Power Law':
+        params = [rng.uniform(0.5, 5), rng.uniform(-1.5, 2.5)]
+    elif name == 'Logarithmic':
+        params = [rng.uniform(-5, 5), rng.uniform(-3, 3)]
+    elif name == 'Logistic':
+        params = [rng.uniform(1, 10) * rng.choice([-1, 1]), rng.uniform(8, 40) / span,
+                  rng.uniform(0.3, 0.7) * span, rng.uniform(-5, 5)]
+    else:
+        params = [rng.uniform(-5, 5), rng.uniform(1, 10) * rng.choice([-1, 1]),
+                  rng.uniform(0.05, 0.3) * span, rng.uniform(0.05, 0.2) * span]
+    start = span / 100.0 if not NONLINEAR_MODELS[name].shift_x else 0.0
+    x = offset + np.linspace(start, span, n_samples)
+    return x, np.asarray(params), offset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, default=20000)
+    parser.add_argument('--trials', type=int, default=20)
+    parser.add_argument('--noise', type=float, default=0.02, help="noise std as a fraction of the signal range")
+    parser.add_argument('--tolerance', type=float, default=0.05)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{args.samples:,} samples, {args.trials} trials per model\n")
+    print(f"{'model':<28} {'library s':>10} {'failed':>7} {'curve_fit s':>12} {'failed':>7}")
+    for name, model in NONLINEAR_MODELS.items():
+        times = {'library': 0.0, 'curve_fit': 0.0}
+        failures = {'library': 0, 'curve_fit': 0}
+        for _ in range(args.trials):
+            x, params, offset = random_case(name, rng, args.samples)
+            truth = model.evaluate(x - offset, params)
+            y = truth + args.noise * np.ptp(truth) * rng.standard_normal(len(x))
+            bound = args.tolerance * np.ptp(truth)
+
+            start = time.perf_counter()
+            try:
+                p, shift, _, _, _ = fit_nonlinear(x, y, name)
+                failed = not np.max(np.abs(evaluate_model(name, p, shift, x) - truth)) <= bound
+            except (ValueError, np.linalg.LinAlgError):
+                failed = True
+            times['library'] += time.perf_counter() - start
+            failures['library'] += failed
+
+            p0 = [1, 0.1] if name == 'Exponential' else np.ones(len(model.parameters))
+            start = time.perf_counter()
+            try:
+                with warnings.catch_warnings(), np.errstate(all='ignore'):
+                    warnings.simplefilter('ignore')
+                    popt, _ = curve_fit(lambda x, *p: model.evaluate(x, p), x, y, p0=p0)
+                    failed = not np.max(np.abs(model.evaluate(x, popt) - truth)) <= bound
+            except (RuntimeError, ValueError, np.linalg.LinAlgError):
+                failed = True
+            times['curve_fit'] += time.perf_counter() - start
+            failures['curve_fit'] += failed
+
+        print(f"{name:<28} {times['library']:>10.2f} {failures['library']:>7} "
+              f"{times['curve_fit']:>12.2f} {failures['curve_fit']:>7}")
+
+
+if __name__ == '__main__':
+    main()
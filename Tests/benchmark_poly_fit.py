@@ -0,0 +1,73 @@
+"""
+Benchmark: chunked polynomial fit vs. np.polyfit
+
+Fits a polynomial to a noisy signal on a time-stamp-like X axis (large
+offset) with utils.poly_fit.fit_polynomial and with np.polyfit, and reports
+run time, peak extra memory, R² and the largest difference of the fitted
+curves. Run from the repository root:
+
+    python Tests/benchmark_poly_fit.py --samples 10000 1000000 10000000 --degree 9
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.poly_fit import fit_polynomial
+
+
+def make_signal(n_samples, seed=0):
+    rng = np.random.default_rng(seed)
+    x = 1.7e9 + np.linspace(0.0, 3600.0, n_samples)  # one hour of epoch seconds
+    y = np.sin((x - x[0]) / 600.0) + 0.2 * rng.standard_normal(n_samples)
+    return x, y
+
+
+def measure(func):
+    """Result, seconds and peak traced memory in MB"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def r_squared(y, y_pred):
+    return 1.0 - np.sum((y - y_pred) ** 2) / np.sum((y - np.mean(y)) ** 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, nargs='+', default=[10000, 1000000, 10000000])
+    parser.add_argument('--degree', type=int, default=9)
+    args = parser.parse_args()
+
+    print(f"degree {args.degree}\n")
+    print(f"{'samples':>10} {'engine':<10} {'seconds':>8} {'peak MB':>9} {'R²':>10}  note")
+    for n_samples in args.samples:
+        x, y = make_signal(n_samples)
+
+        (_, fit_func, r2, _, _), seconds, peak = measure(lambda: fit_polynomial(x, y, args.degree))
+        print(f"{n_samples:>10,} {'chunked':<10} {seconds:>8.2f} {peak:>9.1f} {r2:>10.6f}")
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            coeffs, seconds, peak = measure(lambda: np.polyfit(x, y, args.degree))
+        reference = np.polyval(coeffs, x)
+        note = f"max |diff| {np.max(np.abs(fit_func(x) - reference)):.1e}"
+        if caught:
+            note += ", polyfit: poorly conditioned"
+        print(f"{'':>10} {'polyfit':<10} {seconds:>8.2f} {peak:>9.1f} {r_squared(y, reference):>10.6f}  {note}")
+
+
+if __name__ == '__main__':
+    main()
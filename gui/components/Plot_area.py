@@ -8,7 +8,7 @@ import traceback
 import numpy as np
 
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QMessageBox,
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QMessageBox,
     QLabel, QLineEdit, QPushButton, QToolBar, QAction, QGroupBox,
     QShortcut, QInputDialog, QMenu
 )
@@ -18,7 +18,17 @@ from PyQt5.QtGui import QFont, QPixmap, QKeySequence
 import pyqtgraph as pg
 from pyqtgraph.Qt import QtCore
 
-from utils.asc_utils import apply_smoothing
+from utils.asc_utils import apply_smoothing_params, apply_smoothing_params_batch
+from utils.sort_index import SortIndex
+from utils.decimation import M4Pyramid
+from utils.process_pool import default_worker_count
+from utils.smoothing_cache import SmoothingCache
+
+# Pixel width assumed for decimation before the plot has been laid out
+DEFAULT_PLOT_WIDTH_PIXELS = 1920
+
+# Evaluations of a fitted curve per pixel of the visible X range
+FIT_SAMPLES_PER_PIXEL = 2
 
 
 class EditableTextItem(pg.TextItem):
@@ -104,6 +114,11 @@ class PlotArea(QWidget):
 
         # Data storage
         self.current_df = None
+        self.plotted_source = None  # (data, x column) the plot items were built from
+        self.curve_revision = 0  # Bumped whenever a plot item gets new curve data
+        self.smoothing_cache = SmoothingCache()
+        self._x_sort_indexes = {}
+        self._raw_lods = {}  # (data version, X column, column) -> M4Pyramid of the raw curve
         self.x_column = None
         self.available_columns = []
 
@@ -323,8 +338,26 @@ class PlotArea(QWidget):
         # Connect mouse events
         # Connect mouse events
         self.main_plot.scene().sigMouseMoved.connect(self._on_mouse_moved)
+
+        # Mouse moves arrive far more often than the screen refreshes
+        self.pending_cursor_pos = None
+        self.cursor_timer = QTimer(self)
+        self.cursor_timer.setSingleShot(True)
+        self.cursor_timer.setInterval(self._frame_interval_ms())
+        self.cursor_timer.timeout.connect(self._update_cursor)
         self.main_plot.scene().sigMouseClicked.connect(self._on_mouse_click)
 
+        # Curves are redrawn at screen resolution whenever the X range or the
+        # width changes; a zero-delay timer merges bursts of changes into one redraw
+        self.lod_timer = QTimer(self)
+        self.lod_timer.setSingleShot(True)
+        self.lod_timer.setInterval(0)
+        self.lod_timer.timeout.connect(self._update_level_of_detail)
+        self.main_plot.vb.sigXRangeChanged.connect(self._schedule_level_of_detail)
+        self.main_plot.vb.sigResized.connect(self._schedule_level_of_detail)
+
+        # Secondary ViewBoxes follow the main plot's geometry
+        self.main_plot.vb.sigResized.connect(self.update_views)
 
         # # Create crosshair (initially hidden)
         # self.crosshair_vline = pg.InfiniteLine(angle=90, movable=False, pen=pg.mkPen('k', style=QtCore.Qt.DashLine))
@@ -464,6 +497,19 @@ class PlotArea(QWidget):
         if not self.show_cursor:
             return
 
+        # Only the latest position matters; the readout is refreshed at most
+        # once per display frame
+        self.pending_cursor_pos = pos
+        if not self.cursor_timer.isActive():
+            self.cursor_timer.start()
+
+    def _update_cursor(self):
+        """Move the crosshair and readout to the last mouse position"""
+        pos = self.pending_cursor_pos
+        self.pending_cursor_pos = None
+        if pos is None or not self.show_cursor:
+            return
+
         # Convert position to data coordinates
         mouse_point = self.main_plot.vb.mapSceneToView(pos)
         x, y = mouse_point.x(), mouse_point.y()
@@ -478,15 +524,8 @@ class PlotArea(QWidget):
         xlabel = self.x_column if self.x_column else 'X'
         cursor_text = f"{xlabel}: {x:.2f}\n"
 
-        for item in self.plot_items:
-            if 'plot_line' in item:
-                x_data = item['x_data']
-                y_data = item['y_data']
-
-                if len(x_data) > 0:
-                    idx = self._find_nearest_index(x_data, x)
-                    nearest_y = y_data[idx]
-                    cursor_text += f"{item['name']}: {nearest_y:.2f}\n"
+        for name, _, nearest_y in self.cursor_values(x):
+            cursor_text += f"{name}: {nearest_y:.2f}\n"
 
         self.cursor_annotation.setPos(x, y)
         self.cursor_annotation.setText(cursor_text.strip())
@@ -641,6 +680,11 @@ class PlotArea(QWidget):
 
             logging.info(f"Plotting data: x={x_column}, y={y_columns}, title={title}")
 
+            # Datasets are immutable: the same object with the same X column
+            # means the plotted columns still hold the right data
+            reload_data = self.plotted_source is None or self.plotted_source[0] is not df \
+                or self.plotted_source[1] != x_column
+
             # Store dataframe and column info
             self.current_df = df
             self.x_column = x_column
@@ -687,8 +731,9 @@ class PlotArea(QWidget):
             # Update X-axis range inputs
             self.x_min_input.setText(f"{self.x_min_default:.2f}")
             self.x_max_input.setText(f"{self.x_max_default:.2f}")
-            # Clear previous plot
-            self._clear_all_plot_items()
+            if reload_data:
+                self._x_sort_indexes = {}
+                self._raw_lods = {}
 
             # Set labels and title
             self.main_plot.setTitle(title)
@@ -707,9 +752,9 @@ class PlotArea(QWidget):
                 'title': title
             }
 
-            # Plot all selected Y columns
-            for y_column in y_columns:
-                self._add_column_with_smoothing(y_column, smoothing_params)
+            # Plot all selected Y columns, reusing the curves already shown
+            self._sync_plot_items(y_columns, smoothing_params, reload_data)
+            self.plotted_source = (df, x_column)
 
             # Update legend
             if self.show_legend:
@@ -722,20 +767,44 @@ class PlotArea(QWidget):
             logging.error(traceback.format_exc())
             QMessageBox.critical(self, "Error", f"An error occurred while plotting: {str(e)}")
 
-    def _add_column_with_smoothing(self, column_name, smoothing_params):
-        """Add a column to the plot with smoothing applied"""
-        if self.current_df is None:
-            logging.error("No data available to plot")
-            return
+    def _get_column_xy(self, column_name):
+        """X and Y data of a column; multi-rate TDMS channels keep their own samples"""
+        if hasattr(self.current_df, 'channel_xy') and self.current_df.is_multi_rate():
+            return self.current_df.channel_xy(self.x_column, column_name)
+        return self.x_data, self.current_df[column_name].values
 
-        # Check if column is already plotted
-        if column_name in [item['name'] for item in self.plot_items]:
-            logging.warning(f"Column '{column_name}' already plotted, skipping")
-            return
+    def _smoothing_key(self, smoothing_params):
+        """Smoothing settings that shape the curves (None = no smoothing)"""
+        if smoothing_params and smoothing_params.get('apply', False):
+            return dict(smoothing_params)
+        return None
 
+    def _column_items(self):
+        """Plot items of the Y columns, in axis order (curve fits excluded)"""
+        return [item for item in self.plot_items if not item.get('is_curve_fit', False)]
+
+    def _column_curve_data(self, column_name, smoothing_params, x_data=None, y_data_original=None,
+                           y_data_smoothed=None):
+        """
+        X, smoothed Y and original Y of a column.
+
+        Parameters:
+        -----------
+        x_data, y_data_original : numpy.ndarray, optional
+            Column data already at hand; read from the current data if omitted
+        y_data_smoothed : numpy.ndarray, optional
+            Y already smoothed with smoothing_params (see _smooth_columns)
+
+        Returns:
+        --------
+        tuple : (x_data, y_data, y_data_original, smoothing_applied), or None
+        if the column has no valid data (the user is warned)
+        """
         # Get Y data from DataFrame
-        y_data_original = self.current_df[column_name].values
-        y_data = y_data_original.copy()
+        if y_data_original is None:
+            x_data, y_data_original = self._get_column_xy(column_name)
+        # Curves are never modified in place, smoothing returns new arrays
+        y_data = y_data_original
 
         # Validate Y data
         if len(y_data) == 0:
@@ -744,7 +813,7 @@ class PlotArea(QWidget):
                 self, "Warning",
                 f"Column '{column_name}' contains no data and will be skipped."
             )
-            return
+            return None
 
         # Check if all values are NaN
         if np.all(np.isnan(y_data)):
@@ -753,39 +822,90 @@ class PlotArea(QWidget):
                 self, "Warning",
                 f"Column '{column_name}' contains only invalid (NaN) values and will be skipped."
             )
-            return
+            return None
 
         # Track if smoothing was applied
         smoothing_applied = False
 
         # Apply smoothing if enabled
         if smoothing_params and smoothing_params.get('apply', False):
+            cache_key = self._smoothing_cache_key(column_name, smoothing_params, len(y_data))
+            cached = self.smoothing_cache.get(cache_key) if y_data_smoothed is None else None
             try:
-                y_data = apply_smoothing(
-                    y_data,
-                    method=smoothing_params.get('method', 'savgol'),
-                    window_length=smoothing_params.get('window_length', 21),
-                    poly_order=smoothing_params.get('poly_order', 3),
-                    sigma=smoothing_params.get('sigma', 2)
-                )
+                if y_data_smoothed is not None:
+                    y_data = y_data_smoothed
+                elif cached is not None:
+                    y_data = cached
+                    logging.info(f"Reused cached {smoothing_params.get('method', 'unknown')} smoothing of {column_name}")
+                else:
+                    smoothed = apply_smoothing_params(y_data, smoothing_params, x=x_data)
+                    y_data = self.smoothing_cache.put(cache_key, smoothed)
+                    logging.info(f"Applied {smoothing_params.get('method', 'unknown')} smoothing to {column_name}")
                 smoothing_applied = True
-                logging.info(f"Applied {smoothing_params.get('method', 'unknown')} smoothing to {column_name}")
             except Exception as e:
                 logging.warning(f"Failed to apply smoothing to {column_name}: {str(e)}")
                 # Continue with original data if smoothing fails
 
-        # Get color for this column
-        color_index = len(self.plot_items) % len(self.colors)
-        color = self.colors[color_index]
+        return x_data, y_data, y_data_original, smoothing_applied
 
-        # Create a new ViewBox for this Y-axis
-        if len(self.plot_items) == 0:
+    def _smooth_columns(self, columns, smoothing_params):
+        """
+        Smooth the columns that share smoothing_params together.
+
+        Columns sharing their X data that are not in the smoothing cache are
+        stacked into one array and smoothed in a single batched call, split
+        over a few threads, instead of one apply_smoothing call per column.
+
+        Parameters:
+        -----------
+        columns : dict
+            Column name -> (x_data, y_data_original)
+
+        Returns:
+        --------
+        dict : column name -> (x_data, y_data_original, smoothed y)
+        """
+        groups = {}
+        for column_name, (x_data, y_data) in columns.items():
+            if len(y_data) == 0 or np.all(np.isnan(y_data)):
+                continue  # _column_curve_data warns about these
+            if self.smoothing_cache.get(self._smoothing_cache_key(column_name, smoothing_params, len(y_data))) is None:
+                groups.setdefault(id(x_data), []).append(column_name)
+
+        smoothed = {}
+        for names in groups.values():
+            if len(names) < 2:
+                continue
+            x_data = columns[names[0]][0]
+            n_samples = len(x_data)
+            stack = np.empty((n_samples, len(names)), order='F')
+            for i, column_name in enumerate(names):
+                stack[:, i] = columns[column_name][1]
+            try:
+                result = apply_smoothing_params_batch(stack, smoothing_params,
+                                                      workers=min(len(names), default_worker_count()), x=x_data)
+            except Exception as e:
+                logging.warning(f"Batched smoothing failed, smoothing columns one by one: {str(e)}")
+                continue
+            for i, column_name in enumerate(names):
+                y_data = columns[column_name][1]
+                key = self._smoothing_cache_key(column_name, smoothing_params, n_samples)
+                smoothed[column_name] = (x_data, y_data, self.smoothing_cache.put(key, result[:, i].copy()))
+            logging.info(f"Applied {smoothing_params.get('method', 'unknown')} smoothing to "
+                         f"{len(names)} columns in one batch")
+        return smoothed
+
+    def _smoothing_cache_key(self, column_name, smoothing_params, n_samples):
+        """Smoothing cache key of a column of the current data (None if it cannot be cached)"""
+        version = getattr(self.current_df, 'version', None)
+        return SmoothingCache.make_key(version, (self.x_column, column_name), smoothing_params, n_samples)
+
+    def _create_axis(self, index, column_name, color):
+        """ViewBox and Y-axis for the column at position index"""
+        if index == 0:
             # First plot uses the main plot's ViewBox
             view_box = self.main_plot.getViewBox()
             axis = self.main_plot.getAxis('left')
-            axis.setLabel(column_name, color=color)
-            axis.setPen(color)
-            axis.setTextPen(color)
         else:
             # Additional plots get their own ViewBox and Y-axis
             view_box = pg.ViewBox()
@@ -797,39 +917,116 @@ class PlotArea(QWidget):
             # Create new Y-axis
             axis = pg.AxisItem('right')
             axis.linkToView(view_box)
-            axis.setLabel(column_name, color=color)
-            axis.setPen(color)
-            axis.setTextPen(color)
 
             # Add axis to the plot layout
-            self.plot_layout.addItem(axis, row=0, col=len(self.plot_items) + 1)
+            self.plot_layout.addItem(axis, row=0, col=index + 1)
 
-            # Update the view when the main plot changes
-            self.main_plot.vb.sigResized.connect(self.update_views)
+            # Geometry follows the main plot through update_views
             view_box.setGeometry(self.main_plot.vb.sceneBoundingRect())
 
             # Store axis reference
             self.y_axes.append(axis)
 
-        # Create original data line plot (background) if smoothing was applied
-        plot_original = None
+        self._style_axis(axis, column_name, color)
+        return view_box, axis
+
+    @staticmethod
+    def _style_axis(axis, column_name, color):
+        axis.setLabel(column_name, color=color)
+        axis.setPen(color)
+        axis.setTextPen(color)
+
+    def _raw_lod(self, column_name, x_data, y_data_original):
+        """M4 pyramid of a column's raw curve, built once per data version and X column"""
+        version = getattr(self.current_df, 'version', None)
+        if version is None:
+            return M4Pyramid(x_data, y_data_original)
+        key = (version, self.x_column, column_name)
+        lod = self._raw_lods.get(key)
+        if lod is None:
+            lod = self._raw_lods[key] = M4Pyramid(x_data, y_data_original)
+        return lod
+
+    def _set_curve_data(self, item, x_data, y_data, y_data_original, smoothing_applied,
+                        lod=None, lod_original=None):
+        """
+        Store new data in a column's plot item and redraw its curves in place.
+
+        lod / lod_original are the M4 pyramids of y_data / y_data_original if
+        they were already built elsewhere.
+        """
+        # Min/max pyramids, so only the visible span is drawn at screen resolution
+        if lod is None:
+            lod = M4Pyramid(x_data, y_data)
+        if not smoothing_applied:
+            lod_original = None
+        elif lod_original is None:
+            lod_original = M4Pyramid(x_data, y_data_original)
+        # The cursor looks samples up by X: sort unsorted X now rather than
+        # on the first mouse move (sorted X only costs a monotonicity check)
+        self._get_x_sort_index(x_data)
+        self.curve_revision += 1
+        item.update({
+            'revision': self.curve_revision,
+            'x_data': x_data,
+            'y_data': y_data,
+            'y_data_original': y_data_original,  # Store original y data
+            'smoothing_applied': smoothing_applied,
+            'lod': lod,
+            'lod_original': lod_original
+        })
+        x_range = self.main_plot.vb.viewRange()[0]
+        n_pixels = self._plot_width_pixels()
+
+        # Original data line (background) only while smoothing is applied
         if smoothing_applied:
-            # Light color for original data (20% opacity = 51/255)
-            light_color = (*color, 51)
-            plot_original = pg.PlotDataItem(
-                x=self.x_data,
-                y=y_data_original,
-                pen=pg.mkPen(light_color, width=1.5),
-                name=f"{column_name} (Original)"
-            )
-            view_box.addItem(plot_original)
+            if item['plot_original'] is None:
+                # Light color for original data (20% opacity = 51/255)
+                light_color = (*item['color'], 51)
+                item['plot_original'] = pg.PlotDataItem(pen=pg.mkPen(light_color, width=1.5))
+                item['plot_original'].setZValue(item['plot_line'].zValue() - 1)
+                item['viewbox'].addItem(item['plot_original'])
+            x_visible, y_visible = lod_original.decimate(x_range[0], x_range[1], n_pixels)
+            item['plot_original'].setData(x_visible, y_visible, name=f"{item['name']} (Original)")
+        elif item['plot_original'] is not None:
+            item['viewbox'].removeItem(item['plot_original'])
+            item['plot_original'] = None
+
+        # Smoothed/main line (foreground)
+        x_visible, y_visible = lod.decimate(x_range[0], x_range[1], n_pixels)
+        item['plot_line'].setData(x_visible, y_visible, name=item['name'])
+
+    def _add_column_with_smoothing(self, column_name, smoothing_params, smoothed=None):
+        """
+        Add a column to the plot with smoothing applied
+
+        smoothed is the (x, y, smoothed y) of the column if it was already
+        smoothed in a batch.
+        """
+        if self.current_df is None:
+            logging.error("No data available to plot")
+            return
+
+        # Check if column is already plotted
+        if column_name in [item['name'] for item in self.plot_items]:
+            logging.warning(f"Column '{column_name}' already plotted, skipping")
+            return
+
+        if smoothed is not None:
+            curve_data = self._column_curve_data(column_name, smoothing_params, *smoothed)
+        else:
+            curve_data = self._column_curve_data(column_name, smoothing_params)
+        if curve_data is None:
+            return
+
+        # Get color for this column
+        index = len(self._column_items())
+        color = self.colors[index % len(self.colors)]
+        view_box, axis = self._create_axis(index, column_name, color)
 
-        # Create smoothed/main line plot (foreground)
         # Dark, fully opaque color for smoothed data
         dark_color = (*color, 255)
         plot_line = pg.PlotDataItem(
-            x=self.x_data,
-            y=y_data,
             pen=pg.mkPen(dark_color, width=3),  # Thicker and fully opaque
             name=column_name
         )
@@ -840,50 +1037,194 @@ class PlotArea(QWidget):
         # Auto-range for this Y-axis
         view_box.enableAutoRange(axis=pg.ViewBox.YAxis)
 
-        # Store plot item info
-        self.plot_items.append({
+        # Store plot item info (column items come before curve fits)
+        item = {
             'name': column_name,
             'plot_line': plot_line,
-            'plot_original': plot_original,  # Store original line plot
+            'plot_original': None,  # Original line plot, created while smoothing
             'viewbox': view_box,
             'axis': axis,
             'color': color,
-            'x_data': self.x_data,
-            'y_data': y_data,
-            'y_data_original': y_data_original,  # Store original y data
-            'smoothing_applied': smoothing_applied
-        })
+            'smoothing': self._smoothing_key(smoothing_params)
+        }
+        lod_raw = self._raw_lod(column_name, curve_data[0], curve_data[2])
+        self._set_curve_data(item, *curve_data, lod=None if curve_data[3] else lod_raw, lod_original=lod_raw)
+        self.plot_items.insert(index, item)
         self.axis_colors.append(color)
 
         logging.info(f"Added column: {column_name} with color {color}" +
-                     (" (with smoothing)" if smoothing_applied else ""))
+                     (" (with smoothing)" if item['smoothing_applied'] else ""))
 
-    def _remove_last_plot_item(self):
-        """Remove the last added column (internal method)"""
-        if len(self.plot_items) == 0:
-            return
+    def _update_column_item(self, item, column_name, smoothing_params, reload_data, smoothed=None):
+        """
+        Show another column or other smoothing in an existing plot item.
+
+        The item keeps its ViewBox, axis and color; only the curve data is
+        replaced (smoothed: as for _add_column_with_smoothing). Returns False
+        if the column has no valid data.
+        """
+        if smoothed is not None:
+            curve_data = self._column_curve_data(column_name, smoothing_params, *smoothed)
+        elif reload_data or item['name'] != column_name:
+            curve_data = self._column_curve_data(column_name, smoothing_params)
+        else:
+            # Only the smoothing changed, the raw data is already here
+            curve_data = self._column_curve_data(column_name, smoothing_params,
+                                                 item['x_data'], item['y_data_original'])
+        if curve_data is None:
+            return False
+
+        # A fit belongs to the data it was computed from (smoothing does not matter)
+        if reload_data or item['name'] != column_name:
+            for fit in [fit for fit in self.plot_items
+                        if fit.get('is_curve_fit') and fit.get('parent_column') == item['name']]:
+                self._remove_plot_item(fit)
+
+        if item['name'] != column_name:
+            item['name'] = column_name
+            self._style_axis(item['axis'], column_name, item['color'])
+        item['smoothing'] = self._smoothing_key(smoothing_params)
+        lod_raw = self._raw_lod(column_name, curve_data[0], curve_data[2])
+        self._set_curve_data(item, *curve_data, lod=None if curve_data[3] else lod_raw, lod_original=lod_raw)
+
+        logging.info(f"Updated column: {column_name}" +
+                     (" (with smoothing)" if item['smoothing_applied'] else ""))
+        return True
+
+    def _sync_plot_items(self, y_columns, smoothing_params, reload_data):
+        """
+        Plot y_columns, reusing the items that are already on the plot.
+
+        Every column gets the position (and so the axis and color) a fresh
+        plot would give it. Items whose column, data and smoothing are
+        unchanged are left alone, the others get new curve data in place;
+        only positions beyond the current ones create or remove items.
+        """
+        smoothing = self._smoothing_key(smoothing_params)
+        if reload_data:
+            for fit in [item for item in self.plot_items if item.get('is_curve_fit')]:
+                self._remove_plot_item(fit)
+
+        # Columns that get new smoothed curves are smoothed together up front
+        smoothed = {}
+        if smoothing is not None:
+            shown = {item['name']: item for item in self._column_items()}
+            pending = {}
+            for column_name in dict.fromkeys(y_columns):
+                item = shown.get(column_name)
+                if item is None or reload_data:
+                    pending[column_name] = self._get_column_xy(column_name)
+                elif item['smoothing'] != smoothing:
+                    pending[column_name] = (item['x_data'], item['y_data_original'])
+            if len(pending) > 1:
+                smoothed = self._smooth_columns(pending, smoothing_params)
+
+        index = 0
+        for column_name in y_columns:
+            column_items = self._column_items()
+            if column_name in [item['name'] for item in column_items[:index]]:
+                logging.warning(f"Column '{column_name}' already plotted, skipping")
+                continue
+
+            if index < len(column_items):
+                item = column_items[index]
+                if item['name'] == column_name and not reload_data and item['smoothing'] == smoothing:
+                    index += 1
+                elif self._update_column_item(item, column_name, smoothing_params, reload_data,
+                                              smoothed.get(column_name)):
+                    index += 1
+            else:
+                self._add_column_with_smoothing(column_name, smoothing_params, smoothed.get(column_name))
+                if len(self._column_items()) > index:
+                    index += 1
+
+        # Columns no longer selected, last position first
+        for item in reversed(self._column_items()[index:]):
+            self._remove_plot_item(item)
 
-        # Get last item
-        last_item = self.plot_items.pop()
+        # Raw pyramids are kept for the plotted columns only
+        shown = {item['name'] for item in self._column_items()}
+        self._raw_lods = {key: lod for key, lod in self._raw_lods.items() if key[2] in shown}
+
+    def smoothing_snapshot(self, smoothing_params):
+        """
+        Raw data of the plotted columns that are not yet smoothed with
+        smoothing_params, for smoothing them off the GUI thread.
+
+        Returns:
+        --------
+        list of dict with name, revision, x_data, y_data_original, lod_raw
+        (the M4 pyramid of the raw data) and cache_key (for the smoothing cache)
+        """
+        return [{
+            'name': item['name'],
+            'revision': item['revision'],
+            'x_data': item['x_data'],
+            'y_data_original': item['y_data_original'],
+            'lod_raw': item['lod_original'] if item['smoothing_applied'] else item['lod'],
+            'cache_key': self._smoothing_cache_key(item['name'], smoothing_params, len(item['y_data_original']))
+        } for item in self._column_items() if item['smoothing'] != self._smoothing_key(smoothing_params)]
+
+    def apply_smoothed_curves(self, smoothing_params, results):
+        """
+        Swap in curves smoothed from a smoothing_snapshot().
+
+        Parameters:
+        -----------
+        smoothing_params : dict
+            Settings the curves were smoothed with
+        results : list of (snapshot entry, smoothed y, M4Pyramid of smoothed y)
+            Entries whose plot item changed since the snapshot are ignored
+        """
+        smoothing = self._smoothing_key(smoothing_params)
+        items = {(item['name'], item['revision']): item for item in self._column_items()}
+        for curve, y_data, lod in results:
+            item = items.get((curve['name'], curve['revision']))
+            if item is None:
+                continue
+            item['smoothing'] = smoothing
+            if smoothing is None:
+                self._set_curve_data(item, curve['x_data'], curve['y_data_original'], curve['y_data_original'],
+                                     False, lod=curve['lod_raw'])
+            else:
+                self._set_curve_data(item, curve['x_data'], y_data, curve['y_data_original'], True,
+                                     lod=lod, lod_original=curve['lod_raw'])
+        if self.last_plot_params:
+            self.last_plot_params['smoothing_params'] = smoothing_params
+        logging.info(f"Updated smoothing of {len(results)} curves")
+
+    def _remove_plot_item(self, item):
+        """Remove one column (together with its curve fits) or one curve fit"""
+        is_curve_fit = item.get('is_curve_fit', False)
+        if not is_curve_fit:
+            for fit in [fit for fit in self.plot_items
+                        if fit.get('is_curve_fit') and fit.get('parent_column') == item['name']]:
+                self._remove_plot_item(fit)
+        elif item.get('parent_column'):
+            # Drop the fit reference kept in the fitted column
+            for parent in self.plot_items:
+                if parent['name'] == item['parent_column'] and parent.get('fit_line') is item['plot_line']:
+                    del parent['fit_line']
+                    parent.pop('fit_equation', None)
+
+        self.plot_items.remove(item)
 
         # Remove line plot
-        last_item['viewbox'].removeItem(last_item['plot_line'])
+        item['viewbox'].removeItem(item['plot_line'])
+        self._remove_fit_bands(item)
 
         # Remove original line plot if it exists
-        if last_item.get('plot_original'):
-            last_item['viewbox'].removeItem(last_item['plot_original'])
-
-        # Check if this is a curve fit (which reuses parent's axis/viewbox)
-        is_curve_fit = last_item.get('is_curve_fit', False)
+        if item.get('plot_original'):
+            item['viewbox'].removeItem(item['plot_original'])
 
         if not is_curve_fit:
             # Only remove axis/viewbox if this plot owns them (not a curve fit)
-            if last_item['axis'] in self.y_axes:
+            if item['axis'] in self.y_axes:
                 # This is a secondary axis that was added to the layout
-                self.plot_layout.removeItem(last_item['axis'])
-                self.main_plot.scene().removeItem(last_item['viewbox'])
-                self.y_axes.remove(last_item['axis'])
-            elif len(self.plot_items) == 0:
+                self.plot_layout.removeItem(item['axis'])
+                self.main_plot.scene().removeItem(item['viewbox'])
+                self.y_axes.remove(item['axis'])
+            elif not self._column_items():
                 # If removing the last plot using the main axis, clear the label
                 self.main_plot.getAxis('left').setLabel('')
 
@@ -891,10 +1232,19 @@ class PlotArea(QWidget):
             if self.axis_colors:
                 self.axis_colors.pop()
 
-        logging.info(f"Removed column: {last_item['name']}")
+        logging.info(f"Removed column: {item['name']}")
+
+    def _remove_last_plot_item(self):
+        """Remove the last added column (internal method)"""
+        if len(self.plot_items) == 0:
+            return
+        self._remove_plot_item(self.plot_items[-1])
 
     def _clear_all_plot_items(self):
         """Clear all plotted columns (internal method)"""
+        self._x_sort_indexes = {}
+        self._raw_lods = {}
+        self.plotted_source = None
         while len(self.plot_items) > 0:
             self._remove_last_plot_item()
 
@@ -902,9 +1252,123 @@ class PlotArea(QWidget):
 
     def update_views(self):
         """Update all ViewBox geometries to match the main plot"""
-        for item in self.plot_items[1:]:  # Skip first one (uses main ViewBox)
+        for item in self._column_items()[1:]:  # Skip first one (uses main ViewBox)
             item['viewbox'].setGeometry(self.main_plot.vb.sceneBoundingRect())
 
+    @staticmethod
+    def _frame_interval_ms():
+        """Display refresh interval (60 Hz if the screen does not tell)"""
+        screen = QApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None else 0
+        return max(int(1000 / refresh_rate), 1) if refresh_rate > 0 else 16
+
+    def _plot_width_pixels(self):
+        """Width of the data area in device pixels"""
+        width = self.main_plot.vb.width() * self.graphics_view.devicePixelRatioF()
+        return int(width) if width > 1 else DEFAULT_PLOT_WIDTH_PIXELS
+
+    def _schedule_level_of_detail(self, *args):
+        self.lod_timer.start()
+
+    def _update_level_of_detail(self):
+        """Redraw the decimated curves for the current X range and plot width"""
+        if not self.plot_items:
+            return
+        x_min, x_max = self.main_plot.vb.viewRange()[0]
+        n_pixels = self._plot_width_pixels()
+
+        for item in self.plot_items:
+            if 'fit_func' in item:
+                self._draw_fit(item, x_min, x_max, n_pixels)
+                continue
+            for line_key, lod_key in (('plot_line', 'lod'), ('plot_original', 'lod_original')):
+                lod = item.get(lod_key)
+                if lod is None or not lod.decimatable or item.get(line_key) is None:
+                    continue
+                item[line_key].setData(*lod.decimate(x_min, x_max, n_pixels))
+
+    def _draw_fit(self, item, x_min, x_max, n_pixels):
+        """
+        Evaluate a fitted curve over the visible part of its X range at screen
+        resolution. Off-screen fits are emptied and cost nothing until they
+        come into view again; an unchanged view is not evaluated again.
+        """
+        view = (x_min, x_max, n_pixels)
+        if item.get('fit_view') == view:
+            return
+        item['fit_view'] = view
+
+        lo = max(x_min, item['fit_range'][0])
+        hi = min(x_max, item['fit_range'][1])
+        if hi > lo and x_max > x_min:
+            n_points = max(2, int(np.ceil(n_pixels * FIT_SAMPLES_PER_PIXEL * (hi - lo) / (x_max - x_min))))
+            x_fit = np.linspace(lo, hi, n_points)
+            y_fit = np.asarray(item['fit_func'](x_fit), dtype=np.float64)
+        else:
+            x_fit = y_fit = np.empty(0)
+
+        item.update({'x_data': x_fit, 'y_data': y_fit, 'y_data_original': y_fit})
+        item['plot_line'].setData(x_fit, y_fit)
+
+        if item.get('bands') is not None:
+            bounds = item['bands'].evaluate(x_fit) if len(x_fit) else [x_fit] * 4
+            for line, y_bound in zip(item['band_items'], bounds):
+                line.setData(x_fit, y_bound)
+
+    def apply_fit_bands(self, fit_name, bands):
+        """
+        Shade the bootstrap confidence and prediction bands of a fitted curve.
+
+        Parameters:
+        -----------
+        fit_name : str
+            Name of the curve fit item ("<column> - <fit> Fit")
+        bands : utils.bootstrap.BootstrapBands
+            Evaluated with the curve for the visible X range
+
+        Returns:
+        --------
+        bool : False if no such fit is plotted
+        """
+        fits = [item for item in self.plot_items if item.get('is_curve_fit') and item['name'] == fit_name]
+        if not fits:
+            logging.warning(f"Could not find curve fit {fit_name}")
+            return False
+        item = fits[-1]
+        self._remove_fit_bands(item)
+
+        # Confidence band bounds first, then the prediction band's
+        color = item['color']
+        lines = [pg.PlotDataItem(pen=pg.mkPen((*color, alpha), width=1)) for alpha in (120, 120, 60, 60)]
+        fills = [pg.FillBetweenItem(lines[0], lines[1], brush=pg.mkBrush(*color, 50)),
+                 pg.FillBetweenItem(lines[2], lines[3], brush=pg.mkBrush(*color, 20))]
+        # In the fit's ViewBox, below the fitted curve
+        for graphics in lines + fills:
+            graphics.setZValue(item['plot_line'].zValue() - 1)
+            item['viewbox'].addItem(graphics)
+
+        item['bands'] = bands
+        item['band_items'] = lines
+        item['band_fills'] = fills
+        item['fit_view'] = None
+        x_min, x_max = self.main_plot.vb.viewRange()[0]
+        self._draw_fit(item, x_min, x_max, self._plot_width_pixels())
+        logging.info(f"Applied {bands.level:.0%} bootstrap bands to {fit_name}")
+        return True
+
+    @staticmethod
+    def _remove_fit_bands(item):
+        """Remove the bootstrap bands of a curve fit item, if any"""
+        for graphics in item.pop('band_fills', []) + item.pop('band_items', []):
+            item['viewbox'].removeItem(graphics)
+        item.pop('bands', None)
+
+    @staticmethod
+    def _fit_value(item, x_value):
+        """Point of a fitted curve at x_value (limited to the fitted X range)"""
+        x = min(max(x_value, item['fit_range'][0]), item['fit_range'][1])
+        return x, float(np.asarray(item['fit_func'](np.array([x])))[0])
+
 
     def update_x_axis_range(self):
         """Update the X-axis range based on input values"""
@@ -1004,13 +1468,15 @@ class PlotArea(QWidget):
                 x_data = item['x_data']
                 y_data = item['y_data']
 
-                if len(x_data) == 0:
+                if 'fit_func' in item:
+                    nearest_x, nearest_y = self._fit_value(item, x)
+                elif len(x_data) == 0:
                     continue
-
-                # Find nearest point
-                idx = self._find_nearest_index(x_data, x)
-                nearest_x = x_data[idx]
-                nearest_y = y_data[idx]
+                else:
+                    # Find nearest point
+                    idx = self._find_nearest_index(x_data, x)
+                    nearest_x = x_data[idx]
+                    nearest_y = y_data[idx]
 
                 # Add to legend text
                 legend_text += f"{item['name']}: {nearest_y:.2f}\n"
@@ -1094,20 +1560,50 @@ class PlotArea(QWidget):
             logging.error(traceback.format_exc())
             QMessageBox.critical(self, "Error", f"Failed to add highlight: {str(e)}")
 
+    def cursor_values(self, x_value):
+        """
+        Values of every plotted curve at the sample nearest to x_value.
+
+        Read-only: nothing is recorded in the undo history. Curves sharing an
+        X array (all columns of one dataset) share a single lookup.
+
+        Returns:
+        --------
+        list of (name, nearest x, y) tuples, in plot order
+        """
+        nearest = {}
+        values = []
+        for item in self.plot_items:
+            if 'fit_func' in item:
+                # Fits are evaluated exactly, they have no fixed samples
+                values.append((item['name'], *self._fit_value(item, x_value)))
+                continue
+            x_data = item['x_data']
+            if len(x_data) == 0:
+                continue
+            key = id(x_data)
+            if key not in nearest:
+                nearest[key] = self._find_nearest_index(x_data, x_value)
+            idx = nearest[key]
+            values.append((item['name'], x_data[idx], item['y_data'][idx]))
+        return values
+
     def _find_nearest_index(self, x_data, x_value):
-        """Find nearest index using binary search"""
-        self._save_state()
+        """Find nearest index using binary search on the X sort index (any X order)"""
         if len(x_data) == 0:
             return 0
 
-        idx = np.searchsorted(x_data, x_value)
-        idx = np.clip(idx, 0, len(x_data) - 1)
-
-        if idx > 0:
-            if abs(x_data[idx - 1] - x_value) < abs(x_data[idx] - x_value):
-                idx = idx - 1
+        idx = self._get_x_sort_index(x_data).nearest(x_value)
+        return max(idx, 0)
 
-        return idx
+    def _get_x_sort_index(self, x_data):
+        """Sort index of a plotted X array, built once per plot"""
+        entry = self._x_sort_indexes.get(id(x_data))
+        if entry is None or entry[0] is not x_data:
+            # The array is kept in the entry so its id cannot be reused
+            entry = (x_data, SortIndex(x_data))
+            self._x_sort_indexes[id(x_data)] = entry
+        return entry[1]
 
 
 
@@ -1320,9 +1816,9 @@ class PlotArea(QWidget):
     def apply_curve_fitting(self, x_data, y_data, fit_func, equation, fit_type, x_label, y_label):
         """Apply curve fitting to the plot"""
         try:
-            # Generate fitted data points
-            x_fit = np.linspace(np.min(x_data), np.max(x_data), 500)
-            y_fit = fit_func(x_fit)
+            # The curve is evaluated for the visible X range whenever the view
+            # changes (_draw_fit); only the X range of the data is kept
+            fit_range = (float(np.min(x_data)), float(np.max(x_data)))
 
             # Find the plot item for the y_label
             target_item = None
@@ -1338,8 +1834,6 @@ class PlotArea(QWidget):
             # Create curve fit line
             fit_color = (255, 0, 0)  # Red color for fit line
             fit_line = pg.PlotDataItem(
-                x=x_fit,
-                y=y_fit,
                 pen=pg.mkPen((*fit_color, 200), width=2, style=QtCore.Qt.DashLine),
                 name=f"{y_label} - {fit_type} Fit"
             )
@@ -1359,14 +1853,19 @@ class PlotArea(QWidget):
                 'viewbox': target_item['viewbox'],
                 'axis': target_item['axis'],
                 'color': fit_color,
-                'x_data': x_fit,
-                'y_data': y_fit,
-                'y_data_original': y_fit,
+                'x_data': np.empty(0),
+                'y_data': np.empty(0),
+                'y_data_original': np.empty(0),
                 'smoothing_applied': False,
                 'is_curve_fit': True,
-                'parent_column': y_label
+                'parent_column': y_label,
+                'fit_func': fit_func,
+                'fit_range': fit_range,
+                'fit_view': None
             }
             self.plot_items.append(fit_plot_item)
+            x_min, x_max = self.main_plot.vb.viewRange()[0]
+            self._draw_fit(fit_plot_item, x_min, x_max, self._plot_width_pixels())
 
             # Update legend to include the fitted curve
             if self.show_legend:
@@ -1393,6 +1892,7 @@ class PlotArea(QWidget):
                     # Remove the curve fit plot item from plot_items
                     if item.get('is_curve_fit') and item.get('parent_column') == y_label:
                         item['viewbox'].removeItem(item['plot_line'])
+                        self._remove_fit_bands(item)
                         self.plot_items.remove(item)
             else:
                 # Remove all curve fits
@@ -1406,6 +1906,7 @@ class PlotArea(QWidget):
                     # Collect curve fit plot items to remove
                     if item.get('is_curve_fit'):
                         item['viewbox'].removeItem(item['plot_line'])
+                        self._remove_fit_bands(item)
                         items_to_remove.append(item)
 
                 # Remove collected items
@@ -1483,7 +1984,6 @@ class PlotArea(QWidget):
         """
         Export the complete plot with all axes, annotations, and legend
         """
-        from PyQt5.QtWidgets import QApplication
 
         try:
             # Temporarily hide cursor if active
@@ -0,0 +1,141 @@
+import logging
+import traceback
+from concurrent.futures.process import BrokenProcessPool
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from utils.batch_fit import fit_column
+from utils.process_pool import default_worker_count, get_process_pool, shutdown_process_pool
+
+
+class _FitJob:
+    """Columns of one batch, submitted as workers become free"""
+
+    def __init__(self, columns, read_xy, fit_type, degree):
+        self.columns = list(columns)
+        self.read_xy = read_xy
+        self.fit_type = fit_type
+        self.degree = degree
+        self.next_column = 0
+        self.futures = {}
+        self.results = []
+        self.errors = []
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        for future in self.futures.values():
+            future.cancel()
+
+
+class BatchFitter(QObject):
+    """
+    Fits many columns against the same X in the shared process pool.
+
+    Columns are read on the GUI thread (the dataset's lazy readers are not
+    shared between threads) and submitted one per worker; each finished fit
+    submits the next column, so at most one column per worker is held in
+    memory besides the plotted data. Every fit is reported as soon as it
+    completes, and starting a new batch cancels the one still running.
+    """
+
+    # A fit_column result of the running batch
+    column_fitted = pyqtSignal(object)
+    # Column name and error message of a failed fit
+    column_failed = pyqtSignal(str, str)
+    # Emitted once all columns are done: (results, errors)
+    batch_finished = pyqtSignal(object, object)
+
+    # Emitted from a pool thread, delivered to the GUI thread
+    _future_done = pyqtSignal(object, str, object)
+
+    def __init__(self, parent=None, workers=None):
+        super().__init__(parent)
+        self.workers = workers or default_worker_count()
+        self._job = None
+        self._future_done.connect(self._on_future_done)
+
+    def start(self, columns, read_xy, fit_type, degree=1):
+        """
+        Fit columns in the background, replacing any running batch.
+
+        Parameters:
+        -----------
+        columns : list of str
+            Y columns to fit
+        read_xy : callable
+            Returns the (x_data, y_data) arrays of a column; called on the GUI thread
+        fit_type : str
+            'Polynomial' or 'Exponential'
+        degree : int
+            Polynomial degree
+        """
+        self.cancel()
+        job = _FitJob(columns, read_xy, fit_type, degree)
+        self._job = job
+        logging.info(f"Fitting {len(job.columns)} columns on {self.workers} workers")
+        for _ in range(min(self.workers, len(job.columns))):
+            self._submit_next(job)
+        self._finish_if_done(job)
+
+    def is_busy(self):
+        return self._job is not None
+
+    def cancel(self):
+        """Drop the running batch; fits still in flight are not reported"""
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+
+    def _submit_next(self, job):
+        """Read the next column and submit its fit; False when none is left"""
+        while job.next_column < len(job.columns):
+            column = job.columns[job.next_column]
+            job.next_column += 1
+            try:
+                x_data, y_data = job.read_xy(column)
+                future = get_process_pool(self.workers).submit(fit_column, column, x_data, y_data,
+                                                               job.fit_type, job.degree)
+            except BrokenProcessPool as e:
+                shutdown_process_pool()
+                self._record_error(job, column, f"Worker process failed: {str(e)}")
+                continue
+            except Exception as e:
+                logging.error(traceback.format_exc())
+                self._record_error(job, column, str(e))
+                continue
+            job.futures[column] = future
+            future.add_done_callback(lambda future, column=column: self._future_done.emit(job, column, future))
+            return True
+        return False
+
+    def _on_future_done(self, job, column, future):
+        if job.cancelled or future.cancelled():
+            return
+        job.futures.pop(column, None)
+        try:
+            result = future.result()
+        except BrokenProcessPool as e:
+            shutdown_process_pool()
+            self._record_error(job, column, f"Worker process failed: {str(e)}")
+        except Exception as e:
+            self._record_error(job, column, str(e))
+        else:
+            job.results.append(result)
+            self.column_fitted.emit(result)
+
+        # The handler of column_fitted may have started another batch
+        if job is self._job:
+            self._submit_next(job)
+            self._finish_if_done(job)
+
+    def _record_error(self, job, column, message):
+        logging.warning(f"Fitting {column} failed: {message}")
+        job.errors.append((column, message))
+        self.column_failed.emit(column, message)
+
+    def _finish_if_done(self, job):
+        if job is self._job and not job.futures and job.next_column >= len(job.columns):
+            self._job = None
+            logging.info(f"Batch fit finished: {len(job.results)} fitted, {len(job.errors)} failed")
+            self.batch_finished.emit(job.results, job.errors)
@@ -0,0 +1,203 @@
+import logging
+import traceback
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+
+from utils.bootstrap import (CONFIDENCE_LEVEL, REPLICATES_PER_TASK, BootstrapBands, SharedInputs, band_spec,
+                             bootstrap_batch, prepare_bootstrap)
+from utils.process_pool import default_worker_count, get_process_pool, shutdown_process_pool
+
+
+class _BandJob:
+    """Fits of one run, bootstrapped one after the other"""
+
+    def __init__(self, fits, read_xy, method, replicates):
+        self.fits = list(fits)
+        self.read_xy = read_xy
+        self.method = method
+        self.batch_sizes = [REPLICATES_PER_TASK] * (replicates // REPLICATES_PER_TASK)
+        if replicates % REPLICATES_PER_TASK:
+            self.batch_sizes.append(replicates % REPLICATES_PER_TASK)
+        self.next_fit = 0
+        self.tasks_done = 0
+        self.tasks_total = len(self.fits) * (1 + len(self.batch_sizes))
+        self.errors = []
+        self.finished = []
+        self.cancelled = False
+        self.current = None
+
+    def cancel(self):
+        self.cancelled = True
+        if self.current is not None:
+            self.current.release()
+            self.current = None
+
+
+class _FitBands:
+    """Bootstrap of one fit: its shared inputs and pending pool tasks"""
+
+    def __init__(self, result, spec, inputs):
+        self.result = result
+        self.spec = spec
+        self.inputs = inputs
+        self.futures = set()
+        self.r = None
+        self.residual_quantiles = None
+        self.projections = []
+
+    def release(self):
+        for future in self.futures:
+            future.cancel()
+        self.futures.clear()
+        # Tasks still running keep their own mapping of the block
+        self.inputs.close()
+
+
+class BootstrapRunner(QObject):
+    """
+    Bootstrap confidence and prediction bands of fits in the shared process pool.
+
+    The fits are processed one at a time: the samples of a fit are copied
+    into a shared memory block once, a first task computes its residuals,
+    then the replicates are split into batches of REPLICATES_PER_TASK that
+    run in parallel on the workers. Progress is reported per finished task;
+    cancelling drops the tasks not started yet and ignores the running ones.
+    """
+
+    # Finished and total pool tasks of the running job
+    progress = pyqtSignal(int, int)
+    # fit_column result and its BootstrapBands
+    bands_ready = pyqtSignal(object, object)
+    # Emitted once all fits are done: (results with bands, errors)
+    finished = pyqtSignal(object, object)
+
+    # Emitted from a pool thread, delivered to the GUI thread
+    _future_done = pyqtSignal(object, object, object)
+
+    def __init__(self, parent=None, workers=None):
+        super().__init__(parent)
+        self.workers = workers or default_worker_count()
+        self._job = None
+        # Queued even when a task is done before its callback is added on the GUI thread
+        self._future_done.connect(self._on_future_done, Qt.QueuedConnection)
+
+    def start(self, fits, read_xy, method, replicates):
+        """
+        Bootstrap the bands of fits in the background, replacing any running job.
+
+        Parameters:
+        -----------
+        fits : list of dict
+            fit_column results
+        read_xy : callable
+            Returns the (x_data, y_data) arrays of a column; called on the GUI thread
+        method : str
+            One of utils.bootstrap.BOOTSTRAP_METHODS
+        replicates : int
+            Bootstrap replicates per fit
+        """
+        self.cancel()
+        job = _BandJob(fits, read_xy, method, replicates)
+        self._job = job
+        logging.info(f"Bootstrapping {len(job.fits)} fits ({method}, {replicates} replicates) "
+                     f"on {self.workers} workers")
+        self.progress.emit(0, job.tasks_total)
+        self._start_next(job)
+
+    def is_busy(self):
+        return self._job is not None
+
+    def cancel(self):
+        """Drop the running job and release its shared memory"""
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+
+    def _start_next(self, job):
+        """Share the samples of the next fit and submit its residual task"""
+        while job.next_fit < len(job.fits):
+            result = job.fits[job.next_fit]
+            job.next_fit += 1
+            fit = None
+            try:
+                x_data, y_data = job.read_xy(result['column'])
+                spec = band_spec(result)
+                fit = _FitBands(result, spec, SharedInputs(spec, x_data, y_data))
+                self._submit(job, fit, 'prepare', prepare_bootstrap, spec, fit.inputs.name, fit.inputs.n,
+                             CONFIDENCE_LEVEL)
+            except BrokenProcessPool as e:
+                shutdown_process_pool()
+                self._fit_failed(job, fit, result, f"Worker process failed: {str(e)}")
+                continue
+            except Exception as e:
+                logging.error(traceback.format_exc())
+                self._fit_failed(job, fit, result, str(e))
+                continue
+            job.current = fit
+            return
+
+        self._job = None
+        logging.info(f"Bootstrap finished: {len(job.finished)} fits, {len(job.errors)} failed")
+        self.finished.emit(job.finished, job.errors)
+
+    def _submit(self, job, fit, task, function, *args):
+        future = get_process_pool(self.workers).submit(function, *args)
+        fit.futures.add(future)
+        future.add_done_callback(lambda future: self._future_done.emit(job, (fit, task), future))
+
+    def _on_future_done(self, job, task, future):
+        fit, task = task
+        if job.cancelled or fit is not job.current or future.cancelled():
+            return
+        fit.futures.discard(future)
+        try:
+            value = future.result()
+            if task == 'prepare':
+                fit.r, fit.residual_quantiles = value
+                seeds = np.random.SeedSequence().spawn(len(job.batch_sizes))
+                for size, seed in zip(job.batch_sizes, seeds):
+                    self._submit(job, fit, 'batch', bootstrap_batch, fit.spec, fit.inputs.name, fit.inputs.n,
+                                 size, seed, job.method)
+            else:
+                fit.projections.append(value)
+        except BrokenProcessPool as e:
+            shutdown_process_pool()
+            self._fit_failed(job, fit, fit.result, f"Worker process failed: {str(e)}")
+            self._start_next(job)
+            return
+        except Exception as e:
+            self._fit_failed(job, fit, fit.result, str(e))
+            self._start_next(job)
+            return
+
+        job.tasks_done += 1
+        self.progress.emit(job.tasks_done, job.tasks_total)
+        if fit.futures:
+            return
+
+        job.current = None
+        fit.inputs.close()
+        try:
+            bands = BootstrapBands(fit.spec, fit.r, fit.projections, fit.residual_quantiles,
+                                   method=job.method)
+        except Exception as e:
+            self._fit_failed(job, None, fit.result, str(e))
+        else:
+            job.finished.append(fit.result)
+            self.bands_ready.emit(fit.result, bands)
+
+        # The handler of bands_ready may have started another job
+        if job is self._job:
+            self._start_next(job)
+
+    def _fit_failed(self, job, fit, result, message):
+        logging.warning(f"Bootstrap of {result['column']} failed: {message}")
+        if fit is not None:
+            fit.release()
+        job.current = None
+        job.errors.append((result['column'], message))
+        # The tasks of the fit that will not run still count as done
+        job.tasks_done = min(job.tasks_total, (len(job.finished) + len(job.errors)) * (1 + len(job.batch_sizes)))
+        self.progress.emit(job.tasks_done, job.tasks_total)
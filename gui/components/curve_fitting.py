@@ -217,21 +217,52 @@
 
 # curve_fitting.py
 
-from PyQt5.QtWidgets import QGroupBox, QFormLayout, QPushButton, QMessageBox, QComboBox, QSpinBox
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import (QGroupBox, QFormLayout, QPushButton, QMessageBox, QComboBox, QSpinBox, QFileDialog,
+                             QProgressDialog)
 import numpy as np
-from scipy.optimize import curve_fit
+import pandas as pd
 import logging
 
+from gui.components.batch_fitter import BatchFitter
+from gui.components.bootstrap_runner import BootstrapRunner
+from utils.batch_fit import fit_column, fit_function, fit_summary_frame
+from utils.bootstrap import BOOTSTRAP_METHODS, CONFIDENCE_LEVEL
+from utils.nonlinear_fit import NONLINEAR_MODELS
+
+# Fit column choices; TDMS channel groups are appended as "Group: <name>"
+FIRST_SELECTED = 'First Selected Y'
+ALL_SELECTED = 'All Selected Y'
+ALL_COLUMNS = 'All Columns'
+GROUP_PREFIX = 'Group: '
+
+# Fits listed in the message shown after a batch
+MAX_LISTED_FITS = 15
+
 
 class CurveFitting(QGroupBox):
     def __init__(self, parent):
         super().__init__("Curve Fitting", parent)
         self.layout = QFormLayout()
+        # Latest fit of each column, in the order they finished
+        self.fit_results = {}
+        self._batch_x_column = None
+        self._batch_data_version = None
+        # Fits left out of the running bootstrap because their data changed
+        self._bands_skipped = []
+        self.batch_fitter = BatchFitter(self)
+        self.batch_fitter.column_fitted.connect(self.on_column_fitted)
+        self.batch_fitter.batch_finished.connect(self.on_batch_finished)
+        self.bootstrap_runner = BootstrapRunner(self)
+        self.bootstrap_runner.progress.connect(self.on_bands_progress)
+        self.bootstrap_runner.bands_ready.connect(self.on_bands_ready)
+        self.bootstrap_runner.finished.connect(self.on_bands_finished)
+        self._bands_progress_dialog = None
         self.setup_ui()
 
     def setup_ui(self):
         self.fit_type = QComboBox()
-        self.fit_type.addItems(['Polynomial', 'Exponential'])
+        self.fit_type.addItems(['Polynomial'] + list(NONLINEAR_MODELS))
         self.fit_type.currentTextChanged.connect(self.on_fit_type_changed)
         self.layout.addRow("Fit Type:", self.fit_type)
 
@@ -243,6 +274,12 @@ class CurveFitting(QGroupBox):
         self.degree_spinbox.setToolTip("Degrees above 9 may cause overfitting and numerical instability")
         self.layout.addRow("Polynomial Degree:", self.degree_spinbox)
 
+        # Columns to fit; more than one are fitted in parallel worker processes
+        self.fit_scope = QComboBox()
+        self.fit_scope.addItems([FIRST_SELECTED, ALL_SELECTED, ALL_COLUMNS])
+        self.fit_scope.setToolTip("Several columns are fitted in the background, each fit is plotted when done")
+        self.layout.addRow("Fit Columns:", self.fit_scope)
+
         self.apply_fit_button = QPushButton("Apply Fit")
         self.apply_fit_button.clicked.connect(self.apply_fit)
         self.layout.addRow(self.apply_fit_button)
@@ -251,12 +288,43 @@ class CurveFitting(QGroupBox):
         self.remove_fit_button.clicked.connect(self.remove_fit)
         self.layout.addRow(self.remove_fit_button)
 
+        self.export_summary_button = QPushButton("Export Fit Summary")
+        self.export_summary_button.clicked.connect(self.export_summary)
+        self.layout.addRow(self.export_summary_button)
+
+        # Bootstrap bands of the plotted fits, computed in worker processes
+        self.bootstrap_method = QComboBox()
+        self.bootstrap_method.addItems(BOOTSTRAP_METHODS)
+        self.bootstrap_method.setToolTip("Residuals: resample the residuals (constant noise)\n"
+                                         "Cases: resample the data points (noise may vary along X)")
+        self.layout.addRow("Bootstrap:", self.bootstrap_method)
+
+        self.bootstrap_replicates = QSpinBox()
+        self.bootstrap_replicates.setRange(50, 5000)
+        self.bootstrap_replicates.setSingleStep(50)
+        self.bootstrap_replicates.setValue(200)
+        self.layout.addRow("Replicates:", self.bootstrap_replicates)
+
+        self.bands_button = QPushButton("Compute Confidence Bands")
+        self.bands_button.clicked.connect(self.compute_bands)
+        self.layout.addRow(self.bands_button)
+
         self.setLayout(self.layout)
 
     def on_fit_type_changed(self, fit_type):
         """Enable/disable degree selector based on fit type"""
         self.degree_spinbox.setEnabled(fit_type == 'Polynomial')
 
+    def update_columns(self, columns):
+        """Offer the channel groups of the loaded data ("group/channel" names) as fit sets"""
+        current = self.fit_scope.currentText()
+        self.fit_scope.clear()
+        self.fit_scope.addItems([FIRST_SELECTED, ALL_SELECTED, ALL_COLUMNS])
+        groups = dict.fromkeys(str(column).split('/', 1)[0] for column in columns if '/' in str(column))
+        self.fit_scope.addItems([GROUP_PREFIX + group for group in groups])
+        if self.fit_scope.findText(current) >= 0:
+            self.fit_scope.setCurrentText(current)
+
     def apply_fit(self):
         logging.info("Starting curve fitting process")
         main_window = self.window()
@@ -266,106 +334,277 @@ class CurveFitting(QGroupBox):
             if main_window.filtered_df is None or main_window.filtered_df.empty:
                 raise ValueError("No data available for fitting")
 
-            # Get selected columns
+            data = main_window.filtered_df
             x_column = main_window.left_panel.axis_selection.x_combo.currentText()
-            y_items = main_window.left_panel.axis_selection.y_list.selectedItems()
-
-            if not y_items:
-                raise ValueError("No Y-axis selected")
+            y_columns = [item.text() for item in main_window.left_panel.axis_selection.y_list.selectedItems()]
+            columns = self.columns_to_fit(data, x_column, y_columns)
 
-            y_column = y_items[0].text()
+            logging.info(f"Selected columns - X: {x_column}, Y: {columns}")
 
-            logging.info(f"Selected columns - X: {x_column}, Y: {y_column}")
+            fit_type = self.fit_type.currentText()
+            degree = self.degree_spinbox.value()
+
+            # Warning for high-degree polynomials
+            if fit_type == 'Polynomial' and degree > 9:
+                reply = QMessageBox.question(
+                    self,
+                    "High Degree Warning",
+                    f"Degree {degree} polynomial may cause overfitting and numerical instability.\n\n"
+                    f"This can result in:\n"
+                    f"• Wild oscillations in the fitted curve\n"
+                    f"• Unreliable predictions\n"
+                    f"• Extreme coefficient values\n\n"
+                    f"Consider using a lower degree (1-9) for more stable results.\n\n"
+                    f"Continue anyway?",
+                    QMessageBox.Yes | QMessageBox.No,
+                    QMessageBox.No
+                )
+                if reply == QMessageBox.No:
+                    logging.info(f"User cancelled degree {degree} polynomial fit")
+                    return
+
+            read_xy = self._column_reader(data, x_column)
+
+            if self.fit_scope.currentText() != FIRST_SELECTED:
+                # Batch mode: fitted in the worker pool, plotted as each fit finishes
+                self.fit_results = {}
+                self._batch_x_column = x_column
+                self._batch_data_version = data.version
+                self.apply_fit_button.setText("Fitting...")
+                self.batch_fitter.start(columns, read_xy, fit_type, degree)
+                return
+
+            y_column = columns[0]
+            x_data, y_data = read_xy(y_column)
+            result = fit_column(y_column, x_data, y_data, fit_type, degree)
+
+            if fit_type == 'Polynomial' and result['rank'] < degree + 1:
+                logging.warning(f"Polynomial fit may be poorly conditioned for degree {degree}")
+                QMessageBox.warning(
+                    self,
+                    "Fitting Warning",
+                    f"The polynomial fit for degree {degree} may be poorly conditioned.\n"
+                    f"Results might be unreliable. Consider using a lower degree."
+                )
+
+            self.show_fit(result, x_column, data.version)
 
-            # Get data
-            x_data = main_window.filtered_df[x_column].values
-            y_data = main_window.filtered_df[y_column].values
+            QMessageBox.information(self, "Fit Applied",
+                                    f"Applied {result['name']} fit:\n\n{result['equation']}\n\n"
+                                    f"R-squared: {result['r_squared']:.4f}\n"
+                                    f"Residual RMS: {result['residual_rms']:.4g}")
 
-            # Remove any NaN or infinite values
-            mask = np.isfinite(x_data) & np.isfinite(y_data)
-            x_data = x_data[mask]
-            y_data = y_data[mask]
+        except Exception as e:
+            logging.exception(f"Error during curve fitting: {str(e)}")
+            QMessageBox.warning(self, "Fit Error", f"Error applying fit:\n\n{str(e)}")
 
-            if len(x_data) == 0 or len(y_data) == 0:
-                raise ValueError("No valid data points for fitting after removing NaN/inf values")
+    def columns_to_fit(self, data, x_column, y_columns):
+        """Y columns chosen by the fit column setting (the X column is never fitted)"""
+        scope = self.fit_scope.currentText()
+        if scope in (FIRST_SELECTED, ALL_SELECTED):
+            if not y_columns:
+                raise ValueError("No Y-axis selected")
+            columns = y_columns[:1] if scope == FIRST_SELECTED else y_columns
+        elif scope.startswith(GROUP_PREFIX):
+            group = scope[len(GROUP_PREFIX):] + '/'
+            columns = [column for column in data.columns if str(column).startswith(group)]
+        else:
+            columns = self._numeric_columns(data)
+
+        columns = [column for column in columns if column != x_column]
+        if not columns:
+            raise ValueError("No columns to fit")
+        return columns
 
-            fit_type = self.fit_type.currentText()
+    @staticmethod
+    def _numeric_columns(data):
+        """Columns of numeric type (all columns when the types are not known without reading them)"""
+        dtypes = getattr(getattr(data, 'base', data), 'dtypes', None)
+        if dtypes is None:
+            return list(data.columns)
+        return [column for column, dtype in zip(data.columns, dtypes)
+                if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)]
 
-            if fit_type == 'Polynomial':
-                degree = self.degree_spinbox.value()
-
-                # Check if we have enough data points
-                if len(x_data) <= degree:
-                    raise ValueError(f"Not enough data points for degree {degree} polynomial. "
-                                     f"Need at least {degree + 1} points, but only have {len(x_data)} points.")
-
-                # Warning for high-degree polynomials
-                if degree > 9:
-                    reply = QMessageBox.question(
-                        self,
-                        "High Degree Warning",
-                        f"Degree {degree} polynomial may cause overfitting and numerical instability.\n\n"
-                        f"This can result in:\n"
-                        f"• Wild oscillations in the fitted curve\n"
-                        f"• Unreliable predictions\n"
-                        f"• Extreme coefficient values\n\n"
-                        f"Consider using a lower degree (1-9) for more stable results.\n\n"
-                        f"Continue anyway?",
-                        QMessageBox.Yes | QMessageBox.No,
-                        QMessageBox.No
-                    )
-                    if reply == QMessageBox.No:
-                        logging.info(f"User cancelled degree {degree} polynomial fit")
-                        return
-
-                # Fit polynomial using numpy
-                try:
-                    coeffs = np.polyfit(x_data, y_data, degree)
-                    fit_func = np.poly1d(coeffs)
-                except np.RankWarning:
-                    logging.warning(f"Polynomial fit may be poorly conditioned for degree {degree}")
-                    QMessageBox.warning(
-                        self,
-                        "Fitting Warning",
-                        f"The polynomial fit for degree {degree} may be poorly conditioned.\n"
-                        f"Results might be unreliable. Consider using a lower degree."
-                    )
-                    coeffs = np.polyfit(x_data, y_data, degree)
-                    fit_func = np.poly1d(coeffs)
-
-                # Generate equation string
-                equation = self.generate_polynomial_equation(coeffs, degree)
-
-                # Calculate R-squared
-                y_pred = fit_func(x_data)
-                r_squared = self.calculate_r_squared(y_data, y_pred)
-
-                fit_type_name = f"Polynomial (degree {degree})"
-
-            elif fit_type == 'Exponential':
-                try:
-                    popt, _ = curve_fit(self.exponential_func, x_data, y_data, p0=[1, 0.1])
-                    fit_func = lambda x: self.exponential_func(x, *popt)
-                    equation = f"y = {popt[0]:.4f} * e^({popt[1]:.4f}x)"
-                    r_squared = self.calculate_r_squared(y_data, fit_func(x_data))
-                    fit_type_name = "Exponential"
-                except RuntimeError as e:
-                    raise ValueError(
-                        f"Exponential fit failed. The data may not follow an exponential pattern. Error: {str(e)}")
-
-            logging.info(f"{fit_type_name} fit successful. Equation: {equation}, R²: {r_squared:.4f}")
-
-            # Plot the results
-            main_window.right_panel.plot_area.apply_curve_fitting(
-                x_data, y_data, fit_func, equation, fit_type_name, x_column, y_column
-            )
+    @staticmethod
+    def _column_reader(data, x_column):
+        """
+        Function returning the X and Y data of a column as plotted: multi-rate
+        TDMS channels keep their own samples, other columns share one X array.
+        """
+        if hasattr(data, 'channel_xy') and data.is_multi_rate():
+            return lambda column: data.channel_xy(x_column, column)
+
+        x_data = data[x_column].values
+        return lambda column: (x_data, data[column].values)
+
+    def show_fit(self, result, x_column, data_version):
+        """Plot a fit_column result and keep it for the summary (with the X and data version it was fitted on)"""
+        # Nonlinear models come with their equation
+        if result['fit_type'] == 'Polynomial':
+            result['equation'] = self.generate_polynomial_equation(result['coeffs'], len(result['coeffs']) - 1)
+        result['x_column'] = x_column
+        result['data_version'] = data_version
+        self.fit_results[result['column']] = result
+
+        logging.info(f"{result['name']} fit of {result['column']} successful. "
+                     f"Equation: {result['equation']}, R²: {result['r_squared']:.4f}")
+
+        # Columns that are not plotted only go into the summary
+        plot_area = self.window().right_panel.plot_area
+        if not any(item['name'] == result['column'] for item in plot_area.plot_items):
+            return
+
+        # Only the X range is needed to draw the curve
+        plot_area.apply_curve_fitting(
+            np.asarray(result['x_range']), None, fit_function(result), result['equation'], result['name'],
+            x_column, result['column']
+        )
+
+    def on_column_fitted(self, result):
+        """A fit of the running batch finished"""
+        try:
+            self.show_fit(result, self._batch_x_column, self._batch_data_version)
+        except Exception as e:
+            logging.exception(f"Error showing fit of {result['column']}: {str(e)}")
+
+    def cancel_batch(self):
+        """Stop the running batch fit (it never reports back); fits already plotted stay"""
+        self.batch_fitter.cancel()
+        self.apply_fit_button.setText("Apply Fit")
+
+    def on_batch_finished(self, results, errors):
+        self.apply_fit_button.setText("Apply Fit")
+        lines = [f"{result['column']}: R² = {result['r_squared']:.4f}, RMS = {result['residual_rms']:.4g}"
+                 for result in results[:MAX_LISTED_FITS]]
+        if len(results) > MAX_LISTED_FITS:
+            lines.append(f"... and {len(results) - MAX_LISTED_FITS} more")
+        message = f"Fitted {len(results)} of {len(results) + len(errors)} columns.\n\n" + "\n".join(lines)
+        if errors:
+            message += "\n\nFailed:\n" + "\n".join(f"{column}: {error}" for column, error in errors[:MAX_LISTED_FITS])
+        message += "\n\nUse 'Export Fit Summary' to save the table of fits."
+        QMessageBox.information(self, "Batch Fit Finished", message)
 
-            QMessageBox.information(self, "Fit Applied",
-                                    f"Applied {fit_type_name} fit:\n\n{equation}\n\nR-squared: {r_squared:.4f}")
+    @staticmethod
+    def _fit_item_name(result):
+        """Name of the plot item of a fit (as given by apply_curve_fitting)"""
+        return f"{result['column']} - {result['name']} Fit"
 
+    def compute_bands(self):
+        """Bootstrap confidence and prediction bands of the plotted fits in the background"""
+        main_window = self.window()
+        try:
+            plot_area = main_window.right_panel.plot_area
+            plotted = {item['name'] for item in plot_area.plot_items if item.get('is_curve_fit')}
+            fits = [result for result in self.fit_results.values() if self._fit_item_name(result) in plotted]
+            if not fits:
+                QMessageBox.warning(self, "Warning", "No plotted fits. Please apply a fit first.")
+                return
+            if self.batch_fitter.is_busy():
+                QMessageBox.warning(self, "Warning", "Please wait until the running fits are finished.")
+                return
+
+            # The residuals only describe a fit on the rows it was fitted on
+            data = main_window.filtered_df
+            self._bands_skipped = [result['column'] for result in fits if result['data_version'] != data.version]
+            fits = [result for result in fits if result['data_version'] == data.version]
+            if not fits:
+                QMessageBox.warning(self, "Warning", "The data changed since the fits were applied "
+                                                     "(filter or file). Please apply the fits again.")
+                return
+            if self._bands_skipped:
+                logging.info(f"Bands skipped for fits of changed data: {self._bands_skipped}")
+
+            # Each fit is bootstrapped against the X it was fitted on
+            x_columns = {result['column']: result['x_column'] for result in fits}
+            readers = {x_column: self._column_reader(data, x_column) for x_column in set(x_columns.values())}
+
+            self._close_bands_progress()
+            progress = QProgressDialog("Computing confidence bands...", "Cancel", 0, 100, self)
+            progress.setWindowTitle("Confidence Bands")
+            progress.setWindowModality(Qt.NonModal)
+            progress.setMinimumDuration(500)
+            progress.setAutoClose(False)
+            progress.setAutoReset(False)
+            progress.setValue(0)
+            progress.canceled.connect(self.cancel_bands)
+            self._bands_progress_dialog = progress
+
+            self.bands_button.setText("Computing Bands...")
+            self.bootstrap_runner.start(fits, lambda column: readers[x_columns[column]](column),
+                                        self.bootstrap_method.currentText(), self.bootstrap_replicates.value())
         except Exception as e:
-            logging.exception(f"Error during curve fitting: {str(e)}")
-            QMessageBox.warning(self, "Fit Error", f"Error applying fit:\n\n{str(e)}")
+            logging.exception(f"Error computing confidence bands: {str(e)}")
+            self.cancel_bands()
+            QMessageBox.warning(self, "Bands Error", f"Error computing confidence bands:\n\n{str(e)}")
+
+    def release_fits(self):
+        """Stop the background fits and bands and forget the fits (their data is going away)"""
+        self.cancel_batch()
+        self.cancel_bands()
+        self.fit_results = {}
+
+    def cancel_bands(self):
+        """Stop the running bootstrap; bands already drawn stay"""
+        self.bootstrap_runner.cancel()
+        self.bands_button.setText("Compute Confidence Bands")
+        self._close_bands_progress()
+
+    def _close_bands_progress(self):
+        dialog = self._bands_progress_dialog
+        self._bands_progress_dialog = None
+        if dialog is not None:
+            dialog.canceled.disconnect()
+            dialog.close()
+            dialog.deleteLater()
+
+    def on_bands_progress(self, done, total):
+        if self._bands_progress_dialog is not None and total:
+            self._bands_progress_dialog.setValue(int(100 * done / total))
+
+    def on_bands_ready(self, result, bands):
+        """Bands of one fit are done"""
+        try:
+            self.window().right_panel.plot_area.apply_fit_bands(self._fit_item_name(result), bands)
+        except Exception as e:
+            logging.exception(f"Error showing bands of {result['column']}: {str(e)}")
+
+    def on_bands_finished(self, results, errors):
+        self.bands_button.setText("Compute Confidence Bands")
+        self._close_bands_progress()
+        message = (f"Computed {CONFIDENCE_LEVEL:.0%} confidence and prediction bands of "
+                   f"{len(results)} of {len(results) + len(errors)} fits "
+                   f"(resampling {self.bootstrap_method.currentText().lower()}, "
+                   f"{self.bootstrap_replicates.value()} replicates).")
+        if errors:
+            message += "\n\nFailed:\n" + "\n".join(f"{column}: {error}" for column, error in errors[:MAX_LISTED_FITS])
+        if self._bands_skipped:
+            message += ("\n\nSkipped, the data changed since fitting (apply the fit again):\n" +
+                        "\n".join(self._bands_skipped[:MAX_LISTED_FITS]))
+        QMessageBox.information(self, "Confidence Bands", message)
+
+    def export_summary(self):
+        """Save the equation, R² and residual RMS of the fits as CSV or Excel"""
+        if not self.fit_results:
+            QMessageBox.warning(self, "Warning", "No fits to export. Please apply a fit first.")
+            return
+
+        file_name, _ = QFileDialog.getSaveFileName(self, "Export Fit Summary", "fit_summary",
+                                                   "CSV Files (*.csv);;Excel Files (*.xlsx)")
+        if not file_name:
+            return
+        try:
+            summary = fit_summary_frame(list(self.fit_results.values()))
+            if file_name.endswith('.xlsx'):
+                summary.to_excel(file_name, sheet_name='Fit Summary', index=False)
+            else:
+                if not file_name.endswith('.csv'):
+                    file_name += '.csv'
+                summary.to_csv(file_name, sep=';', index=False)
+            logging.info(f"Fit summary exported to: {file_name}")
+            QMessageBox.information(self, "Success", f"Fit summary saved to:\n{file_name}")
+        except Exception as e:
+            logging.exception(f"Error exporting fit summary: {str(e)}")
+            QMessageBox.critical(self, "Error", f"An error occurred while exporting the fit summary: {str(e)}")
 
     def remove_fit(self):
         """Remove all curve fits from the plot"""
@@ -373,6 +612,9 @@ class CurveFitting(QGroupBox):
         main_window = self.window()
 
         try:
+            # Fits of a running batch would be plotted again
+            self.release_fits()
+
             # Call the plot area's remove_curve_fitting method
             main_window.right_panel.plot_area.remove_curve_fitting()
 
@@ -436,45 +678,12 @@ class CurveFitting(QGroupBox):
 
         return equation
 
-    @staticmethod
-    def exponential_func(x, a, b):
-        """Exponential function: y = a * e^(bx)"""
-        return a * np.exp(b * x)
-
-    @staticmethod
-    def calculate_r_squared(y_true, y_pred):
-        """
-        Calculate R-squared (coefficient of determination).
-
-        Parameters:
-        -----------
-        y_true : array-like
-            True values
-        y_pred : array-like
-            Predicted values
-
-        Returns:
-        --------
-        float : R-squared value, or 0.0 if undefined
-        """
-        ss_res = np.sum((y_true - y_pred) ** 2)
-        ss_tot = np.sum((y_true - np.mean(y_true)) ** 2)
-
-        # Handle edge cases
-        if ss_tot == 0:
-            # All y values are identical, R² is undefined
-            # Return 1.0 if perfect fit, 0.0 otherwise
-            if ss_res == 0:
-                return 1.0
-            else:
-                return 0.0
-
-        r_squared = 1 - (ss_res / ss_tot)
-
-        # Return as-is (can be negative for poor fits, which is diagnostic)
-        return r_squared
-
     def reset(self):
         """Reset the curve fitting controls to default values"""
         self.fit_type.setCurrentIndex(0)
-        self.degree_spinbox.setValue(1)
\ No newline at end of file
+        self.degree_spinbox.setValue(1)
+        self.fit_scope.setCurrentIndex(0)
+        self.bootstrap_method.setCurrentIndex(0)
+        self.bootstrap_replicates.setValue(200)
+        # Also closes the bands progress dialog; the runner would read the released data
+        self.release_fits()
\ No newline at end of file
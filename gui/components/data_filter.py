@@ -1,35 +1,178 @@
-from PyQt5.QtWidgets import QGroupBox, QFormLayout, QComboBox, QLineEdit, QPushButton, QMessageBox, QMainWindow
+from PyQt5.QtWidgets import QGroupBox, QVBoxLayout, QHBoxLayout, QComboBox, QLineEdit, QPushButton, QMessageBox, \
+    QMainWindow, QTableWidget, QHeaderView, QAbstractItemView
 import logging
 
+from utils.filter_engine import OPERATORS, CONNECTORS, FilterClause, FilterExpression
+
 
 class DataFilter(QGroupBox):
+    """Compound filter: one row per condition, joined by AND / OR"""
+
+    CONNECTOR_COL, COLUMN_COL, OPERATOR_COL, VALUE_COL, VALUE2_COL = range(5)
+
     def __init__(self, parent):
         super().__init__("Data Filter", parent)
-        self.layout = QFormLayout()
+        self.columns = []
+        self.layout = QVBoxLayout()
         self.setup_ui()
 
     def setup_ui(self):
-        self.filter_column = QComboBox()
-        self.layout.addRow("Column:", self.filter_column)
-
-        self.min_value = QLineEdit()
-        self.layout.addRow("Min Value:", self.min_value)
-
-        self.max_value = QLineEdit()
-        self.layout.addRow("Max Value:", self.max_value)
-
+        self.clause_table = QTableWidget(0, 5)
+        self.clause_table.setHorizontalHeaderLabels(["", "Column", "Condition", "Value / Min", "Max"])
+        self.clause_table.verticalHeader().setVisible(False)
+        self.clause_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.clause_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        header = self.clause_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(self.COLUMN_COL, QHeaderView.Stretch)
+        self.layout.addWidget(self.clause_table)
+
+        edit_layout = QHBoxLayout()
+        self.add_clause_button = QPushButton("Add Condition")
+        self.add_clause_button.clicked.connect(lambda: self.add_clause())
+        edit_layout.addWidget(self.add_clause_button)
+
+        self.remove_clause_button = QPushButton("Remove Condition")
+        self.remove_clause_button.clicked.connect(self.remove_clause)
+        edit_layout.addWidget(self.remove_clause_button)
+        self.layout.addLayout(edit_layout)
+
+        apply_layout = QHBoxLayout()
         self.apply_filter_button = QPushButton("Apply Filter")
         self.apply_filter_button.clicked.connect(self.apply_filter)
-        self.layout.addRow(self.apply_filter_button)
+        apply_layout.addWidget(self.apply_filter_button)
+
+        self.clear_filter_button = QPushButton("Clear Filter")
+        self.clear_filter_button.clicked.connect(self.clear_filter)
+        apply_layout.addWidget(self.clear_filter_button)
+        self.layout.addLayout(apply_layout)
 
         self.setLayout(self.layout)
+        self.add_clause()
+
+    # ------------------------------------------------------------------
+    # Clause rows
+    # ------------------------------------------------------------------
+
+    def add_clause(self, clause=None):
+        """Append a condition row, optionally filled from a FilterClause"""
+        row = self.clause_table.rowCount()
+        self.clause_table.insertRow(row)
+
+        connector = QComboBox()
+        connector.addItems(CONNECTORS)
+        self.clause_table.setCellWidget(row, self.CONNECTOR_COL, connector)
+
+        column = QComboBox()
+        column.addItems(self.columns)
+        self.clause_table.setCellWidget(row, self.COLUMN_COL, column)
+
+        operator = QComboBox()
+        operator.addItems(list(OPERATORS.keys()))
+        self.clause_table.setCellWidget(row, self.OPERATOR_COL, operator)
+
+        value = QLineEdit()
+        value2 = QLineEdit()
+        self.clause_table.setCellWidget(row, self.VALUE_COL, value)
+        self.clause_table.setCellWidget(row, self.VALUE2_COL, value2)
+
+        operator.currentTextChanged.connect(lambda op, v=value, v2=value2: self._update_value_fields(op, v, v2))
+
+        if clause is not None:
+            connector.setCurrentText(clause.connector)
+            if clause.column in self.columns:
+                column.setCurrentText(clause.column)
+            operator.setCurrentText(clause.op)
+            value.setText(self._format_value(clause.value))
+            value2.setText(self._format_value(clause.value2))
+        self._update_value_fields(operator.currentText(), value, value2)
+        self._update_connectors()
+
+    def remove_clause(self):
+        row = self.clause_table.currentRow()
+        if row < 0:
+            row = self.clause_table.rowCount() - 1
+        if row >= 0:
+            self.clause_table.removeRow(row)
+        if self.clause_table.rowCount() == 0:
+            self.add_clause()
+        self._update_connectors()
+
+    def _update_connectors(self):
+        # The first condition has nothing to join to
+        for row in range(self.clause_table.rowCount()):
+            self.clause_table.cellWidget(row, self.CONNECTOR_COL).setEnabled(row > 0)
+
+    @staticmethod
+    def _update_value_fields(op, value, value2):
+        n_values = OPERATORS.get(op, 1)
+        value.setEnabled(n_values >= 1)
+        value2.setEnabled(n_values == 2)
+
+    @staticmethod
+    def _format_value(value):
+        return "" if value is None else str(value)
+
+    @staticmethod
+    def _parse_value(text, label):
+        text = text.strip()
+        if not text:
+            return None
+        try:
+            return float(text)
+        except ValueError:
+            raise ValueError(f"Invalid number for {label}: '{text}'")
+
+    # ------------------------------------------------------------------
+    # Expression access
+    # ------------------------------------------------------------------
+
+    def get_expression(self):
+        """
+        Build the filter expression from the condition rows.
+
+        Rows without any value are ignored (NaN tests need none).
+
+        Returns:
+        --------
+        FilterExpression, or None if no condition is filled in
+        """
+        clauses = []
+        for row in range(self.clause_table.rowCount()):
+            column = self.clause_table.cellWidget(row, self.COLUMN_COL).currentText()
+            op = self.clause_table.cellWidget(row, self.OPERATOR_COL).currentText()
+            value_text = self.clause_table.cellWidget(row, self.VALUE_COL).text()
+            value2_text = self.clause_table.cellWidget(row, self.VALUE2_COL).text()
+            n_values = OPERATORS[op]
+
+            if not column:
+                continue
+            if n_values > 0 and not value_text.strip() and not (n_values == 2 and value2_text.strip()):
+                continue
+
+            value = self._parse_value(value_text, column) if n_values >= 1 else None
+            value2 = self._parse_value(value2_text, column) if n_values == 2 else None
+            connector = self.clause_table.cellWidget(row, self.CONNECTOR_COL).currentText() if clauses else 'AND'
+            clauses.append(FilterClause(column, op, value, value2, connector))
+
+        return FilterExpression(clauses) if clauses else None
+
+    def set_expression(self, expression):
+        self.clause_table.setRowCount(0)
+        for clause in (expression.clauses if expression else []):
+            self.add_clause(clause)
+        if self.clause_table.rowCount() == 0:
+            self.add_clause()
 
     def update_columns(self, columns):
-        current_text = self.filter_column.currentText()
-        self.filter_column.clear()
-        self.filter_column.addItems(columns)
-        if current_text in columns:
-            self.filter_column.setCurrentText(current_text)
+        self.columns = list(columns)
+        for row in range(self.clause_table.rowCount()):
+            combo = self.clause_table.cellWidget(row, self.COLUMN_COL)
+            current_text = combo.currentText()
+            combo.clear()
+            combo.addItems(self.columns)
+            if current_text in self.columns:
+                combo.setCurrentText(current_text)
 
     def apply_filter(self):
         try:
@@ -37,22 +180,12 @@ class DataFilter(QGroupBox):
             if not main_window:
                 raise Exception("Could not find MainWindow")
 
-            column = self.filter_column.currentText()
-            min_val = float(self.min_value.text()) if self.min_value.text() else None
-            max_val = float(self.max_value.text()) if self.max_value.text() else None
-
-            logging.info(f"Applying filter on column: {column}, min: {min_val}, max: {max_val}")
-
-            if not column:
-                raise ValueError("Please select a column to filter")
-
-            if min_val is None and max_val is None:
+            expression = self.get_expression()
+            if expression is None:
                 raise ValueError("Please enter at least one filter value")
 
-            if min_val is not None and max_val is not None and min_val > max_val:
-                raise ValueError("Min value must be less than or equal to Max value")
-
-            main_window.apply_data_filter(column, min_val, max_val)
+            logging.info(f"Applying filter: {expression}")
+            main_window.apply_filter_expression(expression)
         except ValueError as e:
             logging.error(f"Invalid input in DataFilter: {str(e)}")
             QMessageBox.warning(self, "Invalid Input", str(e))
@@ -60,6 +193,12 @@ class DataFilter(QGroupBox):
             logging.error(f"Unexpected error in DataFilter: {str(e)}")
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {str(e)}")
 
+    def clear_filter(self):
+        self.set_expression(None)
+        main_window = self.get_main_window()
+        if main_window:
+            main_window.clear_data_filter()
+
     def get_main_window(self):
         parent = self.parent()
         while parent is not None:
@@ -68,14 +207,15 @@ class DataFilter(QGroupBox):
             parent = parent.parent()
         return None
 
-
     def set_filter(self, column, min_value, max_value):
-        if column in [self.filter_column.itemText(i) for i in range(self.filter_column.count())]:
-            self.filter_column.setCurrentText(column)
-        self.min_value.setText(str(min_value) if min_value is not None else "")
-        self.max_value.setText(str(max_value) if max_value is not None else "")
+        """Single range condition (sessions saved before compound filters)"""
+        min_value = self._parse_value(str(min_value), column) if min_value not in (None, "") else None
+        max_value = self._parse_value(str(max_value), column) if max_value not in (None, "") else None
+        if min_value is None and max_value is None:
+            self.set_expression(None)
+            return
+        self.set_expression(FilterExpression([FilterClause(column, 'between', min_value, max_value)]))
 
     def reset(self):
-        self.filter_column.clear()
-        self.min_value.clear()
-        self.max_value.clear()
\ No newline at end of file
+        self.columns = []
+        self.set_expression(None)
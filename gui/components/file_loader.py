@@ -0,0 +1,85 @@
+import logging
+import os
+import traceback
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from utils.asc_utils import load_and_process_asc_file, load_and_process_csv_file, load_and_process_tdms_file, \
+    load_and_process_excel_file
+from utils.load_progress import LoadCancelled, LoadProgress
+
+SUPPORTED_EXTENSIONS = ('.asc', '.csv', '.tdms', '.xlsx', '.xls')
+
+
+class FileLoadWorker(QObject):
+    """
+    Loads one file on a worker thread.
+
+    Move the worker to a QThread and connect QThread.started to run(). The
+    result arrives through finished(file_path, df); cancel() may be called
+    from the GUI thread at any time and ends the load with cancelled().
+    """
+
+    progress = pyqtSignal(int)  # percent of the file consumed
+    finished = pyqtSignal(str, object)
+    failed = pyqtSignal(str, str)
+    cancelled = pyqtSignal(str)
+
+    def __init__(self, file_path, sheet_name=None, column_cache=None):
+        super().__init__()
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self.column_cache = column_cache
+        self._last_percent = -1
+        self.load_progress = LoadProgress(callback=self._report_progress)
+
+    def _report_progress(self, done, total):
+        percent = int(100 * done / total) if total else 0
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.progress.emit(percent)
+
+    def cancel(self):
+        self.load_progress.cancel()
+
+    def run(self):
+        try:
+            df = self._load()
+            self.load_progress.check_cancelled()
+            self.finished.emit(self.file_path, df)
+        except LoadCancelled:
+            logging.info(f"Loading of {self.file_path} cancelled")
+            self.cancelled.emit(self.file_path)
+        except Exception as e:
+            logging.error(f"Error loading file: {str(e)}")
+            logging.error(traceback.format_exc())
+            self.failed.emit(self.file_path, str(e))
+
+    def _load(self):
+        file_extension = os.path.splitext(self.file_path)[1].lower()
+
+        if file_extension == '.tdms':
+            # Channels are read on demand, so there is nothing to cache up front
+            return load_and_process_tdms_file(self.file_path)
+
+        variant = self.sheet_name or ''
+        if self.column_cache is not None:
+            df = self.column_cache.load(self.file_path, variant)
+            if df is not None:
+                self.progress.emit(100)
+                return df
+
+        if file_extension == '.asc':
+            df = load_and_process_asc_file(self.file_path, progress=self.load_progress)
+        elif file_extension == '.csv':
+            df = load_and_process_csv_file(self.file_path, progress=self.load_progress)
+        elif file_extension in ['.xlsx', '.xls']:
+            # openpyxl/xlrd give no progress, cancellation takes effect after the read
+            df = load_and_process_excel_file(self.file_path, self.sheet_name)
+        else:
+            raise ValueError(f"Unsupported file type: {file_extension}")
+
+        self.load_progress.check_cancelled()
+        if self.column_cache is not None and df is not None and len(df) > 0:
+            self.column_cache.store(self.file_path, df, variant)
+        return df
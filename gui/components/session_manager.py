@@ -2,9 +2,14 @@
 
 import pickle
 import logging
+
+import numpy as np
 from PyQt5.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
 from PyQt5.QtCore import Qt, QCoreApplication
 
+from utils.dataset import Dataset
+from utils.filter_engine import FilterExpression
+
 
 class SessionManager:
     def __init__(self, main_window):
@@ -23,8 +28,8 @@ class SessionManager:
                 progress.setValue(0)
 
                 session_data = {
+                    # The filtered view shares its base with df, pickle stores the data once
                     'df': self.main_window.df,
-                    'original_df': self.main_window.original_df,
                     'filtered_df': self.main_window.filtered_df,
                     'x_column': self.main_window.left_panel.axis_selection.x_combo.currentText(),
                     'y_columns': [item.text() for item in
@@ -33,11 +38,8 @@ class SessionManager:
                     'fit_type': self.main_window.left_panel.curve_fitting.fit_type.currentText(),
                     'comments': self.main_window.left_panel.comment_box.get_comments(),
                     'data_filter': {
-                        'column': self.main_window.left_panel.data_filter.filter_column.currentText(),
-                        'min_value': self.main_window.left_panel.data_filter.min_value.text(),
-                        'max_value': self.main_window.left_panel.data_filter.max_value.text(),
-                        'all_columns': [self.main_window.left_panel.data_filter.filter_column.itemText(i)
-                                        for i in range(self.main_window.left_panel.data_filter.filter_column.count())]
+                        'clauses': self._filter_clauses(),
+                        'all_columns': list(self.main_window.left_panel.data_filter.columns)
                     },
                     'statistics': self.main_window.right_panel.statistics_area.get_stats(),
                     'show_original_data': self.main_window.right_panel.plot_area.get_show_original_state(),
@@ -77,9 +79,9 @@ class SessionManager:
                 progress.setValue(50)
                 QCoreApplication.processEvents()
 
-                self.main_window.df = session_data['df']
-                self.main_window.original_df = session_data['original_df']
-                self.main_window.filtered_df = session_data['filtered_df']
+                self.main_window.release_dataset(self.main_window.df)
+                self.main_window.df = Dataset.from_frame(session_data['df'])
+                self.main_window.filtered_df = self._restore_filtered_view(session_data.get('filtered_df'))
 
                 self.main_window.left_panel.axis_selection.update_options(self.main_window.df.columns)
                 self.main_window.left_panel.axis_selection.x_combo.setCurrentText(session_data['x_column'])
@@ -95,11 +97,16 @@ class SessionManager:
 
                 # Load data filter settings
                 self.main_window.left_panel.data_filter.update_columns(session_data['data_filter']['all_columns'])
-                self.main_window.left_panel.data_filter.set_filter(
-                    session_data['data_filter']['column'],
-                    session_data['data_filter']['min_value'],
-                    session_data['data_filter']['max_value']
-                )
+                filter_data = session_data['data_filter']
+                if 'clauses' in filter_data:
+                    self.main_window.left_panel.data_filter.set_expression(
+                        FilterExpression.from_list(filter_data['clauses']))
+                else:
+                    self.main_window.left_panel.data_filter.set_filter(
+                        filter_data['column'],
+                        filter_data['min_value'],
+                        filter_data['max_value']
+                    )
 
                 # Load statistics
                 self.main_window.right_panel.statistics_area.set_stats(session_data['statistics'])
@@ -123,6 +130,33 @@ class SessionManager:
             finally:
                 progress.close()
 
+    def _filter_clauses(self):
+        """Filter conditions as plain dicts; incomplete input is not saved"""
+        try:
+            expression = self.main_window.left_panel.data_filter.get_expression()
+        except ValueError as e:
+            logging.warning(f"Data filter not saved: {str(e)}")
+            return []
+        return expression.to_list() if expression else []
+
+    def _restore_filtered_view(self, filtered_df):
+        """Filtered view of a session; older sessions stored it as a separate DataFrame"""
+        df = self.main_window.df
+        if filtered_df is None:
+            return df
+        if isinstance(filtered_df, Dataset):
+            return filtered_df
+
+        if not df.base.index.is_unique:
+            return Dataset.from_frame(filtered_df)
+
+        # Map the stored rows back onto the base to avoid keeping a second copy
+        positions = df.base.index.get_indexer(filtered_df.index)
+        if len(positions) == len(filtered_df) and (positions >= 0).all() \
+                and list(filtered_df.columns) == list(df.columns):
+            return df.take(np.sort(positions))
+        return Dataset.from_frame(filtered_df)
+
     def new_session(self):
         logging.info("Initiating new session")
         try:
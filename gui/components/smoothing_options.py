@@ -60,8 +60,8 @@ class SmoothingOptions(QGroupBox):
             'Exponential Moving Avg',  # Weighted recent data
             'Median Filter',  # Robust to outliers
             'Lowess (Local Regression)',  # Non-parametric
-            # 'Butterworth Filter',  # Frequency-based
-            # 'Bilateral Filter'  # Edge-preserving
+            'Butterworth Filter',  # Frequency-based
+            'Bilateral Filter'  # Edge-preserving
         ])
         self.smooth_method.setToolTip("Select smoothing algorithm")
         method_layout.addWidget(self.smooth_method)
@@ -147,7 +147,7 @@ class SmoothingOptions(QGroupBox):
         self.cutoff_freq.setValue(0.1)
         self.cutoff_freq.setSingleStep(0.01)
         self.cutoff_freq.setDecimals(3)
-        self.cutoff_freq.setToolTip("Cutoff frequency (normalized, 0-0.5)")
+        self.cutoff_freq.setToolTip("Cutoff frequency as a fraction of the Nyquist frequency (half the sample rate)")
         self.params_layout.addRow("Cutoff Frequency:", self.cutoff_freq)
 
         # Filter Order (for Butterworth)
@@ -184,6 +184,22 @@ class SmoothingOptions(QGroupBox):
         self.range_sigma.setToolTip("Range domain sigma")
         self.params_layout.addRow("Range Sigma:", self.range_sigma)
 
+        # Window in X units (for unevenly sampled data)
+        self.window_in_x = QCheckBox("Window in X units")
+        self.window_in_x.setToolTip("Define the window by X distance (e.g. seconds) instead of a number of "
+                                    "samples, for data with uneven sample spacing")
+        self.params_layout.addRow(self.window_in_x)
+
+        self.x_window = QDoubleSpinBox()
+        self.x_window.setRange(1e-6, 1e9)
+        self.x_window.setDecimals(6)
+        self.x_window.setValue(1.0)
+        self.x_window.setSingleStep(0.1)
+        self.x_window.setEnabled(False)
+        self.x_window.setToolTip("Window width in X units; the Gaussian filter uses a sigma of a quarter "
+                                 "of this width")
+        self.params_layout.addRow("X Window:", self.x_window)
+
         self.layout.addLayout(self.params_layout)
 
         # Separator
@@ -241,6 +257,9 @@ class SmoothingOptions(QGroupBox):
         self.lowess_frac.valueChanged.connect(self.params_changed.emit)
         self.spatial_sigma.valueChanged.connect(self.params_changed.emit)
         self.range_sigma.valueChanged.connect(self.params_changed.emit)
+        self.window_in_x.stateChanged.connect(self.update_x_window_enabled)
+        self.window_in_x.stateChanged.connect(self.params_changed.emit)
+        self.x_window.valueChanged.connect(self.params_changed.emit)
 
     def update_window_label(self, value):
         """Update window size label"""
@@ -255,6 +274,10 @@ class SmoothingOptions(QGroupBox):
         sigma_val = value / 10.0
         self.sigma_value_label.setText(f"{sigma_val:.1f}")
 
+    def update_x_window_enabled(self):
+        """The X window is only used while the window is set in X units"""
+        self.x_window.setEnabled(self.smooth_check.isChecked() and self.window_in_x.isChecked())
+
     def on_smoothing_toggled(self, state):
         """Enable/disable all controls based on smoothing checkbox"""
         enabled = bool(state)
@@ -268,6 +291,8 @@ class SmoothingOptions(QGroupBox):
         self.lowess_frac.setEnabled(enabled)
         self.spatial_sigma.setEnabled(enabled)
         self.range_sigma.setEnabled(enabled)
+        self.window_in_x.setEnabled(enabled)
+        self.update_x_window_enabled()
         self.light_button.setEnabled(enabled)
         self.medium_button.setEnabled(enabled)
         self.heavy_button.setEnabled(enabled)
@@ -281,8 +306,8 @@ class SmoothingOptions(QGroupBox):
             'Exponential Moving Avg': 'Weighted average favoring recent data. Good for trends.',
             'Median Filter': 'Replaces with median value. Excellent for spike removal.',
             'Lowess (Local Regression)': 'Local weighted regression. Adaptive to data.',
-            # 'Butterworth Filter': 'Frequency domain filter. Removes high-frequency noise.',
-            # 'Bilateral Filter': 'Edge-preserving smoothing. Maintains sharp transitions.'
+            'Butterworth Filter': 'Frequency domain filter. Removes high-frequency noise.',
+            'Bilateral Filter': 'Edge-preserving smoothing. Maintains sharp transitions.'
         }
         method = self.smooth_method.currentText()
         self.method_description.setText(descriptions.get(method, ''))
@@ -297,6 +322,8 @@ class SmoothingOptions(QGroupBox):
         # Show relevant parameters
         if method == 'Moving Average':
             self.show_param('window')
+            self.show_param('window_in_x')
+            self.show_param('x_window')
 
         elif method == 'Savitzky-Golay':
             self.show_param('window')
@@ -304,23 +331,28 @@ class SmoothingOptions(QGroupBox):
 
         elif method == 'Gaussian Filter':
             self.show_param('sigma')
+            self.show_param('window_in_x')
+            self.show_param('x_window')
 
         elif method == 'Exponential Moving Avg':
             self.show_param('alpha')
 
         elif method == 'Median Filter':
             self.show_param('window')
+            self.show_param('window_in_x')
+            self.show_param('x_window')
 
         elif method == 'Lowess (Local Regression)':
             self.show_param('lowess_frac')
-        #
-        # elif method == 'Butterworth Filter':
-        #     self.show_param('cutoff_freq')
-        #     self.show_param('filter_order')
-        #
-        # elif method == 'Bilateral Filter':
-        #     self.show_param('spatial_sigma')
-        #     self.show_param('range_sigma')
+
+        elif method == 'Butterworth Filter':
+            self.show_param('cutoff_freq')
+            self.show_param('filter_order')
+
+        elif method == 'Bilateral Filter':
+            self.show_param('window')
+            self.show_param('spatial_sigma')
+            self.show_param('range_sigma')
 
     def hide_all_params(self):
         """Hide all parameter inputs"""
@@ -356,7 +388,9 @@ class SmoothingOptions(QGroupBox):
             'filter_order': 5,
             'lowess_frac': 6,
             'spatial_sigma': 7,
-            'range_sigma': 8
+            'range_sigma': 8,
+            'window_in_x': 9,
+            'x_window': 10
         }
 
         if param_name in param_map:
@@ -418,7 +452,9 @@ class SmoothingOptions(QGroupBox):
             'filter_order': self.filter_order.value(),
             'lowess_frac': self.lowess_frac.value(),
             'spatial_sigma': self.spatial_sigma.value(),
-            'range_sigma': self.range_sigma.value()
+            'range_sigma': self.range_sigma.value(),
+            'window_in_x': self.window_in_x.isChecked(),
+            'x_window': self.x_window.value()
         }
 
     def set_params(self, params):
@@ -434,8 +470,8 @@ class SmoothingOptions(QGroupBox):
             'exponential_moving_avg': 'Exponential Moving Avg',
             'median_filter': 'Median Filter',
             'lowess_local_regression': 'Lowess (Local Regression)',
-            # 'butterworth_filter': 'Butterworth Filter',
-            # 'bilateral_filter': 'Bilateral Filter'
+            'butterworth_filter': 'Butterworth Filter',
+            'bilateral_filter': 'Bilateral Filter'
         }
 
         method_key = params.get('method', 'moving_average')
@@ -453,6 +489,8 @@ class SmoothingOptions(QGroupBox):
         self.lowess_frac.setValue(params.get('lowess_frac', 0.1))
         self.spatial_sigma.setValue(params.get('spatial_sigma', 5.0))
         self.range_sigma.setValue(params.get('range_sigma', 2.0))
+        self.window_in_x.setChecked(params.get('window_in_x', False))
+        self.x_window.setValue(params.get('x_window', 1.0))
 
     def reset(self):
         """Reset to default values"""
@@ -467,6 +505,8 @@ class SmoothingOptions(QGroupBox):
         self.lowess_frac.setValue(0.1)
         self.spatial_sigma.setValue(5.0)
         self.range_sigma.setValue(2.0)
+        self.window_in_x.setChecked(False)
+        self.x_window.setValue(1.0)
 
     def clear(self):
         """Clear (same as reset for this component)"""
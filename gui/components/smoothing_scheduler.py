@@ -0,0 +1,165 @@
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+import numpy as np
+
+from utils.asc_utils import apply_smoothing_params, apply_smoothing_params_batch
+from utils.decimation import M4Pyramid
+from utils.process_pool import default_worker_count
+
+# Quiet time after the last parameter change before smoothing starts
+DEBOUNCE_MS = 150
+
+
+def _smooth_curves(curves, smoothing_params, cancel_event, cache):
+    """
+    Smooth a block of snapshot entries (worker thread); None once the job
+    was superseded. Curves sharing their X data that are missing from the
+    cache are smoothed together in one batched call.
+    """
+    if cancel_event.is_set():
+        return None
+    smoothed = [cache.get(curve['cache_key']) for curve in curves]
+    groups = {}
+    for i, curve in enumerate(curves):
+        if smoothed[i] is None:
+            groups.setdefault(id(curve['x_data']), []).append(i)
+
+    for indexes in groups.values():
+        x_data = curves[indexes[0]]['x_data']
+        if len(indexes) == 1:
+            results = [apply_smoothing_params(curves[indexes[0]]['y_data_original'], smoothing_params, x=x_data)]
+        else:
+            stack = np.empty((len(x_data), len(indexes)), order='F')
+            for column, i in enumerate(indexes):
+                stack[:, column] = curves[i]['y_data_original']
+            batch = apply_smoothing_params_batch(stack, smoothing_params, x=x_data)
+            results = [batch[:, column].copy() for column in range(len(indexes))]
+        if cancel_event.is_set():
+            return None
+        for i, y_data in zip(indexes, results):
+            smoothed[i] = cache.put(curves[i]['cache_key'], y_data)
+
+    return [(curve, y_data, M4Pyramid(curve['x_data'], y_data)) for curve, y_data in zip(curves, smoothed)]
+
+
+class _SmoothingJob:
+    """Curves of one request, collected as the futures of their blocks finish"""
+
+    def __init__(self, generation, smoothing_params, n_curves, n_blocks):
+        self.generation = generation
+        self.smoothing_params = smoothing_params
+        self.cancel_event = threading.Event()
+        self.futures = []
+        self.results = [None] * n_curves
+        self.remaining = n_blocks
+        self.lock = threading.Lock()
+
+    def cancel(self):
+        self.cancel_event.set()
+        for future in self.futures:
+            future.cancel()
+
+
+class SmoothingScheduler(QObject):
+    """
+    Recomputes the smoothing of the plotted curves off the GUI thread.
+
+    request() may be called on every slider tick. Requests are debounced,
+    the columns are split into one block per worker and each block is
+    smoothed in one batched call on a thread pool (NumPy/SciPy release the
+    GIL, and the curves need no copying into other processes),
+    a new request cancels the job still running, and only the result of the
+    latest request is swapped into the plot.
+    """
+
+    # Emitted from a worker thread, delivered to the GUI thread
+    job_finished = pyqtSignal(object)
+
+    def __init__(self, plot_area, parent=None, debounce_ms=DEBOUNCE_MS, workers=None):
+        super().__init__(parent)
+        self.plot_area = plot_area
+        self.generation = 0
+        self._smoothing_params = None
+        self._job = None
+        self.workers = workers or default_worker_count()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='smoothing')
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self._start_job)
+        self.job_finished.connect(self._on_job_finished)
+
+    def request(self, smoothing_params):
+        """Schedule smoothing with these settings, replacing any earlier request"""
+        self._smoothing_params = dict(smoothing_params)
+        self.timer.start()
+
+    def is_busy(self):
+        return self.timer.isActive() or self._job is not None
+
+    def _start_job(self):
+        self.cancel()
+        curves = self.plot_area.smoothing_snapshot(self._smoothing_params)
+        if not curves:
+            return
+
+        if not self._smoothing_params.get('apply', False):
+            # Smoothing switched off: the raw curves are already at hand
+            self.plot_area.apply_smoothed_curves(self._smoothing_params, [(curve, None, None) for curve in curves])
+            return
+
+        self.generation += 1
+        blocks = [block for block in np.array_split(np.arange(len(curves)), self.workers) if len(block)]
+        job = _SmoothingJob(self.generation, self._smoothing_params, len(curves), len(blocks))
+        self._job = job
+        logging.info(f"Smoothing {len(curves)} curves in {len(blocks)} blocks (request {job.generation})")
+
+        for block in blocks:
+            future = self._executor.submit(_smooth_curves, [curves[i] for i in block], job.smoothing_params,
+                                           job.cancel_event, self.plot_area.smoothing_cache)
+            future.add_done_callback(lambda future, block=block: self._on_block_done(job, block, future))
+            job.futures.append(future)
+
+    def _on_block_done(self, job, block, future):
+        # Runs on the worker thread that finished the future
+        if future.cancelled() or job.cancel_event.is_set():
+            return
+        try:
+            results = future.result()
+        except Exception as e:
+            logging.error(f"Error smoothing curves: {str(e)}")
+            logging.error(traceback.format_exc())
+            results = None
+        with job.lock:
+            for i, result in zip(block, results or []):
+                job.results[i] = result
+            job.remaining -= 1
+            done = job.remaining == 0
+        if done:
+            self.job_finished.emit(job)
+
+    def _on_job_finished(self, job):
+        # A newer request was started while this one finished
+        if job is not self._job or job.cancel_event.is_set():
+            return
+        self._job = None
+        results = [result for result in job.results if result is not None]
+        self.plot_area.apply_smoothed_curves(job.smoothing_params, results)
+
+    def cancel(self):
+        """Drop the pending request and the running job; its curves are never swapped in"""
+        self.timer.stop()
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+
+    def shutdown(self):
+        self.timer.stop()
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -20,7 +20,11 @@ class StatisticsArea(QWidget):
         """Update statistics with caching to avoid redundant calculations"""
         if df is not None:
             # Create a hash of the dataframe to detect if it has changed
-            df_hash = hashlib.md5(pickle.dumps(df.values.tobytes())).hexdigest()
+            if hasattr(df, 'fingerprint'):
+                # Lazy TDMS data: hashing the values would read every channel
+                df_hash = df.fingerprint()
+            else:
+                df_hash = hashlib.md5(pickle.dumps(df.values.tobytes())).hexdigest()
 
             # Check if we already computed stats for this exact dataframe
             if df_hash == self._last_df_hash and self._last_df_hash is not None:
@@ -1,6 +1,8 @@
 import traceback
 
-from PyQt5.QtWidgets import QMainWindow, QHBoxLayout, QWidget, QFileDialog, QMessageBox, QAction, QDialog
+from PyQt5.QtWidgets import QMainWindow, QHBoxLayout, QWidget, QFileDialog, QMessageBox, QAction, QDialog, \
+    QProgressDialog
+from PyQt5.QtCore import Qt, QThread
 from PyQt5.QtGui import QDragEnterEvent, QDropEvent
 
 from gui.components.sheet_selection_dialog import SheetSelectionDialog
@@ -8,12 +10,19 @@ from gui.menu_bar import MenuBar
 from gui.tool_bar import ToolBar
 from gui.left_panel import LeftPanel
 from gui.right_panel import RightPanel
-from utils.asc_utils import load_and_process_asc_file, load_and_process_csv_file, load_and_process_tdms_file, \
-    load_and_process_excel_file, get_excel_sheets
+from utils.asc_utils import get_excel_sheets, apply_smoothing_params_batch
+import numpy as np
 import pandas as pd
 import logging
 import os
 from gui.components.session_manager import SessionManager
+from gui.components.file_loader import FileLoadWorker, SUPPORTED_EXTENSIONS
+from gui.components.smoothing_scheduler import SmoothingScheduler
+from utils.column_cache import ColumnCache
+from utils.dataset import Dataset
+from utils.filter_engine import FilterEngine, FilterClause, FilterExpression
+from utils.process_pool import default_worker_count
+from utils.tdms_utils import LazyTdmsFrame
 
 
 class MainWindow(QMainWindow):
@@ -26,8 +35,8 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.central_widget)
         self.layout = QHBoxLayout(self.central_widget)
 
+        # Loaded file (immutable Dataset) and the filtered view over it
         self.df = None
-        self.original_df = None
         self.filtered_df = None
         self.unsaved_changes = False
 
@@ -41,6 +50,17 @@ class MainWindow(QMainWindow):
         self.session_manager = SessionManager(self)
         self.current_file = None
 
+        # Parsed files are cached as memory-mapped columns
+        self.column_cache = ColumnCache()
+
+        # Compound data filters with cached clause masks
+        self.filter_engine = FilterEngine()
+
+        # Background file loading
+        self._load_thread = None
+        self._load_worker = None
+        self._load_progress_dialog = None
+
     def setup_menu_bar(self):
         self.menu_bar = MenuBar(self)
         self.setMenuBar(self.menu_bar)
@@ -59,11 +79,26 @@ class MainWindow(QMainWindow):
         self.layout.addWidget(self.right_panel, 4)
 
         # Connect smoothing parameter changes to auto-replot
+        self.smoothing_scheduler = SmoothingScheduler(self.right_panel.plot_area, self)
         self.left_panel.smoothing_options.params_changed.connect(self._on_smoothing_params_changed)
 
+    def release_dataset(self, df):
+        """Forget a dataset that is being replaced: file handles and cached curves"""
+        if df is None:
+            return
+        # Background fits and bands still read the old data, and their
+        # results must not be plotted onto same-named columns of the new one
+        self.left_panel.curve_fitting.release_fits()
+        # Smoothing of the old curves must not be swapped in after the switch
+        self.smoothing_scheduler.cancel()
+        # Release the open TDMS file handle
+        df.close()
+        self.filter_engine.clear()
+        self.right_panel.plot_area.smoothing_cache.invalidate(df.base_id)
+
     def clear_all_data(self):
+        self.release_dataset(self.df)
         self.df = None
-        self.original_df = None
         self.filtered_df = None
         self.unsaved_changes = False
 
@@ -97,14 +132,9 @@ class MainWindow(QMainWindow):
             try:
                 logging.info(f"Attempting to load file: {file_path}")
                 file_extension = os.path.splitext(file_path)[1].lower()
+                sheet_name = None
 
-                if file_extension == '.asc':
-                    self.df = load_and_process_asc_file(file_path)
-                elif file_extension == '.csv':
-                    self.df = load_and_process_csv_file(file_path)
-                elif file_extension == '.tdms':
-                    self.df = load_and_process_tdms_file(file_path)
-                elif file_extension in ['.xlsx', '.xls']:
+                if file_extension in ['.xlsx', '.xls']:
                     # Get list of sheets in the Excel file
                     sheet_names = get_excel_sheets(file_path)
 
@@ -115,41 +145,148 @@ class MainWindow(QMainWindow):
                     if len(sheet_names) > 1:
                         dialog = SheetSelectionDialog(sheet_names, self)
                         if dialog.exec_() == QDialog.Accepted:
-                            selected_sheet = dialog.get_selected_sheet()
-                            self.df = load_and_process_excel_file(file_path, selected_sheet)
-                            logging.info(f"Loaded sheet: {selected_sheet}")
+                            sheet_name = dialog.get_selected_sheet()
+                            logging.info(f"Selected sheet: {sheet_name}")
                         else:
                             logging.info("User cancelled sheet selection")
                             return
                     else:
                         # Only one sheet, load it directly
-                        self.df = load_and_process_excel_file(file_path, sheet_names[0])
-                        logging.info(f"Loaded single sheet: {sheet_names[0]}")
-                else:
+                        sheet_name = sheet_names[0]
+                elif file_extension not in SUPPORTED_EXTENSIONS:
                     raise ValueError(f"Unsupported file type: {file_extension}")
 
-                if self.df is None or len(self.df) == 0:
-                    raise ValueError("No data loaded from the file")
-
-                self.original_df = self.df.copy()
-                self.filtered_df = self.df.copy()
-                self.update_ui_after_load()
-
-                self.current_file = file_path
-                self.tool_bar.update_file_name(self.current_file)
-
-                # Set default title to filename without extension
-                filename_without_ext = os.path.splitext(os.path.basename(file_path))[0]
-                self.right_panel.plot_area.set_default_title(filename_without_ext)
-
-                logging.info(f"File loaded successfully. Shape: {self.df.shape}")
-                QMessageBox.information(self, "Success", "File loaded successfully!")
+                self._start_file_load(file_path, sheet_name)
             except Exception as e:
                 logging.error(f"Error loading file: {str(e)}")
                 QMessageBox.critical(self, "Error", f"An error occurred while loading the file: {str(e)}")
         else:
             logging.info("File loading cancelled by user")
 
+    def _start_file_load(self, file_path, sheet_name=None):
+        """Parse the file on a worker thread; the current data stays usable meanwhile"""
+        self._cancel_file_load()
+
+        thread = QThread(self)
+        worker = FileLoadWorker(file_path, sheet_name, self.column_cache)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.finished.connect(self._on_file_loaded)
+        worker.failed.connect(self._on_file_load_failed)
+        worker.cancelled.connect(self._on_file_load_cancelled)
+        for signal in (worker.finished, worker.failed, worker.cancelled):
+            signal.connect(thread.quit)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+
+        # Non-modal, so the previous dataset can still be explored
+        progress = QProgressDialog(f"Loading {os.path.basename(file_path)}...", "Cancel", 0, 100, self)
+        progress.setWindowTitle("Loading File")
+        progress.setWindowModality(Qt.NonModal)
+        progress.setMinimumDuration(500)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        progress.setValue(0)
+        worker.progress.connect(progress.setValue)
+        # Direct call: the worker's own event loop is busy until the load ends
+        progress.canceled.connect(self._cancel_file_load)
+
+        self._load_thread = thread
+        self._load_worker = worker
+        self._load_progress_dialog = progress
+        thread.start()
+
+    def _cancel_file_load(self):
+        """Cancel a running load; its result is ignored when it arrives"""
+        if self._load_worker is not None:
+            self._load_worker.cancel()
+        self._finish_file_load()
+
+    def _finish_file_load(self):
+        dialog = self._load_progress_dialog
+        self._load_worker = None
+        self._load_progress_dialog = None
+        if dialog is not None:
+            dialog.canceled.disconnect()
+            dialog.close()
+            dialog.deleteLater()
+
+    def _is_current_load(self):
+        return self._load_worker is not None and self.sender() is self._load_worker
+
+    def _on_file_loaded(self, file_path, df):
+        if not self._is_current_load():
+            # Superseded by a newer load
+            if isinstance(df, LazyTdmsFrame):
+                df.close()
+            return
+        self._finish_file_load()
+
+        try:
+            if df is None or len(df) == 0:
+                raise ValueError("No data loaded from the file")
+
+            previous_df = self.df
+            self.df = Dataset.from_frame(df)
+            self.release_dataset(previous_df)
+
+            # Filtering creates views over self.df, the data itself is never copied
+            self.filtered_df = self.df
+            self.update_ui_after_load()
+
+            self.current_file = file_path
+            self.tool_bar.update_file_name(self.current_file)
+
+            # Set default title to filename without extension
+            filename_without_ext = os.path.splitext(os.path.basename(file_path))[0]
+            self.right_panel.plot_area.set_default_title(filename_without_ext)
+
+            logging.info(f"File loaded successfully. Shape: {self.df.shape}")
+            QMessageBox.information(self, "Success", "File loaded successfully!")
+        except Exception as e:
+            logging.error(f"Error loading file: {str(e)}")
+            QMessageBox.critical(self, "Error", f"An error occurred while loading the file: {str(e)}")
+
+    def _on_file_load_failed(self, file_path, message):
+        if not self._is_current_load():
+            return
+        self._finish_file_load()
+        QMessageBox.critical(self, "Error", f"An error occurred while loading the file: {message}")
+
+    def _on_file_load_cancelled(self, file_path):
+        if self._is_current_load():
+            self._finish_file_load()
+        logging.info(f"File loading cancelled: {file_path}")
+
+    def closeEvent(self, event):
+        # Stop a running load so its thread is not destroyed while running
+        thread = self._load_thread
+        self._cancel_file_load()
+        try:
+            if thread is not None and thread.isRunning():
+                thread.wait(5000)
+        except RuntimeError:
+            # The thread object was already deleted after finishing
+            pass
+        self.smoothing_scheduler.shutdown()
+        self.left_panel.curve_fitting.cancel_batch()
+        self.left_panel.curve_fitting.cancel_bands()
+        super().closeEvent(event)
+
+    def purge_data_cache(self):
+        """Delete all cached parsed files after confirmation"""
+        size_mb = self.column_cache.total_size() / 1e6
+        reply = QMessageBox.question(
+            self, "Purge Data Cache",
+            f"Remove all cached measurement files ({size_mb:.1f} MB)?\n\n"
+            f"Files will be parsed again the next time they are opened.",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            freed = self.column_cache.purge()
+            QMessageBox.information(self, "Cache Purged", f"Freed {freed / 1e6:.1f} MB.")
+
     def setup_edit_actions(self):
         self.show_smoothing_options_action = QAction('Smoothing_options', self, checkable=True)
         self.show_smoothing_options_action.triggered.connect(self.toggle_smoothing_options)
@@ -192,6 +329,12 @@ class MainWindow(QMainWindow):
         if not x_column or not y_columns:
             return
 
+        if self.right_panel.plot_area.plot_items:
+            # Curves are already plotted: re-smooth them in the background,
+            # slider drags are merged into one recompute
+            self.smoothing_scheduler.request(self.left_panel.smoothing_options.get_params())
+            return
+
         # Trigger replot with new smoothing params
         self.left_panel.axis_selection.on_selection_changed()
 
@@ -209,6 +352,7 @@ class MainWindow(QMainWindow):
             columns = self.df.columns.tolist()
             self.left_panel.axis_selection.update_options(columns)
             self.left_panel.data_filter.update_columns(columns)
+            self.left_panel.curve_fitting.update_columns(columns)
             self.right_panel.statistics_area.update_stats(self.filtered_df)
         else:
             logging.warning("DataFrame is None or empty after loading")
@@ -286,16 +430,25 @@ class MainWindow(QMainWindow):
                         stats = self.df.describe()
                         stats.to_excel(writer, sheet_name='Original Statistics')
 
+                    # Smoothed copies of the selected Y columns, smoothed together
+                    x_column = self.left_panel.axis_selection.x_combo.currentText()
+                    y_columns = [item.text() for item in self.left_panel.axis_selection.y_list.selectedItems()]
+                    smoothing_params = self.left_panel.smoothing_options.get_params()
+                    if smoothing_params['apply'] and y_columns:
+                        data = self.filtered_df if self.filtered_df is not None and len(self.filtered_df) > 0 \
+                            else self.df
+                        smoothed = self._smoothed_columns(data, x_column, y_columns, smoothing_params)
+                        smoothed.to_excel(writer, sheet_name='Smoothed Data', index=False)
+
                     # Write current plot configuration
                     plot_config = pd.DataFrame({
-                        'X-axis': [self.left_panel.axis_selection.x_combo.currentText()],
-                        'Y-axes': [
-                            ', '.join([item.text() for item in self.left_panel.axis_selection.y_list.selectedItems()])],
-                        'Smoothing': [self.left_panel.smoothing_options.smooth_check.isChecked()],
+                        'X-axis': [x_column],
+                        'Y-axes': [', '.join(y_columns)],
+                        'Smoothing': [smoothing_params['apply']],
                         'Smoothing Method': [self.left_panel.smoothing_options.smooth_method.currentText()],
-                        'Window Size': [self.left_panel.smoothing_options.window_size.value()],
-                        'Polynomial Order': [self.left_panel.smoothing_options.poly_order.value()],
-                        'Gaussian Sigma': [self.left_panel.smoothing_options.sigma.value()],
+                        'Window Size': [smoothing_params['window_length']],
+                        'Polynomial Order': [smoothing_params['poly_order']],
+                        'Gaussian Sigma': [smoothing_params['sigma']],
 
                     })
                     plot_config.to_excel(writer, sheet_name='Plot Configuration', index=False)
@@ -308,43 +461,61 @@ class MainWindow(QMainWindow):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"An error occurred while exporting the table: {str(e)}")
 
-    def apply_data_filter(self, column, min_val, max_val):
+    @staticmethod
+    def _smoothed_columns(data, x_column, y_columns, smoothing_params):
+        """X column and the Y columns smoothed with smoothing_params (one batched call)"""
+        stack = np.empty((len(data), len(y_columns)), order='F')
+        for i, column in enumerate(y_columns):
+            stack[:, i] = data[column].values
+        x_data = data[x_column].values if x_column in data.columns else None
+        smoothed = apply_smoothing_params_batch(stack, smoothing_params,
+                                                workers=min(len(y_columns), default_worker_count()), x=x_data)
+
+        frame = pd.DataFrame({f"{column} (Smoothed)": smoothed[:, i] for i, column in enumerate(y_columns)})
+        if x_data is not None:
+            frame.insert(0, x_column, x_data)
+        return frame
 
+    def apply_data_filter(self, column, min_val, max_val):
+        """Filter on a single column range (min/max may be None for an open side)"""
+        if min_val is None and max_val is None:
+            self.clear_data_filter()
+            return
         try:
-
-            logging.info(f"Applying data filter: column={column}, min={min_val}, max={max_val}")
-
             # Validate column is a string, not a DataFrame or Series
             if not isinstance(column, str):
                 raise ValueError(f"Invalid column type: {type(column)}. Expected string.")
+            expression = FilterExpression([FilterClause(column, 'between', min_val, max_val)])
+        except ValueError as e:
+            logging.error(f"Error applying filter: {str(e)}")
+            QMessageBox.warning(self, "Filter Error", str(e))
+            return
+        self.apply_filter_expression(expression)
+
+    def apply_filter_expression(self, expression):
 
-            # Ensure column is not empty
-            if not column or not column.strip():
-                raise ValueError("Column name cannot be empty")
+        try:
+
+            logging.info(f"Applying data filter: {expression}")
 
-            if self.original_df is None or column not in self.original_df.columns:
-                raise ValueError(f"Column '{column}' not found in the dataframe")
+            if self.df is None:
+                raise ValueError("No data loaded")
 
-            self.filtered_df = self.original_df.copy()
+            for column in expression.columns():
+                # Ensure column is not empty
+                if not column or not column.strip():
+                    raise ValueError("Column name cannot be empty")
+                if column not in self.df.columns:
+                    raise ValueError(f"Column '{column}' not found in the dataframe")
 
-            # Apply filter using proper boolean mask combination to avoid DataFrame ambiguity
-            if min_val is not None and max_val is not None:
-                # Combine both conditions with & operator
-                # Create boolean mask first to ensure proper evaluation
-                mask = (self.filtered_df[column] >= min_val) & (self.filtered_df[column] <= max_val)
-                self.filtered_df = self.filtered_df[mask]
-            elif min_val is not None:
-                mask = self.filtered_df[column] >= min_val
-                self.filtered_df = self.filtered_df[mask]
-            elif max_val is not None:
-                mask = self.filtered_df[column] <= max_val
-                self.filtered_df = self.filtered_df[mask]
+            # Clause masks are cached per dataset, only changed clauses are evaluated
+            self.filtered_df = self.filter_engine.apply(self.df, expression)
 
             # Check if filtered DataFrame is valid and not empty
             if self.filtered_df is not None and len(self.filtered_df) == 0:
                 raise ValueError("No data points in the selected range")
 
-            logging.info(f"Filter applied. Rows before: {len(self.original_df)}, after: {len(self.filtered_df)}")
+            logging.info(f"Filter applied. Rows before: {len(self.df)}, after: {len(self.filtered_df)}")
 
             # Applying statistics update over the applied filter
             self.update_statistics()
@@ -355,12 +526,20 @@ class MainWindow(QMainWindow):
             logging.error(f"Error applying filter: {str(e)}")
             logging.error(traceback.format_exc())
             QMessageBox.warning(self, "Filter Error", str(e))
-            self.filtered_df = self.original_df.copy()
+            self.filtered_df = self.df
         except Exception as e:
             logging.error(f"Unexpected error applying filter: {str(e)}")
             logging.error(traceback.format_exc())
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {str(e)}")
-            self.filtered_df = self.original_df.copy()
+            self.filtered_df = self.df
+
+    def clear_data_filter(self):
+        if self.df is None:
+            return
+        self.filtered_df = self.df
+        logging.info("Data filter cleared")
+        self.update_statistics()
+        self.update_plot(update_filter=False)
 
     def update_plot(self, update_filter=True):
 
@@ -373,21 +552,9 @@ class MainWindow(QMainWindow):
 
                 # Apply data filter if needed
                 if update_filter:
-                    filter_column = self.left_panel.data_filter.filter_column.currentText()
-                    min_value = self.left_panel.data_filter.min_value.text()
-                    max_value = self.left_panel.data_filter.max_value.text()
-
-                    # Ensure filter_column is a string to avoid DataFrame boolean evaluation
-                    # Check if filter values are provided before applying filter
-                    if isinstance(filter_column, str) and filter_column.strip():
-                        # Check if at least one value is provided and non-empty
-                        has_min = isinstance(min_value, str) and min_value.strip()
-                        has_max = isinstance(max_value, str) and max_value.strip()
-
-                        if has_min or has_max:
-                            self.apply_data_filter(filter_column,
-                                                   float(min_value) if has_min else None,
-                                                   float(max_value) if has_max else None)
+                    expression = self.left_panel.data_filter.get_expression()
+                    if expression is not None:
+                        self.apply_filter_expression(expression)
 
                 self.right_panel.plot_area.plot_data(self.filtered_df, x_column, y_columns, smoothing_params,
                                                      limit_lines=[])
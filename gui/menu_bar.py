@@ -45,6 +45,12 @@ class MenuBar(QMenuBar):
 
         self.file_menu.addSeparator()
 
+        purge_cache_action = QAction('Purge Data Cache', self)
+        purge_cache_action.triggered.connect(self.main_window.purge_data_cache)
+        self.file_menu.addAction(purge_cache_action)
+
+        self.file_menu.addSeparator()
+
         exit_action = QAction('Exit', self)
         exit_action.triggered.connect(self.main_window.close)
         self.file_menu.addAction(exit_action)
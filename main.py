@@ -1,6 +1,7 @@
 from PyQt5.QtWidgets import QApplication
 from gui.main_window import MainWindow
 import logging
+import multiprocessing
 import sys
 def setup_logging():
     logging.basicConfig(level=logging.DEBUG,
@@ -21,4 +22,6 @@ def main():
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
+    # Needed for the parsing process pool in the frozen (PyInstaller) executable
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
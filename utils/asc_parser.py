@@ -0,0 +1,635 @@
+"""
+Columnar ASC parser.
+
+Locates the header and the data block exactly like the original line based
+loader, then hands the raw data block to the pandas C tokenizer which converts
+decimal-comma values straight into contiguous float columns in one pass.
+
+Large files are split into newline-aligned byte ranges and parsed in the
+shared process pool; the CSV loader uses the same machinery.
+"""
+
+import codecs
+import csv
+import io
+import logging
+import os
+import re
+import time
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from utils.encoding_utils import detect_encoding, store_encoding
+from utils.load_progress import LoadProgress
+from utils.process_pool import default_worker_count, get_process_pool, shutdown_process_pool
+
+# Same rule as the original loader: a data line starts with a number-like
+# token followed by a tab.
+DATA_LINE_PATTERN = re.compile(r'^[\d,.]+\t')
+
+# Maximum number of lines scanned while looking for the start of the data
+HEADER_SCAN_LIMIT = 10000
+
+# Chunk size used when validating the field count of every data line
+VALIDATION_CHUNK_BYTES = 16 * 1024 * 1024
+
+# Bytes read from the start of the file to find the header in parallel mode
+HEADER_SCAN_BYTES = 4 * 1024 * 1024
+
+# Files above this size are parsed in parallel when workers is not given
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+
+# Target size of one byte range handed to a worker process
+PARALLEL_CHUNK_BYTES = 32 * 1024 * 1024
+
+# Slice size of the single-process parse; progress and cancellation are
+# handled between slices
+SERIAL_SLICE_BYTES = 8 * 1024 * 1024
+
+NEWLINE = 10
+TAB = 9
+
+
+def deduplicate_columns(header):
+    """
+    Strip column names and rename duplicates as name_1, name_2, ...
+
+    Parameters:
+    -----------
+    header : list of str
+        Raw header fields
+
+    Returns:
+    --------
+    list of str : Unique column names
+    """
+    new_header = []
+    seen = {}
+    for item in header:
+        item = item.strip()  # Remove leading/trailing whitespace
+        if item in seen:
+            seen[item] += 1
+            new_header.append(f"{item}_{seen[item]}")
+        else:
+            seen[item] = 0
+            new_header.append(item)
+    return new_header
+
+
+def locate_data_block(raw_data, encoding):
+    """
+    Find the header line and the byte offset where the data block starts.
+
+    Only the lines in front of the data are decoded, the data block itself is
+    never split into Python strings.
+
+    Parameters:
+    -----------
+    raw_data : bytes
+        Complete file content
+    encoding : str
+        Text encoding used to decode the header
+
+    Returns:
+    --------
+    tuple : (header fields, byte offset of the first data line)
+    """
+    previous_line = None
+    position = 0
+    for _ in range(HEADER_SCAN_LIMIT):
+        end = raw_data.find(b'\n', position)
+        if end == -1:
+            end = len(raw_data)
+        line = raw_data[position:end].decode(encoding, errors='replace')
+
+        # Check if the line contains tab-separated values and starts with a number-like string
+        if '\t' in line and DATA_LINE_PATTERN.match(line.strip()):
+            if previous_line is None:
+                # Data without a header line, same as the original loader
+                break
+            return previous_line.split('\t'), position
+
+        previous_line = line
+        position = end + 1
+        if position >= len(raw_data):
+            break
+
+    raise ValueError("Could not find the start of data in the file.")
+
+
+def _line_bounds(buffer, offset, end):
+    """Return start and stop positions of all lines in buffer[offset:end]"""
+    newlines = np.flatnonzero(buffer[offset:end] == NEWLINE) + offset
+    starts = np.concatenate(([offset], newlines + 1))
+    stops = np.concatenate((newlines, [end]))
+    # Drop the empty remainder after a trailing newline
+    if starts[-1] >= end:
+        starts, stops = starts[:-1], stops[:-1]
+    return starts, stops
+
+
+def find_invalid_lines(block, n_columns):
+    """
+    Count the fields of every line in the data block and report mismatches.
+
+    The original loader silently dropped rows whose field count differs from
+    the header. The count is done on the raw bytes in chunks so it never
+    allocates more than a few arrays of VALIDATION_CHUNK_BYTES.
+
+    Parameters:
+    -----------
+    block : bytes
+        Data block (everything after the header)
+    n_columns : int
+        Expected number of fields per line
+
+    Returns:
+    --------
+    tuple : (line starts, line stops, boolean mask of valid lines)
+    """
+    buffer = np.frombuffer(block, dtype=np.uint8)
+    all_starts, all_stops, all_valid = [], [], []
+
+    chunk_start = 0
+    total = len(buffer)
+    while chunk_start < total:
+        chunk_end = min(chunk_start + VALIDATION_CHUNK_BYTES, total)
+        if chunk_end < total:
+            # Extend the chunk to the next newline so lines are never cut
+            next_newline = block.find(b'\n', chunk_end)
+            chunk_end = total if next_newline == -1 else next_newline + 1
+
+        starts, stops = _line_bounds(buffer, chunk_start, chunk_end)
+        if len(starts):
+            chunk = buffer[chunk_start:chunk_end]
+            is_tab = (chunk == TAB).astype(np.int32)
+            tabs = np.add.reduceat(is_tab, starts - chunk_start)
+            # reduceat returns the single element for empty lines, correct for those
+            empty = starts == stops
+            tabs[empty] = 0
+
+            # Blank (whitespace only) lines are skipped like line.strip() did
+            valid = (tabs == n_columns - 1) | empty
+            all_starts.append(starts)
+            all_stops.append(stops)
+            all_valid.append(valid)
+
+        chunk_start = chunk_end
+
+    if not all_starts:
+        empty_positions = np.zeros(0, dtype=np.int64)
+        return empty_positions, empty_positions, np.zeros(0, dtype=bool)
+    return np.concatenate(all_starts), np.concatenate(all_stops), np.concatenate(all_valid)
+
+
+def drop_invalid_lines(block, starts, stops, valid):
+    """Rebuild the data block from runs of consecutive valid lines"""
+    # Boundaries of runs of valid lines
+    edges = np.diff(np.concatenate(([False], valid, [False])).astype(np.int8))
+    run_starts = np.flatnonzero(edges == 1)
+    run_stops = np.flatnonzero(edges == -1) - 1
+
+    parts = []
+    for first, last in zip(run_starts, run_stops):
+        parts.append(block[starts[first]:stops[last]])
+        parts.append(b'\n')
+    return b''.join(parts)
+
+
+def detect_decimal(block):
+    """Return ',' if the first data line uses a decimal comma, '.' otherwise"""
+    first_line = block[:block.find(b'\n')] if b'\n' in block else block
+    return ',' if b',' in first_line else '.'
+
+
+def parse_data_block(block, columns, encoding, dtype=np.float64, decimal=','):
+    """
+    Convert a tab separated data block into a DataFrame of float columns.
+
+    The fast path parses everything in the C tokenizer. Columns with
+    non-numeric cells fall back to the original replace + to_numeric
+    conversion, which coerces bad cells to NaN.
+
+    Parameters:
+    -----------
+    block : bytes
+        Data lines, tab separated
+    columns : list of str
+        Column names
+    encoding : str
+        Text encoding of the block
+    dtype : numpy dtype
+        float64 or float32
+    decimal : str
+        Decimal separator used in the block
+
+    Returns:
+    --------
+    pandas.DataFrame
+    """
+    read_options = dict(
+        sep='\t',
+        decimal=decimal,
+        header=None,
+        names=columns,
+        engine='c',
+        encoding=encoding,
+        quoting=csv.QUOTE_NONE,
+        skip_blank_lines=True,
+        index_col=False,
+    )
+    try:
+        return pd.read_csv(io.BytesIO(block), dtype=dtype, **read_options)
+    except UnicodeDecodeError:
+        raise
+    except ValueError:
+        logging.info("ASC data block contains non-numeric cells, converting affected columns")
+
+    df = pd.read_csv(io.BytesIO(block), **read_options)
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            cleaned = df[col].astype(str).str.replace(',', '.', regex=False)
+            df[col] = pd.to_numeric(cleaned, errors='coerce')
+    return df.astype(dtype, copy=False)
+
+
+def read_raw_file(file_name):
+    """Read the complete file as bytes"""
+    with open(file_name, 'rb') as file:
+        return file.read()
+
+
+def read_byte_range(file_name, start, stop):
+    """Read bytes [start, stop) of a file"""
+    with open(file_name, 'rb') as file:
+        file.seek(start)
+        return file.read(stop - start)
+
+
+def resolve_encoding(file_name):
+    """Detected encoding of a file, 'latin-1' if Python does not know it"""
+    encoding = detect_encoding(file_name)
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        encoding = 'latin-1'
+    return encoding
+
+
+def is_wide_encoding(encoding):
+    """True for encodings whose lines cannot be split on newline bytes"""
+    return codecs.lookup(encoding).name.startswith(('utf-16', 'utf-32'))
+
+
+def parse_checked_block(block, columns, encoding, dtype=np.float64, decimal=','):
+    """
+    Drop lines with a wrong field count and parse the rest.
+
+    Returns:
+    --------
+    tuple : (DataFrame, encoding actually used, number of dropped lines)
+    """
+    starts, stops, valid = find_invalid_lines(block, len(columns))
+    n_dropped = int(np.count_nonzero(~valid))
+    if n_dropped:
+        block = drop_invalid_lines(block, starts, stops, valid)
+
+    try:
+        df = parse_data_block(block, columns, encoding, dtype=dtype, decimal=decimal)
+    except UnicodeDecodeError:
+        # The encoding guess only held for the start of the file
+        logging.warning(f"Could not decode ASC data as {encoding}, retrying with latin-1")
+        encoding = 'latin-1'
+        df = parse_data_block(block, columns, encoding, dtype=dtype, decimal=decimal)
+    return df, encoding, n_dropped
+
+
+def newline_aligned_ranges(file_name, start, stop, n_chunks):
+    """
+    Split bytes [start, stop) of a file into ranges that end on a newline.
+
+    Only a few bytes around each tentative boundary are read, the data
+    itself stays on disk until a worker reads its own range.
+
+    Returns:
+    --------
+    list of (start, stop) tuples
+    """
+    bounds = [start]
+    with open(file_name, 'rb') as file:
+        for i in range(1, n_chunks):
+            target = start + (stop - start) * i // n_chunks
+            if target <= bounds[-1]:
+                continue
+
+            file.seek(target)
+            position = target
+            boundary = stop
+            while position < stop:
+                piece = file.read(64 * 1024)
+                if not piece:
+                    break
+                newline = piece.find(b'\n')
+                if newline != -1:
+                    boundary = position + newline + 1
+                    break
+                position += len(piece)
+
+            if bounds[-1] < boundary < stop:
+                bounds.append(boundary)
+    bounds.append(stop)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def block_line_ranges(block, slice_bytes):
+    """Split an in-memory block into (start, stop) ranges of about slice_bytes ending on a newline"""
+    ranges = []
+    start = 0
+    while start < len(block):
+        stop = block.find(b'\n', start + slice_bytes)
+        stop = len(block) if stop == -1 else stop + 1
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _collect_in_order(futures, ranges, progress):
+    """Wait for pool futures, reporting bytes per finished range; cancel the rest on LoadCancelled or an error"""
+    index = {future: i for i, future in enumerate(futures)}
+    results = [None] * len(futures)
+    try:
+        for future in as_completed(futures):
+            i = index[future]
+            results[i] = future.result()
+            start, stop = ranges[i]
+            progress.advance(stop - start)
+    except Exception:
+        for future in futures:
+            future.cancel()
+        raise
+    return results
+
+
+def plan_chunks(data_bytes, workers):
+    """Number of byte ranges for a parallel parse (a few per worker for load balancing)"""
+    by_size = max(1, data_bytes // PARALLEL_CHUNK_BYTES)
+    return int(min(max(workers, by_size), workers * 4))
+
+
+def _parse_asc_byte_range(file_name, start, stop, columns, encoding, dtype_name, decimal):
+    """Process pool task: parse one newline-aligned byte range into a 2-D array"""
+    block = read_byte_range(file_name, start, stop)
+    df, used_encoding, n_dropped = parse_checked_block(block, columns, encoding,
+                                                       dtype=np.dtype(dtype_name), decimal=decimal)
+    return df.to_numpy(dtype=dtype_name), used_encoding, n_dropped
+
+
+def stitch_column_blocks(parts, columns, dtype):
+    """
+    Concatenate row blocks into one DataFrame with contiguous columns.
+
+    The blocks are copied once into a Fortran ordered array, so every column
+    of the resulting DataFrame is a contiguous slice.
+    """
+    n_rows = sum(len(part) for part in parts)
+    out = np.empty((n_rows, len(columns)), dtype=dtype, order='F')
+    row = 0
+    for part in parts:
+        out[row:row + len(part)] = part
+        row += len(part)
+    return pd.DataFrame(out, columns=columns, copy=False)
+
+
+def parse_asc_file_parallel(file_name, dtype=np.float64, workers=None, progress=None):
+    """
+    Parse an ASC export by splitting its data block across worker processes.
+
+    The header is located in the first part of the file only. The data block
+    is cut into newline-aligned byte ranges, every worker reads and parses its
+    own range and the column blocks are stitched back together in file order.
+
+    Parameters:
+    -----------
+    file_name : str
+        Path to the ASC file
+    dtype : numpy dtype
+        Column dtype
+    workers : int, optional
+        Number of worker processes (default: all CPU cores)
+    progress : LoadProgress, optional
+        Receives the bytes of every finished range, and can cancel the parse
+
+    Returns:
+    --------
+    tuple : (DataFrame, dict of per-phase timings in seconds)
+    """
+    timings = {}
+    started = time.perf_counter()
+    workers = workers or default_worker_count()
+    file_size = os.path.getsize(file_name)
+    progress = progress or LoadProgress()
+    progress.set_total(file_size)
+
+    encoding = resolve_encoding(file_name)
+    if is_wide_encoding(encoding):
+        raise ValueError(f"Parallel parsing does not support {encoding} files")
+    timings['encoding'] = time.perf_counter() - started
+
+    phase_start = time.perf_counter()
+    head = read_byte_range(file_name, 0, min(file_size, HEADER_SCAN_BYTES))
+    header, data_offset = locate_data_block(head, encoding)
+    columns = deduplicate_columns(header)
+    decimal = detect_decimal(head[data_offset:])
+    ranges = newline_aligned_ranges(file_name, data_offset, file_size, plan_chunks(file_size - data_offset, workers))
+    timings['header'] = time.perf_counter() - phase_start
+
+    phase_start = time.perf_counter()
+    pool = get_process_pool(workers)
+    dtype_name = np.dtype(dtype).name
+    progress.advance(data_offset)
+    futures = [pool.submit(_parse_asc_byte_range, file_name, start, stop, columns, encoding, dtype_name, decimal)
+               for start, stop in ranges]
+    results = _collect_in_order(futures, ranges, progress)
+    timings['parse'] = time.perf_counter() - phase_start
+
+    phase_start = time.perf_counter()
+    df = stitch_column_blocks([part for part, _, _ in results], columns, dtype)
+    timings['stitch'] = time.perf_counter() - phase_start
+
+    n_dropped = sum(dropped for _, _, dropped in results)
+    if n_dropped:
+        logging.info(f"Dropped {n_dropped} lines with a field count different from the header")
+    if any(used != encoding for _, used, _ in results):
+        store_encoding(file_name, 'latin-1')
+
+    logging.info(f"Parsed {len(ranges)} byte ranges on {workers} workers")
+    timings['total'] = time.perf_counter() - started
+    return df, timings
+
+
+def parse_asc_file(file_name, dtype=np.float64, workers=None, progress=None):
+    """
+    Parse an ASC export into a DataFrame of contiguous float columns.
+
+    Parameters:
+    -----------
+    file_name : str
+        Path to the ASC file
+    dtype : numpy dtype
+        Column dtype, float64 (default) or float32 to halve memory
+    workers : int, optional
+        Worker processes for the parallel mode. None picks the parallel mode
+        automatically for files above PARALLEL_MIN_BYTES, 1 forces a
+        single-process parse.
+    progress : LoadProgress, optional
+        Receives the bytes consumed so far; raises LoadCancelled from the
+        parse when cancelled
+
+    Returns:
+    --------
+    tuple : (DataFrame, dict of per-phase timings in seconds)
+    """
+    if use_parallel_parse(file_name, workers):
+        try:
+            return parse_asc_file_parallel(file_name, dtype=dtype, workers=workers, progress=progress)
+        except BrokenProcessPool as e:
+            shutdown_process_pool()
+            logging.warning(f"Process pool failed ({str(e)}), parsing in a single process")
+        except ValueError as e:
+            logging.info(f"Parallel parse not possible ({str(e)}), parsing in a single process")
+
+    timings = {}
+    started = time.perf_counter()
+    progress = progress or LoadProgress()
+    progress.set_total(os.path.getsize(file_name))
+
+    raw_data = read_raw_file(file_name)
+    timings['read'] = time.perf_counter() - started
+
+    phase_start = time.perf_counter()
+    encoding = resolve_encoding(file_name)
+    if is_wide_encoding(encoding):
+        # Wide encodings cannot be split on newline bytes, transcode once
+        raw_data = raw_data.decode(encoding).encode('utf-8')
+        encoding = 'utf-8'
+        progress.set_total(len(raw_data))
+    timings['encoding'] = time.perf_counter() - phase_start
+
+    phase_start = time.perf_counter()
+    header, data_offset = locate_data_block(raw_data, encoding)
+    columns = deduplicate_columns(header)
+    block = raw_data[data_offset:]
+    del raw_data
+    timings['header'] = time.perf_counter() - phase_start
+    progress.advance(data_offset)
+
+    phase_start = time.perf_counter()
+    decimal = detect_decimal(block)
+    ranges = block_line_ranges(block, SERIAL_SLICE_BYTES)
+    parts = []
+    n_dropped = 0
+    used_encodings = set()
+    for start, stop in ranges:
+        part, used_encoding, dropped = parse_checked_block(block[start:stop] if len(ranges) > 1 else block,
+                                                           columns, encoding, dtype=dtype, decimal=decimal)
+        parts.append(part)
+        n_dropped += dropped
+        used_encodings.add(used_encoding)
+        progress.advance(stop - start)
+
+    if len(parts) == 1:
+        df = parts[0]
+    else:
+        # Slices are copied once into contiguous columns, as in the parallel parse
+        df = stitch_column_blocks([part.to_numpy(dtype=dtype) for part in parts], columns, dtype)
+
+    if n_dropped:
+        logging.info(f"Dropped {n_dropped} lines with a field count different from the header")
+    if used_encodings - {encoding}:
+        store_encoding(file_name, 'latin-1')
+    timings['parse'] = time.perf_counter() - phase_start
+
+    timings['total'] = time.perf_counter() - started
+    return df, timings
+
+
+def _parse_csv_byte_range(file_name, start, stop, columns, encoding):
+    """Process pool task: parse one newline-aligned byte range of a CSV file"""
+    block = read_byte_range(file_name, start, stop)
+    # A quoted field may hold a newline the range boundaries cut through
+    if b'"' in block:
+        raise ValueError("File contains quoted fields")
+    return pd.read_csv(io.BytesIO(block), header=None, names=columns, encoding=encoding, index_col=False)
+
+
+def parse_csv_file_parallel(file_name, encoding, workers=None, progress=None):
+    """
+    Parse a CSV file by splitting its rows across worker processes.
+
+    Only plain CSV files qualify: the header must be the first line and no
+    quote characters may appear (a quoted field could contain a newline and
+    the byte ranges would cut through it). The start of the file is checked
+    up front and every range again by its worker; otherwise ValueError is
+    raised and the caller falls back to a normal read_csv.
+
+    Parameters:
+    -----------
+    file_name : str
+        Path to the CSV file
+    encoding : str
+        Text encoding of the file
+    workers : int, optional
+        Number of worker processes (default: all CPU cores)
+    progress : LoadProgress, optional
+        Receives the bytes of every finished range, and can cancel the parse
+
+    Returns:
+    --------
+    pandas.DataFrame
+    """
+    started = time.perf_counter()
+    workers = workers or default_worker_count()
+    file_size = os.path.getsize(file_name)
+    progress = progress or LoadProgress()
+    progress.set_total(file_size)
+
+    if is_wide_encoding(encoding):
+        raise ValueError(f"Parallel parsing does not support {encoding} files")
+
+    head = read_byte_range(file_name, 0, min(file_size, HEADER_SCAN_BYTES))
+    header_end = head.find(b'\n')
+    if header_end == -1 or not head[:header_end].strip():
+        raise ValueError("Header is not on the first line")
+    if b'"' in head:
+        # Cheap early exit; ranges further in are checked by the workers
+        raise ValueError("File contains quoted fields")
+
+    # Let pandas name the columns so duplicates are mangled exactly as before
+    columns = pd.read_csv(io.BytesIO(head[:header_end + 1]), encoding=encoding, nrows=0).columns.tolist()
+
+    data_offset = header_end + 1
+    ranges = newline_aligned_ranges(file_name, data_offset, file_size, plan_chunks(file_size - data_offset, workers))
+    pool = get_process_pool(workers)
+    progress.advance(data_offset)
+    futures = [pool.submit(_parse_csv_byte_range, file_name, start, stop, columns, encoding)
+               for start, stop in ranges]
+    df = pd.concat(_collect_in_order(futures, ranges, progress), ignore_index=True)
+
+    logging.info(f"Parsed CSV in {len(ranges)} byte ranges on {workers} workers "
+                 f"in {time.perf_counter() - started:.3f}s")
+    return df
+
+
+def use_parallel_parse(file_name, workers):
+    """Decide between the parallel and the single-process parse"""
+    if workers is not None:
+        return workers > 1
+    return default_worker_count() > 1 and os.path.getsize(file_name) >= PARALLEL_MIN_BYTES
+
+
+def format_timings(timings):
+    """Format a timings dict as 'phase=1.234s, ...' for logging"""
+    return ', '.join(f"{phase}={seconds:.3f}s" for phase, seconds in timings.items())
@@ -2,96 +2,100 @@ import pandas as pd
 import numpy as np
 from scipy.signal import savgol_filter
 from scipy.ndimage import gaussian_filter1d
-from nptdms import TdmsFile
 import logging
 import io
-import chardet
+import os
 
 import re
 
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-def load_and_process_asc_file(file_name):
-    content = ""
-    try:
-        # Detect file encoding
-        with open(file_name, 'rb') as file:
-            raw_data = file.read()
-        result = chardet.detect(raw_data)
-        file_encoding = result['encoding']
+from utils.asc_parser import parse_asc_file, parse_csv_file_parallel, use_parallel_parse, format_timings
+from utils.encoding_utils import detect_encoding, store_encoding
+from utils.load_progress import LoadCancelled, LoadProgress
+from utils.lowess import fast_lowess
+from utils.nan_filters import nan_gaussian_filter1d, nan_median_filter, nan_savgol_filter, nan_segments
+from utils.process_pool import shutdown_process_pool
+from utils.signal_filters import bilateral_filter, butterworth_filtfilt
+from utils.tdms_utils import open_tdms_lazy
+from utils.x_smoothing import X_AWARE_METHODS, apply_x_smoothing
+
+# Rows per chunk of the single-process CSV read (progress granularity)
+CSV_PROGRESS_ROWS = 200000
+
+# Methods apply_smoothing_batch runs on all columns at once (the others column by column)
+BATCH_SMOOTHING_METHODS = ('moving_average', 'mean_line', 'savitzky-golay', 'gaussian_filter',
+                           'exponential_moving_avg', 'butterworth_filter')
 
-        # Try to read the file with the detected encoding
-        try:
-            with open(file_name, 'r', encoding=file_encoding) as file:
-                content = file.read()
-        except UnicodeDecodeError:
-            # If that fails, try with 'latin-1' encoding
-            with open(file_name, 'r', encoding='latin-1') as file:
-                content = file.read()
-
-        lines = content.split('\n')
-
-        # Find the start of the data
-        data_start = 0
-        for i, line in enumerate(lines):
-            # Check if the line contains tab-separated values and starts with a number-like string
-            if '\t' in line and re.match(r'^[\d,.]+\t', line.strip()):
-                data_start = i
-                break
-
-        if data_start == 0:
-            raise ValueError("Could not find the start of data in the file.")
-
-        # Extract header and data
-        header = lines[data_start - 1].split('\t')
-        data = [line.split('\t') for line in lines[data_start:] if line.strip()]
-
-        # Ensure all data rows have the same number of columns as the header
-        max_columns = len(header)
-        data = [row for row in data if len(row) == max_columns]
-
-        # Rename duplicate columns
-        new_header = []
-        seen = {}
-        for i, item in enumerate(header):
-            item = item.strip()  # Remove leading/trailing whitespace
-            if item in seen:
-                seen[item] += 1
-                new_header.append(f"{item}_{seen[item]}")
-            else:
-                seen[item] = 0
-                new_header.append(item)
-
-        df = pd.DataFrame(data, columns=new_header)
-
-        # Convert columns to appropriate types
-        for col in df.columns:
-            df[col] = df[col].apply(lambda x: x.replace(',', '.') if isinstance(x, str) else x)
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+def load_and_process_asc_file(file_name, dtype=np.float64, workers=None, progress=None):
+    """Load an ASC export into a DataFrame of float columns.
+
+    Files above utils.asc_parser.PARALLEL_MIN_BYTES are parsed across all CPU
+    cores unless workers is given (workers=1 forces a single process).
+    A LoadProgress receives the bytes consumed and can cancel the load.
+    """
+    try:
+        df, timings = parse_asc_file(file_name, dtype=dtype, workers=workers, progress=progress)
 
         logging.info(f"Successfully loaded ASC file. Shape: {df.shape}")
+        logging.info(f"ASC load timings: {format_timings(timings)}")
         logging.info(f"Columns: {df.columns.tolist()}")
         return df
 
+    except LoadCancelled:
+        raise
     except Exception as e:
         logging.error(f"Error loading ASC file: {str(e)}")
-        if content:
-            logging.error(f"File content (first 10 lines): {content.split('\n')[:10]}")
-        else:
+        try:
+            with open(file_name, 'r', encoding='latin-1') as file:
+                head = [file.readline().rstrip('\n') for _ in range(10)]
+            logging.error(f"File content (first 10 lines): {head}")
+        except OSError:
             logging.error("Unable to read file content")
         raise
 
 
-def load_and_process_csv_file(file_name):
-    """Load CSV file with automatic encoding detection."""
+def read_csv_with_progress(file_name, encoding, progress):
+    """read_csv in row chunks, reporting the file position after each chunk"""
+    parts = []
+    with open(file_name, 'rb') as file:
+        for chunk in pd.read_csv(file, encoding=encoding, chunksize=CSV_PROGRESS_ROWS):
+            parts.append(chunk)
+            progress.set_done(file.tell())
+    if len(parts) == 1:
+        return parts[0]
+    if not parts:
+        return pd.read_csv(file_name, encoding=encoding)
+    return pd.concat(parts, ignore_index=True)
+
+
+def load_and_process_csv_file(file_name, workers=None, progress=None):
+    """Load CSV file with automatic encoding detection.
+
+    Large files are parsed in parallel byte ranges (see
+    utils.asc_parser.parse_csv_file_parallel); workers=1 forces a single
+    pass. A LoadProgress receives the bytes consumed and can cancel the load.
+    """
+    progress = progress or LoadProgress()
     try:
-        # Try to detect the encoding first
-        with open(file_name, 'rb') as file:
-            raw_data = file.read()
-        result = chardet.detect(raw_data)
-        detected_encoding = result['encoding']
+        # Try to detect the encoding first (bounded sample, cached per file)
+        detected_encoding = detect_encoding(file_name)
 
         logging.info(f"Detected CSV encoding: {detected_encoding}")
 
+        if use_parallel_parse(file_name, workers):
+            try:
+                df = parse_csv_file_parallel(file_name, detected_encoding, workers=workers, progress=progress)
+                logging.info(f"Successfully loaded CSV in parallel. Shape: {df.shape}")
+                return df
+            except BrokenProcessPool as e:
+                shutdown_process_pool()
+                logging.warning(f"Process pool failed ({str(e)}), loading CSV in a single process")
+            except (ValueError, LookupError) as e:
+                logging.info(f"Parallel CSV load not possible ({str(e)}), loading in a single process")
+
         # List of encodings to try in order
         encodings_to_try = [
             detected_encoding,  # Try detected encoding first
@@ -106,15 +110,20 @@ def load_and_process_csv_file(file_name):
         encodings_to_try = list(dict.fromkeys([e for e in encodings_to_try if e]))
 
         # Try each encoding
+        progress.set_total(os.path.getsize(file_name))
         for encoding in encodings_to_try:
             try:
                 logging.info(f"Trying to load CSV with encoding: {encoding}")
-                df = pd.read_csv(file_name, encoding=encoding)
+                df = read_csv_with_progress(file_name, encoding, progress)
                 logging.info(f"Successfully loaded CSV with {encoding} encoding. Shape: {df.shape}")
+                if encoding != detected_encoding:
+                    store_encoding(file_name, encoding)
                 return df
             except UnicodeDecodeError:
                 logging.warning(f"Failed to load with {encoding} encoding")
                 continue
+            except LoadCancelled:
+                raise
             except Exception as e:
                 logging.warning(f"Error with {encoding} encoding: {str(e)}")
                 continue
@@ -125,6 +134,8 @@ def load_and_process_csv_file(file_name):
         logging.info(f"Loaded CSV with error handling. Shape: {df.shape}")
         return df
 
+    except LoadCancelled:
+        raise
     except Exception as e:
         logging.error(f"Error loading CSV file: {str(e)}")
         raise
@@ -158,36 +169,37 @@ def load_and_process_excel_file(file_name, sheet_name=None):
 
 
 def load_and_process_tdms_file(file_name):
-    with TdmsFile.open(file_name) as tdms_file:
-        # Get all groups in the file
-        groups = tdms_file.groups()
-
-        # Create a dictionary to store data from all groups
-        data_dict = {}
-
-        for group in groups:
-            for channel in group.channels():
-                channel_name = f"{group.name}/{channel.name}"
-                data = channel[:]
-                data_dict[channel_name] = data
-
-        # Find the maximum length of data
-    max_length = max(len(data) for data in data_dict.values())
-
-    # Pad shorter arrays with NaN
-    for key in data_dict:
-        if len(data_dict[key]) < max_length:
-            pad_length = max_length - len(data_dict[key])
-            data_dict[key] = np.pad(data_dict[key], (0, pad_length), 'constant', constant_values=np.nan)
-
-    # Create DataFrame
-    df = pd.DataFrame(data_dict)
+    """
+    Open a TDMS file lazily.
+
+    Only channel metadata is read here; channel data is streamed from disk
+    the first time a column is used (see utils.tdms_utils).
+
+    Returns:
+    --------
+    LazyTdmsFrame : DataFrame-like view over all channels, padded to the longest channel
+    """
+    df = open_tdms_lazy(file_name)
+    if len(df.columns) == 0:
+        df.close()
+        raise ValueError("No channels found in TDMS file")
     return df
 
 
+def _valid_window_length(window_length, n_samples):
+    """Window length made odd, shorter than the data and at least 3"""
+    if window_length >= n_samples:
+        window_length = n_samples - 1
+    if window_length % 2 == 0:
+        window_length -= 1
+    if window_length < 3:
+        window_length = 3
+    return window_length
+
+
 def apply_smoothing(data, method='savgol', window_length=21, poly_order=3, sigma=2,
                     alpha=0.3, cutoff_freq=0.1, filter_order=4, lowess_frac=0.1,
-                    spatial_sigma=5.0, range_sigma=2.0):
+                    spatial_sigma=5.0, range_sigma=2.0, x=None, x_window=None):
     """
     Apply various smoothing algorithms to data.
 
@@ -210,11 +222,17 @@ def apply_smoothing(data, method='savgol', window_length=21, poly_order=3, sigma
     filter_order : int
         Order for Butterworth filter
     lowess_frac : float
-        Fraction of data for Lowess smoothing (0-1)
+        Fraction of data for Lowess smoothing (0-1); the fit runs over the
+        sample index, with fast_lowess' default error bound
     spatial_sigma : float
         Spatial sigma for bilateral filter
     range_sigma : float
         Range sigma for bilateral filter
+    x : array-like, optional
+        X values of the samples, for windows in X units
+    x_window : float, optional
+        Window width in X units; used with x by the methods in
+        X_AWARE_METHODS instead of window_length / sigma
 
     Returns:
     --------
@@ -224,109 +242,216 @@ def apply_smoothing(data, method='savgol', window_length=21, poly_order=3, sigma
     is_numpy = isinstance(data, np.ndarray)
     if is_numpy:
         data_series = pd.Series(data)
+        data_array = data
     else:
         data_series = data
+        data_array = data.values
 
-    # Ensure window_length is odd and valid
-    if window_length >= len(data):
-        window_length = len(data) - 1
-    if window_length % 2 == 0:
-        window_length -= 1
-    if window_length < 3:
-        window_length = 3
+    window_length = _valid_window_length(window_length, len(data))
 
+    # NaN samples (unparsable values) are skipped by every method and stay
+    # NaN in the result, so gaps in the data remain gaps in the curve
     try:
-        if method == 'moving_average' or method == 'mean_line':
+        if x is not None and x_window and method in X_AWARE_METHODS:
+            # Windows in X units, for unevenly sampled data
+            return apply_x_smoothing(x, data_array, method, x_window)
+
+        elif method == 'moving_average' or method == 'mean_line':
             # Simple moving average
             result = data_series.rolling(window=window_length, center=True, min_periods=1).mean()
+            result = result.where(data_series.notna())
             return result.values if is_numpy else result
 
         elif method == 'savitzky-golay':
             # Savitzky-Golay filter
             if poly_order >= window_length:
                 poly_order = window_length - 1
-            return savgol_filter(data, window_length, poly_order)
+            return nan_savgol_filter(data_array, window_length, poly_order)
 
         elif method == 'gaussian_filter':
-            # Gaussian filter
-            return gaussian_filter1d(data, sigma=sigma)
+            # Gaussian filter (normalized convolution across gaps)
+            return nan_gaussian_filter1d(data_array, sigma=sigma)
 
         elif method == 'exponential_moving_avg':
             # Exponential moving average
             result = data_series.ewm(alpha=alpha, adjust=False).mean()
+            result = result.where(data_series.notna())
             return result.values if is_numpy else result
 
         elif method == 'median_filter':
             # Median filter (robust to outliers)
-            from scipy.ndimage import median_filter
-            return median_filter(data, size=window_length)
+            return nan_median_filter(data_array, size=window_length)
 
         elif method == 'lowess_local_regression':
-            # Lowess (Locally Weighted Scatterplot Smoothing)
+            # Lowess (Locally Weighted Scatterplot Smoothing) over the sample index,
+            # fitted on an anchor grid so long signals stay fast
+            smoothed = fast_lowess(data_array, frac=lowess_frac)
+            return smoothed
+
+        elif method == 'butterworth_filter':
+            # Butterworth low-pass filter (zero-phase, second-order sections),
+            # run on each stretch between gaps
+            try:
+                return nan_segments(lambda segment: butterworth_filtfilt(segment, cutoff_freq, filter_order),
+                                    data_array)
+            except Exception as e:
+                logging.warning(f"Butterworth filter failed: {e}. Falling back to Gaussian.")
+                return nan_gaussian_filter1d(data_array, sigma=sigma)
+
+        elif method == 'bilateral_filter':
+            # Bilateral filter (edge-preserving)
             try:
-                from statsmodels.nonparametric.smoothers_lowess import lowess
-                # Create x values (indices)
-                x = np.arange(len(data))
-                # Apply lowess - convert to numpy array for lowess
-                data_array = data if isinstance(data, np.ndarray) else data.values
-                smoothed = lowess(data_array, x, frac=lowess_frac, return_sorted=False)
-                return smoothed
-            except ImportError:
-                logging.warning("statsmodels not installed. Falling back to moving average.")
-                result = data_series.rolling(window=window_length, center=True, min_periods=1).mean()
-                return result.values if is_numpy else result
-
-        # elif method == 'butterworth_filter':
-        #     # Butterworth low-pass filter
-        #     try:
-        #         from scipy.signal import butter, filtfilt
-        #         # Design filter
-        #         b, a = butter(filter_order, cutoff_freq, btype='low', analog=False)
-        #         # Apply filter (zero-phase filtering)
-        #         smoothed = filtfilt(b, a, data)
-        #         return smoothed
-        #     except Exception as e:
-        #         logging.warning(f"Butterworth filter failed: {e}. Falling back to Gaussian.")
-        #         return gaussian_filter1d(data, sigma=sigma)
-        #
-        # elif method == 'bilateral_filter':
-        #     # Bilateral filter (edge-preserving)
-        #     try:
-        #         # Simple implementation of bilateral filter for 1D data
-        #         smoothed = np.zeros_like(data)
-        #         for i in range(len(data)):
-        #             # Define neighborhood
-        #             w_start = max(0, i - window_length // 2)
-        #             w_end = min(len(data), i + window_length // 2 + 1)
-        #
-        #             # Get neighborhood data
-        #             neighborhood = data[w_start:w_end]
-        #             positions = np.arange(w_start, w_end)
-        #
-        #             # Calculate spatial weights (distance from center)
-        #             spatial_weights = np.exp(-((positions - i) ** 2) / (2 * spatial_sigma ** 2))
-        #
-        #             # Calculate range weights (intensity difference)
-        #             range_weights = np.exp(-((neighborhood - data[i]) ** 2) / (2 * range_sigma ** 2))
-        #
-        #             # Combined weights
-        #             weights = spatial_weights * range_weights
-        #             weights /= weights.sum()
-        #
-        #             # Weighted average
-        #             smoothed[i] = np.sum(neighborhood * weights)
-        #
-        #         return smoothed
-        #     except Exception as e:
-        #         logging.warning(f"Bilateral filter failed: {e}. Falling back to Gaussian.")
-        #         return gaussian_filter1d(data, sigma=sigma)
-        #
+                return bilateral_filter(data_array, window_length, spatial_sigma, range_sigma)
+            except Exception as e:
+                logging.warning(f"Bilateral filter failed: {e}. Falling back to Gaussian.")
+                return nan_gaussian_filter1d(data_array, sigma=sigma)
+
         else:
             # Default to moving average
             logging.warning(f"Unknown smoothing method: {method}. Using moving average.")
             result = data_series.rolling(window=window_length, center=True, min_periods=1).mean()
+            result = result.where(data_series.notna())
             return result.values if is_numpy else result
 
     except Exception as e:
         logging.error(f"Error in smoothing: {e}. Returning original data.")
-        return data if isinstance(data, np.ndarray) else data.values
\ No newline at end of file
+        return data_array
+
+
+SMOOTHING_ARGUMENTS = ('method', 'window_length', 'poly_order', 'sigma', 'alpha', 'cutoff_freq',
+                       'filter_order', 'lowess_frac', 'spatial_sigma', 'range_sigma')
+
+
+def _smoothing_kwargs(smoothing_params, x):
+    """apply_smoothing arguments for the settings of SmoothingOptions.get_params()"""
+    kwargs = {name: smoothing_params[name] for name in SMOOTHING_ARGUMENTS if name in smoothing_params}
+    if x is not None and smoothing_params.get('window_in_x', False):
+        kwargs['x'] = x
+        kwargs['x_window'] = smoothing_params.get('x_window')
+    return kwargs
+
+
+def apply_smoothing_params(data, smoothing_params, x=None):
+    """
+    Smooth data with the settings of SmoothingOptions.get_params().
+
+    x is the X data of the samples, used when the window is set in X units.
+
+    Returns:
+    --------
+    numpy.ndarray : smoothed copy of data
+    """
+    return np.asarray(apply_smoothing(data, **_smoothing_kwargs(smoothing_params, x)))
+
+
+def _filter_block(block, method, window_length, poly_order, sigma, alpha, smoothing_kwargs):
+    """Filter every column of a 2-D block along axis 0 (BATCH_SMOOTHING_METHODS only)"""
+    if method in ('moving_average', 'mean_line'):
+        frame = pd.DataFrame(block, copy=False)
+        return frame.rolling(window=window_length, center=True, min_periods=1).mean().to_numpy()
+    elif method == 'savitzky-golay':
+        if poly_order >= window_length:
+            poly_order = window_length - 1
+        return savgol_filter(block, window_length, poly_order, axis=0)
+    elif method == 'gaussian_filter':
+        return gaussian_filter1d(block, sigma=sigma, axis=0)
+    elif method == 'butterworth_filter':
+        return butterworth_filtfilt(block, smoothing_kwargs.get('cutoff_freq', 0.1),
+                                    smoothing_kwargs.get('filter_order', 4))
+    else:
+        frame = pd.DataFrame(block, copy=False)
+        return frame.ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def _smooth_block(block, method, window_length, poly_order, sigma, alpha, smoothing_kwargs):
+    """Smooth every column of a 2-D block along axis 0, as apply_smoothing would"""
+    x = smoothing_kwargs.get('x')
+    x_window = smoothing_kwargs.get('x_window')
+    if x is not None and x_window and method in X_AWARE_METHODS:
+        # The columns share X, which is sorted once for all of them
+        return apply_x_smoothing(x, block, method, x_window)
+
+    smoothed = np.empty(block.shape)
+    per_column = np.arange(block.shape[1])
+    if method in BATCH_SMOOTHING_METHODS:
+        # Columns with gaps take the NaN-aware path of apply_smoothing
+        gaps = np.isnan(block).any(axis=0)
+        whole = np.flatnonzero(~gaps)
+        if len(whole) == block.shape[1]:
+            return _filter_block(block, method, window_length, poly_order, sigma, alpha, smoothing_kwargs)
+        if len(whole):
+            smoothed[:, whole] = _filter_block(block[:, whole], method, window_length, poly_order, sigma, alpha,
+                                               smoothing_kwargs)
+        per_column = np.flatnonzero(gaps)
+
+    # Methods without a 2-D form run column by column
+    for i in per_column:
+        smoothed[:, i] = apply_smoothing(block[:, i], method=method, window_length=window_length,
+                                         poly_order=poly_order, sigma=sigma, alpha=alpha, **smoothing_kwargs)
+    return smoothed
+
+
+def apply_smoothing_batch(data, method='savgol', window_length=21, poly_order=3, sigma=2,
+                          alpha=0.3, workers=1, **smoothing_kwargs):
+    """
+    Smooth several columns of equal length with the same settings in one call.
+
+    The filters of BATCH_SMOOTHING_METHODS run along axis 0 of the whole
+    array instead of once per column; other methods fall back to
+    apply_smoothing per column. With more than one worker the columns are
+    split into blocks smoothed on a thread pool (SciPy and pandas release
+    the GIL in their filter loops). Results equal those of apply_smoothing.
+
+    Parameters:
+    -----------
+    data : numpy.ndarray
+        2-D array of shape (n_samples, n_columns)
+    method, window_length, poly_order, sigma, alpha, **smoothing_kwargs
+        As for apply_smoothing
+    workers : int
+        Threads smoothing column blocks in parallel (1 = in the calling thread)
+
+    Returns:
+    --------
+    numpy.ndarray : smoothed array of the same shape
+    """
+    data = np.asarray(data, dtype=np.float64)
+    if data.ndim != 2:
+        raise ValueError("apply_smoothing_batch expects a 2-D (n_samples x n_columns) array")
+    n_samples, n_columns = data.shape
+    if n_samples == 0 or n_columns == 0:
+        return data.copy()
+
+    window_length = _valid_window_length(window_length, n_samples)
+    args = (method, window_length, poly_order, sigma, alpha, smoothing_kwargs)
+
+    try:
+        workers = max(1, min(workers or 1, n_columns))
+        if workers == 1:
+            return _smooth_block(data, *args)
+
+        bounds = np.linspace(0, n_columns, workers + 1).astype(int)
+        smoothed = np.empty(data.shape)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='smoothing-batch') as executor:
+            futures = [(start, stop, executor.submit(_smooth_block, data[:, start:stop], *args))
+                       for start, stop in zip(bounds[:-1], bounds[1:])]
+            for start, stop, future in futures:
+                smoothed[:, start:stop] = future.result()
+        return smoothed
+
+    except Exception as e:
+        logging.error(f"Error in batch smoothing: {e}. Returning original data.")
+        return data.copy()
+
+
+def apply_smoothing_params_batch(data, smoothing_params, workers=1, x=None):
+    """
+    Smooth the columns of a 2-D array with the settings of SmoothingOptions.get_params().
+
+    x is the X data shared by the columns, used when the window is set in X units.
+
+    Returns:
+    --------
+    numpy.ndarray : smoothed copy of data
+    """
+    return apply_smoothing_batch(data, workers=workers, **_smoothing_kwargs(smoothing_params, x))
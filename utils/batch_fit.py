@@ -0,0 +1,112 @@
+"""
+Curve fits of single columns, as run by the curve fitting panel.
+
+fit_column only takes and returns plain arrays and picklable objects, so
+the batch fitting mode can run one column per task in the worker processes
+of the shared pool and send the results back to the GUI. The results hold
+the fitted model rather than a function; fit_function rebuilds the
+callable for plotting.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.nonlinear_fit import NONLINEAR_MODELS, evaluate_model, fit_nonlinear
+from utils.poly_fit import fit_polynomial
+
+
+def fit_column(column, x_data, y_data, fit_type, degree=1):
+    """
+    Fit one column against X.
+
+    Parameters:
+    -----------
+    column : str
+        Name of the Y column (passed through to the result)
+    x_data, y_data : numpy.ndarray
+        Samples; pairs with a NaN or infinite value are skipped
+    fit_type : str
+        'Polynomial' or a key of NONLINEAR_MODELS
+    degree : int
+        Polynomial degree
+
+    Returns:
+    --------
+    dict : column, fit_type, name, model (Chebyshev series, or parameters
+    and X shift of a nonlinear model), coeffs (power series, highest degree
+    first, or the nonlinear parameters), equation (nonlinear models only),
+    r_squared, residual_rms, rank, n_points and x_range
+    """
+    x_data = np.asarray(x_data, dtype=np.float64)
+    y_data = np.asarray(y_data, dtype=np.float64)
+    mask = np.isfinite(x_data) & np.isfinite(y_data)
+    n_points = int(np.count_nonzero(mask))
+    if n_points == 0:
+        raise ValueError("No valid data points for fitting after removing NaN/inf values")
+    x_range = (float(np.min(x_data, where=mask, initial=np.inf)),
+               float(np.max(x_data, where=mask, initial=-np.inf)))
+
+    if fit_type == 'Polynomial':
+        if n_points <= degree:
+            raise ValueError(f"Not enough data points for degree {degree} polynomial. "
+                             f"Need at least {degree + 1} points, but only have {n_points} points.")
+        # The chunked fit skips the non-finite pairs itself, without copies
+        coeffs, model, r_squared, residual_rms, rank = fit_polynomial(x_data, y_data, degree)
+        name = f"Polynomial (degree {degree})"
+
+    elif fit_type in NONLINEAR_MODELS:
+        params, shift, r_squared, residual_rms, n_points = fit_nonlinear(x_data, y_data, fit_type)
+        model = (tuple(float(p) for p in params), shift)
+        coeffs = np.asarray(model[0])
+        rank = len(params)
+        name = fit_type
+
+    else:
+        raise ValueError(f"Unknown fit type: {fit_type}")
+
+    result = {
+        'column': column,
+        'fit_type': fit_type,
+        'name': name,
+        'model': model,
+        'coeffs': coeffs,
+        'r_squared': r_squared,
+        'residual_rms': residual_rms,
+        'rank': rank,
+        'n_points': n_points,
+        'x_range': x_range,
+    }
+    if fit_type in NONLINEAR_MODELS:
+        result['equation'] = NONLINEAR_MODELS[fit_type].equation(*model)
+    return result
+
+
+def fit_function(result):
+    """Callable evaluating the fit of a fit_column result"""
+    if result['fit_type'] in NONLINEAR_MODELS:
+        params, shift = result['model']
+        return lambda x: evaluate_model(result['fit_type'], params, shift, x)
+    return result['model']
+
+
+def fit_summary_frame(results):
+    """
+    Table of fits for export.
+
+    Parameters:
+    -----------
+    results : list of dict
+        fit_column results with an 'equation' entry added
+
+    Returns:
+    --------
+    pandas.DataFrame : one row per fit
+    """
+    return pd.DataFrame({
+        'Column': [result['column'] for result in results],
+        'Fit': [result['name'] for result in results],
+        'Equation': [result['equation'] for result in results],
+        'R²': [result['r_squared'] for result in results],
+        'Residual RMS': [result['residual_rms'] for result in results],
+        'Points': [result['n_points'] for result in results],
+    })
@@ -0,0 +1,266 @@
+"""
+Bootstrap confidence and prediction bands of fitted curves.
+
+Refitting millions of samples hundreds of times is too slow, so each
+replicate is a one-step update of the fitted parameters instead:
+
+    params* = params + (JᵀJ)⁻¹ Jᵀ e*
+
+with J the basis of the fit (the Chebyshev basis of a polynomial, which
+makes the update exact, or the Jacobian of a nonlinear model at the fitted
+parameters) and e* the resampled residuals:
+
+- 'Residuals': e* draws the residuals with replacement (homoscedastic noise);
+- 'Cases': e* = (w - 1) r with random case weights w of mean and variance
+  1 (exponential, the Bayesian bootstrap), the streaming form of resampling
+  (x, y) pairs, which keeps noise that varies along X.
+
+The samples live in one shared memory block. prepare_bootstrap writes the
+residuals into it and returns the triangular factor of J (JᵀJ = RᵀR);
+bootstrap_batch computes Jᵀe* of a batch of replicates in chunks. Both run
+in the worker processes of the shared pool, which attach to the block
+instead of receiving a copy of the data.
+
+BootstrapBands evaluates the replicate curves at any X: the confidence
+band holds the central CONFIDENCE_LEVEL of them, the prediction band adds
+the residual quantiles to its half-widths in quadrature.
+"""
+
+import numpy as np
+from multiprocessing import shared_memory
+from numpy.polynomial import chebyshev
+from scipy.linalg import qr
+
+from utils.nonlinear_fit import NONLINEAR_MODELS
+
+BOOTSTRAP_METHODS = ('Residuals', 'Cases')
+
+# Share of the replicate curves inside the bands
+CONFIDENCE_LEVEL = 0.95
+
+# Replicates computed per pool task (the unit of progress and cancellation)
+REPLICATES_PER_TASK = 25
+
+# Samples per chunk of the passes over the data
+BOOTSTRAP_CHUNK_ROWS = 64 * 1024
+
+
+def band_spec(result):
+    """
+    Picklable description of a fit_column result for the bootstrap.
+
+    Returns:
+    --------
+    dict : kind ('polynomial' or 'nonlinear'), params, shift of X, and the
+    domain (polynomial) or model name (nonlinear)
+    """
+    if result['fit_type'] == 'Polynomial':
+        series = result['model']
+        return {'kind': 'polynomial', 'params': np.array(series.coef, dtype=np.float64),
+                'domain': tuple(float(d) for d in series.domain), 'shift': 0.0}
+    params, shift = result['model']
+    return {'kind': 'nonlinear', 'model': result['fit_type'],
+            'params': np.array(params, dtype=np.float64), 'shift': float(shift)}
+
+
+def _chebyshev_t(spec, u):
+    lo, hi = spec['domain']
+    return (u - (lo + hi) / 2.0) * (2.0 / (hi - lo))
+
+
+def _basis(spec, u):
+    """(samples, parameters) derivatives of the fitted curve by its parameters"""
+    if spec['kind'] == 'polynomial':
+        return chebyshev.chebvander(_chebyshev_t(spec, u), len(spec['params']) - 1)
+    return NONLINEAR_MODELS[spec['model']].jacobian(u, spec['params'])
+
+
+def _evaluate_many(spec, params, u):
+    """Curves of a (sets, parameters) array of parameters at u: (sets, points)"""
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        if spec['kind'] == 'polynomial':
+            return chebyshev.chebval(_chebyshev_t(spec, u), params.T)
+        return NONLINEAR_MODELS[spec['model']].evaluate(u, params.T[:, :, None]) + np.zeros((len(params), len(u)))
+
+
+def _valid_samples(spec, x, y):
+    mask = np.isfinite(x) & np.isfinite(y)
+    if spec['kind'] == 'nonlinear':
+        mask[mask] = NONLINEAR_MODELS[spec['model']].valid(x[mask] - spec['shift'])
+    return mask
+
+
+class SharedInputs:
+    """
+    X (minus the fit's shift), Y and the residuals of the valid samples in
+    one shared memory block, rows 0, 1 and 2 of a (3, n) array. The
+    creating process owns the block and releases it with close().
+    """
+
+    def __init__(self, spec, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        mask = _valid_samples(spec, x, y)
+        self.n = int(np.count_nonzero(mask))
+        if self.n <= len(spec['params']):
+            raise ValueError("Not enough valid data points for bootstrap bands")
+
+        self._shm = shared_memory.SharedMemory(create=True, size=3 * self.n * 8)
+        self.name = self._shm.name
+        data = self.array()
+        data[0] = x[mask]
+        data[0] -= spec['shift']
+        data[1] = y[mask]
+        data[2] = 0.0
+
+    def array(self):
+        return np.ndarray((3, self.n), dtype=np.float64, buffer=self._shm.buf)
+
+    def residuals(self):
+        return self.array()[2]
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+def _attach(name):
+    """Open a block created by SharedInputs (without taking over its cleanup where Python allows)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13; the pool shares the creator's resource tracker
+        return shared_memory.SharedMemory(name=name)
+
+
+def _chunks(n):
+    for start in range(0, n, BOOTSTRAP_CHUNK_ROWS):
+        yield slice(start, min(start + BOOTSTRAP_CHUNK_ROWS, n))
+
+
+def _prepare(spec, data, level):
+    u, y, residuals = data
+    width = len(spec['params'])
+    r = np.zeros((width, width))
+    for rows in _chunks(len(u)):
+        residuals[rows] = y[rows] - _evaluate_many(spec, spec['params'][None, :], u[rows])[0]
+        r = qr(np.vstack([r, _basis(spec, u[rows])]), mode='r', check_finite=False)[0][:width]
+    quantiles = np.quantile(residuals, [(1.0 - level) / 2.0, (1.0 + level) / 2.0])
+    return r, quantiles
+
+
+def prepare_bootstrap(spec, name, n, level=CONFIDENCE_LEVEL):
+    """
+    Write the residuals of the fit into the shared block (pool task).
+
+    Returns:
+    --------
+    tuple : (triangular factor R of the basis, lower and upper residual
+    quantiles of the level)
+    """
+    shm = _attach(name)
+    data = np.ndarray((3, n), dtype=np.float64, buffer=shm.buf)
+    try:
+        return _prepare(spec, data, level)
+    finally:
+        del data
+        shm.close()
+
+
+def _batch(spec, data, replicates, seed, method):
+    u, _, residuals = data
+    rng = np.random.default_rng(seed)
+    n = len(u)
+    projected = np.zeros((len(spec['params']), replicates))
+    for rows in _chunks(n):
+        size = (rows.stop - rows.start, replicates)
+        if method == 'Residuals':
+            draws = residuals[rng.integers(0, n, size=size)]
+        else:
+            # Exponential weights draw several times faster than Poisson(1) counts
+            draws = rng.standard_exponential(size=size)
+            draws -= 1.0
+            draws *= residuals[rows, None]
+        projected += _basis(spec, u[rows]).T @ draws
+    return projected
+
+
+def bootstrap_batch(spec, name, n, replicates, seed, method='Residuals'):
+    """
+    Jᵀe* of a batch of bootstrap replicates (pool task).
+
+    Parameters:
+    -----------
+    spec : dict
+        band_spec of the fit
+    name, n : str, int
+        Shared block and sample count of a SharedInputs prepared by prepare_bootstrap
+    replicates : int
+        Replicates in this batch
+    seed : numpy.random.SeedSequence or int
+        Independent seed of the batch
+    method : str
+        One of BOOTSTRAP_METHODS
+
+    Returns:
+    --------
+    numpy.ndarray : (parameters, replicates)
+    """
+    shm = _attach(name)
+    data = np.ndarray((3, n), dtype=np.float64, buffer=shm.buf)
+    try:
+        return _batch(spec, data, replicates, seed, method)
+    finally:
+        del data
+        shm.close()
+
+
+class BootstrapBands:
+    """
+    Confidence and prediction bands of a fit from its bootstrap replicates.
+
+    Parameters:
+    -----------
+    spec : dict
+        band_spec of the fit
+    r : numpy.ndarray
+        Triangular factor of the basis from prepare_bootstrap
+    projections : list of numpy.ndarray
+        bootstrap_batch results
+    residual_quantiles : array-like
+        Lower and upper residual quantiles of the level
+    """
+
+    def __init__(self, spec, r, projections, residual_quantiles, level=CONFIDENCE_LEVEL, method='Residuals'):
+        self.spec = spec
+        self.level = level
+        self.method = method
+        # (JᵀJ)⁺ Jᵀe*; the pseudo-inverse also copes with a rank-deficient basis
+        inverse = np.linalg.pinv(r)
+        steps = inverse @ (inverse.T @ np.hstack(projections))
+        self.replicate_params = spec['params'][None, :] + steps.T
+        self.residual_quantiles = np.asarray(residual_quantiles, dtype=np.float64)
+
+    @property
+    def replicates(self):
+        return len(self.replicate_params)
+
+    def evaluate(self, x):
+        """
+        Bands at x.
+
+        Returns:
+        --------
+        tuple : (confidence lower, confidence upper, prediction lower,
+        prediction upper) arrays
+        """
+        u = np.asarray(x, dtype=np.float64) - self.spec['shift']
+        fitted = _evaluate_many(self.spec, self.spec['params'][None, :], u)[0]
+        curves = _evaluate_many(self.spec, self.replicate_params, u)
+        tail = (1.0 - self.level) / 2.0
+        lower, upper = np.nanquantile(curves, [tail, 1.0 - tail], axis=0)
+        below = np.hypot(fitted - lower, self.residual_quantiles[0])
+        above = np.hypot(upper - fitted, self.residual_quantiles[1])
+        return lower, upper, fitted - below, fitted + above
@@ -0,0 +1,33 @@
+"""
+Location of the application's on-disk caches.
+
+Defaults to a per-user directory and can be moved with the
+INLINE_ANALYTICS_CACHE_DIR environment variable (e.g. to a fast local disk).
+"""
+
+import os
+
+CACHE_DIR_ENV = 'INLINE_ANALYTICS_CACHE_DIR'
+
+
+def get_cache_dir(*parts):
+    """
+    Return (and create) a directory inside the application cache.
+
+    Parameters:
+    -----------
+    *parts : str
+        Optional sub-directory components
+
+    Returns:
+    --------
+    str : Absolute path of the directory
+    """
+    base = os.environ.get(CACHE_DIR_ENV)
+    if not base:
+        root = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+        base = os.path.join(root, 'Inline_Data_Analytics')
+
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
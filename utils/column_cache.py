@@ -0,0 +1,281 @@
+"""
+Persistent columnar cache for parsed measurement files.
+
+Every parsed file is stored as one .npy file per column plus a JSON manifest
+in a directory named after the file fingerprint (path, size, modification
+time and loader variant such as the Excel sheet). Reopening the file maps the
+cached arrays with np.load(mmap_mode='r'), which takes roughly constant time
+regardless of the file size. The cache is bounded in size and evicts the
+least recently used entries.
+
+Purge from the command line with:
+
+    python -m utils.column_cache --purge
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.cache_dir import get_cache_dir
+
+# Bump when the parsers change in a way that makes cached results stale
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def _is_mappable(dtype):
+    """True for dtypes np.load can memory-map (plain numeric, bool and naive datetimes)"""
+    return isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM'
+
+
+def _directory_size(path):
+    total = 0
+    for entry in os.scandir(path):
+        if entry.is_file():
+            total += entry.stat().st_size
+    return total
+
+
+class ColumnCache:
+    """Size-bounded LRU cache of parsed files in a memory-mappable columnar format"""
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root or get_cache_dir('columns')
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def fingerprint(file_name, variant=''):
+        """
+        Cache key of a file.
+
+        Parameters:
+        -----------
+        file_name : str
+            Path of the source file
+        variant : str
+            Distinguishes several results from one file (e.g. Excel sheet)
+
+        Returns:
+        --------
+        str : Hex digest
+        """
+        stat = os.stat(file_name)
+        source = os.path.normcase(os.path.abspath(file_name))
+        key = f"{CACHE_FORMAT_VERSION}|{source}|{stat.st_size}|{stat.st_mtime_ns}|{variant}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.root, key)
+
+    # ------------------------------------------------------------------
+    # Load / store
+    # ------------------------------------------------------------------
+
+    def load(self, file_name, variant=''):
+        """
+        Map a cached file.
+
+        Returns:
+        --------
+        pandas.DataFrame backed by read-only memory maps, or None on a miss
+        """
+        try:
+            entry_dir = self._entry_dir(self.fingerprint(file_name, variant))
+        except OSError:
+            return None
+
+        manifest_path = os.path.join(entry_dir, MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            return None
+
+        try:
+            started = time.perf_counter()
+            with open(manifest_path, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+
+            arrays = {}
+            for i, column in enumerate(manifest['columns']):
+                path = os.path.join(entry_dir, column['file'])
+                if column['kind'] == 'npy':
+                    arrays[i] = np.load(path, mmap_mode='r')
+                else:
+                    arrays[i] = pd.read_pickle(path)
+
+            # Built from a dict with copy=False so every column stays a memory map
+            df = pd.DataFrame(arrays, copy=False)
+            df.columns = [column['name'] for column in manifest['columns']]
+
+            # Mark the entry as recently used for the LRU policy
+            os.utime(manifest_path)
+            logging.info(f"Loaded {os.path.basename(file_name)} from column cache "
+                         f"in {time.perf_counter() - started:.3f}s. Shape: {df.shape}")
+            return df
+
+        except Exception as e:
+            logging.warning(f"Discarding unreadable cache entry {entry_dir}: {str(e)}")
+            self._remove_entry(entry_dir)
+            return None
+
+    def store(self, file_name, df, variant=''):
+        """
+        Write a parsed DataFrame to the cache.
+
+        Returns:
+        --------
+        bool : True if the entry was written
+        """
+        if not all(isinstance(name, (str, int, float)) for name in df.columns):
+            logging.info("Column names cannot be stored in the cache manifest, skipping cache")
+            return False
+
+        tmp_dir = None
+        try:
+            key = self.fingerprint(file_name, variant)
+            entry_dir = self._entry_dir(key)
+            if os.path.exists(os.path.join(entry_dir, MANIFEST_NAME)):
+                return True
+
+            started = time.perf_counter()
+            tmp_dir = f"{entry_dir}.{os.getpid()}.tmp"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+
+            columns = []
+            for i, name in enumerate(df.columns):
+                series = df.iloc[:, i]
+                if _is_mappable(series.dtype):
+                    file_part = f"col_{i:05d}.npy"
+                    np.save(os.path.join(tmp_dir, file_part), np.ascontiguousarray(series.to_numpy()))
+                    kind = 'npy'
+                else:
+                    # Strings, categories, tz-aware times: not mappable, stored pickled
+                    file_part = f"col_{i:05d}.pkl"
+                    series.reset_index(drop=True).to_pickle(os.path.join(tmp_dir, file_part))
+                    kind = 'pickle'
+                columns.append({'name': name, 'file': file_part, 'kind': kind, 'dtype': str(series.dtype)})
+
+            manifest = {
+                'version': CACHE_FORMAT_VERSION,
+                'source': os.path.abspath(file_name),
+                'variant': variant,
+                'n_rows': len(df),
+                'columns': columns,
+                'created': time.time(),
+            }
+            with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w', encoding='utf-8') as file:
+                json.dump(manifest, file)
+
+            # Leftovers of an entry that could not be fully removed earlier
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+            logging.info(f"Stored {os.path.basename(file_name)} in column cache "
+                         f"in {time.perf_counter() - started:.3f}s")
+
+        except OSError as e:
+            logging.warning(f"Could not write column cache entry: {str(e)}")
+            if tmp_dir:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+
+        self.evict()
+        return True
+
+    # ------------------------------------------------------------------
+    # Eviction / purge
+    # ------------------------------------------------------------------
+
+    def entries(self):
+        """
+        List cache entries, least recently used first.
+
+        Returns:
+        --------
+        list of (path, last access time, size in bytes)
+        """
+        result = []
+        for entry in os.scandir(self.root):
+            if not entry.is_dir():
+                continue
+            manifest_path = os.path.join(entry.path, MANIFEST_NAME)
+            try:
+                last_used = os.path.getmtime(manifest_path)
+            except OSError:
+                # Unfinished write or half-removed entry: evict first
+                last_used = 0.0
+            result.append((entry.path, last_used, _directory_size(entry.path)))
+        result.sort(key=lambda item: item[1])
+        return result
+
+    def total_size(self):
+        """Total size of all cache entries in bytes"""
+        return sum(size for _, _, size in self.entries())
+
+    def evict(self, max_bytes=None):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= max_bytes:
+                break
+            if self._remove_entry(path):
+                total -= size
+                logging.info(f"Evicted column cache entry {os.path.basename(path)} ({size / 1e6:.1f} MB)")
+
+    def purge(self):
+        """
+        Remove every cache entry.
+
+        Returns:
+        --------
+        int : Number of bytes freed
+        """
+        freed = 0
+        for path, _, size in self.entries():
+            if self._remove_entry(path):
+                freed += size
+        logging.info(f"Purged column cache, freed {freed / 1e6:.1f} MB")
+        return freed
+
+    @staticmethod
+    def _remove_entry(path):
+        """Delete an entry directory; the manifest goes first so the entry is invalid immediately"""
+        try:
+            manifest_path = os.path.join(path, MANIFEST_NAME)
+            if os.path.exists(manifest_path):
+                os.remove(manifest_path)
+        except OSError as e:
+            # Still memory-mapped by an open dataset (Windows), retried on the next eviction
+            logging.debug(f"Cache entry {path} is in use: {str(e)}")
+            return False
+        shutil.rmtree(path, ignore_errors=True)
+        return not os.path.exists(path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Manage the measurement file column cache")
+    parser.add_argument('--purge', action='store_true', help="Remove all cached files")
+    args = parser.parse_args()
+
+    cache = ColumnCache()
+    if args.purge:
+        print(f"Freed {cache.purge() / 1e6:.1f} MB from {cache.root}")
+    else:
+        entries = cache.entries()
+        print(f"{len(entries)} entries, {sum(size for _, _, size in entries) / 1e6:.1f} MB in {cache.root}")
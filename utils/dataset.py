@@ -0,0 +1,338 @@
+"""
+Immutable columnar dataset with row-selection views.
+
+A loaded file is wrapped once in a Dataset and never modified. Filtering
+produces another Dataset that shares the same base columns and only stores
+the selected row positions, so the full data exists once in memory no matter
+how often it is filtered. Columns are materialized one at a time, only for
+the selected rows, when a component reads them.
+
+The base may be a pandas.DataFrame or a LazyTdmsFrame.
+"""
+
+import hashlib
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from utils.sort_index import SortIndex
+
+
+class Dataset:
+    """
+    Read-only view of a base table restricted to a set of rows.
+
+    Parameters:
+    -----------
+    base : pandas.DataFrame or LazyTdmsFrame
+        Column data, treated as immutable
+    rows : numpy.ndarray or slice, optional
+        Sorted integer positions of the selected rows, or a contiguous slice
+        of them (None = all rows). Slices keep column reads zero-copy.
+    """
+
+    def __init__(self, base, rows=None, base_id=None, sort_indexes=None):
+        self._base = base
+        self._rows = rows
+        self._base_id = base_id or uuid.uuid4().hex
+        # Sort indexes of base columns, shared by all views of the same base
+        self._sort_indexes = {} if sort_indexes is None else sort_indexes
+        self._version = None
+        self.columns = base.columns
+
+    def _view(self, rows):
+        return Dataset(self._base, rows, base_id=self._base_id, sort_indexes=self._sort_indexes)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Rebuilt on demand after unpickling
+        state['_sort_indexes'] = {}
+        return state
+
+    def __setstate__(self, state):
+        # Sessions saved before versions were cached lack the attribute
+        state.setdefault('_version', None)
+        self.__dict__.update(state)
+
+    @classmethod
+    def from_frame(cls, df):
+        """Wrap a loaded table; Datasets are returned unchanged"""
+        if df is None or isinstance(df, Dataset):
+            return df
+        return cls(df)
+
+    @property
+    def base(self):
+        return self._base
+
+    @property
+    def base_id(self):
+        """Identifier shared by all views of the same base data"""
+        return self._base_id
+
+    @property
+    def version(self):
+        """
+        Identity of the base data and the selected rows: two views with the
+        same version hold the same values. Computed once per view.
+        """
+        if self._version is None:
+            parts = [str(self._base_id)]
+            if isinstance(self._rows, slice):
+                parts.append(f"{self._rows.start}:{self._rows.stop}")
+            elif self._rows is not None:
+                parts.append(hashlib.blake2b(np.ascontiguousarray(self._rows).tobytes(), digest_size=16).hexdigest())
+            self._version = '|'.join(parts)
+        return self._version
+
+    @property
+    def rows(self):
+        return self._rows
+
+    def row_positions(self):
+        """Selected base row positions as an integer array (None = all rows)"""
+        if isinstance(self._rows, slice):
+            return np.arange(self._rows.start, self._rows.stop, dtype=np.int64)
+        return self._rows
+
+    @property
+    def is_filtered(self):
+        return self._rows is not None
+
+    @property
+    def index(self):
+        if self._rows is None:
+            return pd.RangeIndex(len(self._base))
+        if isinstance(self._rows, slice):
+            return pd.RangeIndex(self._rows.start, self._rows.stop)
+        return pd.Index(self._rows)
+
+    @property
+    def shape(self):
+        return len(self), len(self.columns)
+
+    @property
+    def empty(self):
+        return len(self) == 0 or len(self.columns) == 0
+
+    def __len__(self):
+        if self._rows is None:
+            return len(self._base)
+        if isinstance(self._rows, slice):
+            return self._rows.stop - self._rows.start
+        return len(self._rows)
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    # ------------------------------------------------------------------
+    # Column access
+    # ------------------------------------------------------------------
+
+    def column_values(self, column):
+        """
+        Values of one column for the selected rows.
+
+        Returns:
+        --------
+        numpy.ndarray : A view of the base column when all rows or a slice
+        of rows are selected, otherwise a copy of the selected rows of this
+        column only
+        """
+        if hasattr(self._base, 'column_values'):
+            # Lazy bases resample channels at other rates for these rows only
+            return self._base.column_values(column, self._rows)
+        values = self._base[column].to_numpy()
+        return values if self._rows is None else values[self._rows]
+
+    def base_mask(self, column, condition):
+        """
+        Evaluate a condition on a column over all rows of the base.
+
+        Lazy TDMS bases evaluate it on the channel's native samples rather
+        than on the column resampled onto the row grid.
+
+        Parameters:
+        -----------
+        column : str
+            Column name
+        condition : callable
+            Maps an array of values to a boolean array of the same length
+
+        Returns:
+        --------
+        numpy.ndarray of bool, one entry per base row
+        """
+        if hasattr(self._base, 'grid_mask'):
+            return self._base.grid_mask(column, condition)
+        return condition(self._base[column].to_numpy())
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self.columns:
+                raise KeyError(key)
+            return pd.Series(self.column_values(key), index=self.index, name=key, copy=False)
+
+        if isinstance(key, (list, pd.Index)) and all(isinstance(k, str) for k in key):
+            return pd.DataFrame({k: self.column_values(k) for k in key}, index=self.index)
+
+        return self.select(key)
+
+    # ------------------------------------------------------------------
+    # Row selection
+    # ------------------------------------------------------------------
+
+    def select(self, mask):
+        """
+        Restrict the view to the rows where mask is True.
+
+        Parameters:
+        -----------
+        mask : array-like of bool
+            One entry per currently selected row
+
+        Returns:
+        --------
+        Dataset sharing the base columns
+        """
+        mask = np.asarray(mask, dtype=bool)
+        if len(mask) != len(self):
+            raise ValueError(f"Boolean mask of length {len(mask)} does not match {len(self)} rows")
+        rows = np.flatnonzero(mask) if self._rows is None else self.row_positions()[mask]
+        return self._view(rows)
+
+    def take(self, rows):
+        """View of the given base row positions (sorted integer array)"""
+        return self._view(np.asarray(rows, dtype=np.int64))
+
+    def all_rows(self):
+        """The unfiltered dataset"""
+        if self._rows is None:
+            return self
+        return self._view(None)
+
+    def sort_index(self, column):
+        """
+        Sort index of a base column, built on first use and cached for the
+        lifetime of the base data.
+
+        Returns:
+        --------
+        SortIndex, or None for non-numeric columns and columns resampled
+        onto the rows of a lazy base
+        """
+        if column not in self._sort_indexes:
+            if hasattr(self._base, 'is_resampled') and self._base.is_resampled(column):
+                # Sorting the resampled grid would cost more than one pass over the native samples
+                self._sort_indexes[column] = None
+                return None
+            values = self._base[column].to_numpy()
+            if values.dtype.kind not in 'biuf':
+                self._sort_indexes[column] = None
+            else:
+                self._sort_indexes[column] = SortIndex(values)
+        return self._sort_indexes[column]
+
+    def select_range(self, column, min_val=None, max_val=None):
+        """
+        Restrict the view to rows with min_val <= column <= max_val.
+
+        Uses the column's sort index (two binary searches) instead of
+        comparing every value. None leaves that side of the range open.
+
+        Returns:
+        --------
+        Dataset sharing the base columns
+        """
+        index = self.sort_index(column)
+        if index is None:
+            def in_range(values):
+                mask = np.ones(len(values), dtype=bool)
+                if min_val is not None:
+                    mask &= values >= min_val
+                if max_val is not None:
+                    mask &= values <= max_val
+                return mask
+
+            mask = self.base_mask(column, in_range)
+            return self.select(mask if self._rows is None else mask[self._rows])
+
+        if index.monotonic and (self._rows is None or isinstance(self._rows, slice)):
+            # Sorted column: the range is a contiguous slice of rows
+            selected = index.range_slice(min_val, max_val)
+            if self._rows is not None:
+                selected = slice(max(selected.start, self._rows.start), min(selected.stop, self._rows.stop))
+                selected = slice(selected.start, max(selected.start, selected.stop))
+            return self._view(selected)
+
+        rows = index.range_positions(min_val, max_val)
+        if self._rows is not None:
+            rows = np.intersect1d(self.row_positions(), rows, assume_unique=True)
+        return self._view(rows)
+
+    def copy(self, deep=True):
+        """Datasets are immutable, a copy is the same view"""
+        return self
+
+    # ------------------------------------------------------------------
+    # Multi-rate TDMS support
+    # ------------------------------------------------------------------
+
+    def _lazy_view(self):
+        return self._base if self._rows is None else self._base.take(self.row_positions())
+
+    def is_multi_rate(self):
+        return hasattr(self._base, 'is_multi_rate') and self._base.is_multi_rate()
+
+    def channel_xy(self, x_column, y_column):
+        """X and Y samples of a channel at its native rate (TDMS bases only)"""
+        return self._lazy_view().channel_xy(x_column, y_column)
+
+    # ------------------------------------------------------------------
+    # Summaries and export
+    # ------------------------------------------------------------------
+
+    def fingerprint(self):
+        """Identity of base and selected rows, cheap compared to hashing the data"""
+        if hasattr(self._base, 'fingerprint'):
+            # Lazy bases summarize a growing set of loaded channels
+            return f"{self.version}|{self._base.fingerprint()}"
+        return self.version
+
+    def describe(self):
+        """Summary statistics of the numeric columns, one column in memory at a time"""
+        if hasattr(self._base, 'loaded_columns'):
+            return self._lazy_view().describe()
+
+        stats = {}
+        for i, name in enumerate(self.columns):
+            dtype = self._base.dtypes.iloc[i]
+            if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+                values = self._base.iloc[:, i].to_numpy()
+                if self._rows is not None:
+                    values = values[self._rows]
+                stats[name] = pd.Series(values).describe()
+        return pd.DataFrame(stats)
+
+    def to_dataframe(self):
+        """Materialize the selected rows as a regular DataFrame (for export)"""
+        if hasattr(self._base, 'to_dataframe'):
+            return self._lazy_view().to_dataframe()
+        if self._rows is None:
+            return self._base
+        return self._base.iloc[self._rows]
+
+    def to_csv(self, *args, **kwargs):
+        return self.to_dataframe().to_csv(*args, **kwargs)
+
+    def to_excel(self, *args, **kwargs):
+        return self.to_dataframe().to_excel(*args, **kwargs)
+
+    def close(self):
+        """Release file handles held by the base (open TDMS files)"""
+        if hasattr(self._base, 'close'):
+            self._base.close()
+
+    def __repr__(self):
+        return f"Dataset({len(self)} of {len(self._base)} rows x {len(self.columns)} columns)"
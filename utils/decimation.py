@@ -0,0 +1,229 @@
+"""
+Level-of-detail decimation of plot curves (M4).
+
+A line plot of n samples drawn into w pixel columns looks the same if every
+column only gets the first, minimum, maximum and last sample that falls into
+it, so spikes survive while at most 4 points per column are drawn. M4Pyramid
+stores the index of the minimum and maximum of every bucket of BASE_BUCKET
+samples, and of every bucket twice that size, and so on, built once per
+curve. Decimating a view then reads the level whose buckets are about one
+pixel wide, in time proportional to the pixel width rather than the number
+of samples.
+"""
+
+import numpy as np
+
+# Samples per bucket at the finest pyramid level
+BASE_BUCKET = 32
+
+# Coarsest level: stop halving once a level has this few buckets
+MIN_TOP_BUCKETS = 256
+
+# Up to this many points per pixel the raw samples are drawn as they are
+MAX_POINTS_PER_PIXEL = 4
+
+# Buckets used for the part of the curve outside the view on either side,
+# kept so the curve's data bounds (Y auto-range) do not depend on the view
+CONTEXT_BUCKETS = 64
+
+# Rows per chunk when building the finest level
+BUILD_CHUNK_ROWS = 4 * 1024 * 1024
+
+
+def _extrema_values(values):
+    """Values with NaN replaced so they never win a min or a max"""
+    if values.dtype.kind != 'f':
+        return values, values
+    nan = np.isnan(values)
+    if not nan.any():
+        return values, values
+    return np.where(nan, np.inf, values), np.where(nan, -np.inf, values)
+
+
+def _bucket_extrema(values, size):
+    """
+    Argmin/argmax of consecutive buckets of a 1-D array.
+
+    Returns:
+    --------
+    tuple : (argmin, argmax) relative to the start of values, one entry per
+    bucket, the last bucket may be shorter
+    """
+    n = len(values)
+    n_full = n // size
+    n_buckets = n_full + (1 if n % size else 0)
+    arg_min = np.empty(n_buckets, dtype=np.int64)
+    arg_max = np.empty(n_buckets, dtype=np.int64)
+
+    if n_full:
+        for_min, for_max = _extrema_values(values[:n_full * size])
+        offsets = np.arange(n_full, dtype=np.int64) * size
+        arg_min[:n_full] = for_min.reshape(n_full, size).argmin(axis=1) + offsets
+        arg_max[:n_full] = for_max.reshape(n_full, size).argmax(axis=1) + offsets
+    if n_buckets > n_full:
+        for_min, for_max = _extrema_values(values[n_full * size:])
+        arg_min[-1] = n_full * size + int(for_min.argmin())
+        arg_max[-1] = n_full * size + int(for_max.argmax())
+    return arg_min, arg_max
+
+
+class M4Pyramid:
+    """
+    Multi-resolution min/max index of one curve.
+
+    Parameters:
+    -----------
+    x_data : array-like
+        X values; decimation needs them finite and non-decreasing, other
+        curves are always drawn in full
+    y_data : array-like
+        Y values, NaN allowed (they are never picked as min or max)
+    """
+
+    def __init__(self, x_data, y_data):
+        self.x = np.asarray(x_data)
+        self.y = np.asarray(y_data)
+        self.n = len(self.y)
+        self.levels = []  # (bucket size, argmin, argmax), finest first
+
+        # NaN compares False, so it also fails the monotonicity check
+        self.decimatable = (
+            len(self.x) == self.n and self.n > MAX_POINTS_PER_PIXEL * MIN_TOP_BUCKETS
+            and self.x.dtype.kind in 'iuf' and bool(np.all(self.x[1:] >= self.x[:-1]))
+        )
+        if self.decimatable:
+            self._build()
+
+    def _build(self):
+        size = BASE_BUCKET
+        n_buckets = -(-self.n // size)
+        arg_min = np.empty(n_buckets, dtype=np.int64)
+        arg_max = np.empty(n_buckets, dtype=np.int64)
+
+        chunk = (BUILD_CHUNK_ROWS // size) * size
+        for start in range(0, self.n, chunk):
+            chunk_min, chunk_max = _bucket_extrema(self.y[start:start + chunk], size)
+            first = start // size
+            arg_min[first:first + len(chunk_min)] = chunk_min + start
+            arg_max[first:first + len(chunk_max)] = chunk_max + start
+        self.levels.append((size, arg_min, arg_max))
+
+        while len(arg_min) > MIN_TOP_BUCKETS:
+            # Each bucket of the next level is a pair of buckets of this one
+            size *= 2
+            arg_min = self._merge(arg_min, np.less)
+            arg_max = self._merge(arg_max, np.greater)
+            self.levels.append((size, arg_min, arg_max))
+
+    def _merge(self, indices, better):
+        n_pairs = len(indices) // 2
+        left = indices[0:2 * n_pairs:2]
+        right = indices[1:2 * n_pairs:2]
+        left_values = self.y[left]
+        right_values = self.y[right]
+        take_right = better(right_values, left_values)
+        if self.y.dtype.kind == 'f':
+            # An all-NaN bucket loses against any value
+            take_right |= np.isnan(left_values) & ~np.isnan(right_values)
+        merged = np.where(take_right, right, left)
+        if len(indices) % 2:
+            merged = np.append(merged, indices[-1])
+        return merged
+
+    @property
+    def nbytes(self):
+        return sum(arg_min.nbytes + arg_max.nbytes for _, arg_min, arg_max in self.levels)
+
+    def _span_indices(self, start, stop, n_buckets):
+        """Sorted M4 sample indices of the rows start:stop in about n_buckets buckets"""
+        count = stop - start
+        if count <= MAX_POINTS_PER_PIXEL * n_buckets:
+            return np.arange(start, stop, dtype=np.int64)
+
+        # Smallest level whose buckets hold at least `needed` rows: 1-2 pixels per bucket
+        needed = count / n_buckets
+        level = next((level for level in self.levels if level[0] >= needed), self.levels[-1])
+
+        if level[0] >= 2 * needed:
+            # Buckets finer than the pyramid: fewer than BASE_BUCKET * n_buckets rows, scan them
+            size = int(np.ceil(needed))
+            arg_min, arg_max = _bucket_extrema(self.y[start:stop], size)
+            arg_min += start
+            arg_max += start
+            firsts = np.arange(start, stop, size, dtype=np.int64)
+            lasts = np.minimum(firsts + size, stop) - 1
+        else:
+            # Whole pyramid buckets inside the span, the partial ends are scanned
+            size, level_min, level_max = level
+            first_bucket = -(-start // size)
+            last_bucket = stop // size
+            arg_min = level_min[first_bucket:last_bucket]
+            arg_max = level_max[first_bucket:last_bucket]
+            firsts = np.arange(first_bucket, last_bucket, dtype=np.int64) * size
+            lasts = firsts + size - 1
+
+            head_stop = min(first_bucket * size, stop)
+            tail_start = max(last_bucket * size, head_stop)
+            edges = [(start, head_stop), (tail_start, stop)]
+            extra = [self._single_bucket(a, b) for a, b in edges if b > a]
+            if extra:
+                extra = np.array(extra, dtype=np.int64).T
+                firsts = np.concatenate([firsts, extra[0]])
+                arg_min = np.concatenate([arg_min, extra[1]])
+                arg_max = np.concatenate([arg_max, extra[2]])
+                lasts = np.concatenate([lasts, extra[3]])
+
+        indices = np.concatenate([firsts, arg_min, arg_max, lasts])
+        indices.sort()
+        keep = np.empty(len(indices), dtype=bool)
+        keep[0] = True
+        np.not_equal(indices[1:], indices[:-1], out=keep[1:])
+        return indices[keep]
+
+    def _single_bucket(self, start, stop):
+        arg_min, arg_max = _bucket_extrema(self.y[start:stop], stop - start)
+        return start, start + arg_min[0], start + arg_max[0], stop - 1
+
+    def decimate_indices(self, x_min, x_max, n_pixels):
+        """
+        Sample indices to draw for the view x_min..x_max, n_pixels wide.
+
+        The visible span gets 2-4 points per pixel; the parts left and right
+        of it are kept at CONTEXT_BUCKETS resolution so the line continues
+        off-screen and keeps its full min/max.
+
+        Returns:
+        --------
+        numpy.ndarray of int64 (sorted), or None to draw all samples
+        """
+        if not self.decimatable:
+            return None
+        n_pixels = max(int(n_pixels), 1)
+        if self.n <= MAX_POINTS_PER_PIXEL * n_pixels:
+            return None
+        # One extra sample on either side so the line reaches the view edges
+        start = max(int(np.searchsorted(self.x, x_min, side='left')) - 1, 0)
+        stop = min(int(np.searchsorted(self.x, x_max, side='right')) + 1, self.n)
+        stop = max(stop, start)
+
+        parts = []
+        if start > 0:
+            parts.append(self._span_indices(0, start, CONTEXT_BUCKETS))
+        if stop > start:
+            parts.append(self._span_indices(start, stop, n_pixels))
+        if stop < self.n:
+            parts.append(self._span_indices(stop, self.n, CONTEXT_BUCKETS))
+        return np.concatenate(parts)
+
+    def decimate(self, x_min, x_max, n_pixels):
+        """
+        Curve data to draw for the view x_min..x_max, n_pixels wide.
+
+        Returns:
+        --------
+        tuple : (x, y) arrays, the full data if the curve cannot be decimated
+        """
+        indices = self.decimate_indices(x_min, x_max, n_pixels)
+        if indices is None:
+            return self.x, self.y
+        return self.x[indices], self.y[indices]
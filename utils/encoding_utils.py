@@ -0,0 +1,180 @@
+"""
+Encoding detection for measurement files.
+
+Detection never looks at the whole file: a byte order mark is checked first,
+then the start and end of the file are validated as UTF-8, and only if that
+fails chardet runs on a bounded sample. Results are remembered in a small
+JSON cache keyed by path, size and modification time, so reopening a file
+never detects again.
+"""
+
+import codecs
+import json
+import logging
+import os
+import threading
+
+import chardet
+
+from utils.cache_dir import get_cache_dir
+
+# Byte order marks, longest first (UTF-32 LE starts with the UTF-16 LE BOM)
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Bytes validated as UTF-8 at the start and at the end of the file
+UTF8_CHECK_BYTES = 1024 * 1024
+
+# Bytes handed to chardet when the file is not UTF-8
+CHARDET_SAMPLE_BYTES = 64 * 1024
+
+# Maximum number of files remembered in the cache
+MAX_CACHE_ENTRIES = 1000
+
+CACHE_FILE_NAME = 'encodings.json'
+
+_cache_lock = threading.Lock()
+
+
+def _is_valid_utf8(sample, at_start):
+    """Validate a sample as UTF-8, tolerating characters cut at the sample edges"""
+    if not at_start:
+        # Skip continuation bytes of a character cut at the start of the sample
+        skip = 0
+        while skip < min(3, len(sample)) and (sample[skip] & 0xC0) == 0x80:
+            skip += 1
+        sample = sample[skip:]
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def sniff_encoding(head, tail=b''):
+    """
+    Detect the encoding of a file from a sample of its start and end.
+
+    Parameters:
+    -----------
+    head : bytes
+        First bytes of the file
+    tail : bytes
+        Last bytes of the file (may be empty for small files)
+
+    Returns:
+    --------
+    str : Encoding name usable with open() / bytes.decode()
+    """
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+
+    if _is_valid_utf8(head, at_start=True) and (not tail or _is_valid_utf8(tail, at_start=False)):
+        # Pure ASCII is reported as UTF-8 too, it is a strict subset
+        return 'utf-8'
+
+    if tail:
+        sample = head[:CHARDET_SAMPLE_BYTES // 2] + tail[-CHARDET_SAMPLE_BYTES // 2:]
+    else:
+        sample = head[:CHARDET_SAMPLE_BYTES]
+    result = chardet.detect(sample)
+    encoding = result.get('encoding')
+    logging.debug(f"chardet on {len(sample)} byte sample: {result}")
+    return encoding or 'latin-1'
+
+
+def _file_key(file_name):
+    """Return (cache key, size, mtime_ns) of a file"""
+    stat = os.stat(file_name)
+    return os.path.normcase(os.path.abspath(file_name)), stat.st_size, stat.st_mtime_ns
+
+
+def _cache_path():
+    return os.path.join(get_cache_dir(), CACHE_FILE_NAME)
+
+
+def _read_cache():
+    try:
+        with open(_cache_path(), 'r', encoding='utf-8') as file:
+            cache = json.load(file)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(cache):
+    # Keep the most recently stored entries (dicts preserve insertion order)
+    if len(cache) > MAX_CACHE_ENTRIES:
+        cache = dict(list(cache.items())[-MAX_CACHE_ENTRIES:])
+
+    path = _cache_path()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(cache, file)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.warning(f"Could not write encoding cache: {str(e)}")
+
+
+def detect_encoding(file_name, use_cache=True):
+    """
+    Detect the text encoding of a file, memoized on disk.
+
+    Parameters:
+    -----------
+    file_name : str
+        Path to the file
+    use_cache : bool
+        Look up / store the result in the on-disk cache
+
+    Returns:
+    --------
+    str : Encoding name
+    """
+    key, size, mtime_ns = _file_key(file_name)
+
+    if use_cache:
+        with _cache_lock:
+            entry = _read_cache().get(key)
+        if entry and entry.get('size') == size and entry.get('mtime_ns') == mtime_ns:
+            logging.info(f"Encoding of {os.path.basename(file_name)} from cache: {entry['encoding']}")
+            return entry['encoding']
+
+    with open(file_name, 'rb') as file:
+        head = file.read(UTF8_CHECK_BYTES)
+        tail = b''
+        if size > 2 * UTF8_CHECK_BYTES:
+            file.seek(-UTF8_CHECK_BYTES, os.SEEK_END)
+            tail = file.read(UTF8_CHECK_BYTES)
+        elif size > UTF8_CHECK_BYTES:
+            tail = file.read()
+
+    encoding = sniff_encoding(head, tail)
+    logging.info(f"Detected encoding of {os.path.basename(file_name)}: {encoding}")
+
+    if use_cache:
+        store_encoding(file_name, encoding)
+
+    return encoding
+
+
+def store_encoding(file_name, encoding):
+    """
+    Remember the encoding of a file.
+
+    Loaders call this when they had to fall back to another encoding than the
+    detected one, so the next load starts with the encoding that worked.
+    """
+    key, size, mtime_ns = _file_key(file_name)
+    with _cache_lock:
+        cache = _read_cache()
+        cache.pop(key, None)
+        cache[key] = {'size': size, 'mtime_ns': mtime_ns, 'encoding': encoding}
+        _write_cache(cache)
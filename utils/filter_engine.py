@@ -0,0 +1,287 @@
+"""
+Compound row filters.
+
+A FilterExpression is a list of FilterClause conditions joined by AND / OR
+(AND binds tighter, as usual). FilterEngine evaluates every clause into a
+boolean mask over the full dataset and caches it per dataset and clause, so
+editing one clause only evaluates that clause again; the cached masks of
+the others are just recombined. Clauses are evaluated with numexpr when it
+is installed, otherwise with NumPy in fixed-size chunks to bound the
+temporaries.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+    logging.info("numexpr not installed, filters are evaluated with NumPy")
+
+# Operators and the number of values they take
+OPERATORS = OrderedDict([
+    ('between', 2),
+    ('>=', 1),
+    ('>', 1),
+    ('<=', 1),
+    ('<', 1),
+    ('==', 1),
+    ('!=', 1),
+    ('is not NaN', 0),
+    ('is NaN', 0),
+])
+
+CONNECTORS = ('AND', 'OR')
+
+# Rows per NumPy evaluation chunk
+EVAL_CHUNK_ROWS = 1024 * 1024
+
+# Memory budget of the mask cache
+MAX_CACHED_MASK_BYTES = 512 * 1024 * 1024
+
+
+class FilterClause:
+    """
+    One condition on one column.
+
+    Parameters:
+    -----------
+    column : str
+        Column name
+    op : str
+        One of OPERATORS
+    value, value2 : float, optional
+        Operands; 'between' uses both (inclusive), NaN tests use none
+    connector : str
+        'AND' or 'OR', joins this clause to the previous one
+    """
+
+    def __init__(self, column, op, value=None, value2=None, connector='AND'):
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown filter operator: {op}")
+        if connector not in CONNECTORS:
+            raise ValueError(f"Unknown filter connector: {connector}")
+        n_values = OPERATORS[op]
+        if n_values >= 1 and value is None and not (op == 'between' and value2 is not None):
+            raise ValueError(f"Operator '{op}' on '{column}' needs a value")
+        if op == 'between' and value is not None and value2 is not None and value > value2:
+            raise ValueError(f"Min value must be less than or equal to Max value for '{column}'")
+
+        self.column = column
+        self.op = op
+        self.value = None if n_values == 0 else value
+        self.value2 = value2 if n_values == 2 else None
+        self.connector = connector
+
+    @property
+    def key(self):
+        """Identity of the condition (without the connector), used as cache key"""
+        return self.column, self.op, self.value, self.value2
+
+    def to_dict(self):
+        return {'column': self.column, 'op': self.op, 'value': self.value,
+                'value2': self.value2, 'connector': self.connector}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['column'], data['op'], data.get('value'), data.get('value2'),
+                   data.get('connector', 'AND'))
+
+    def is_range(self):
+        """True for clauses that are a closed/open range on the column"""
+        return self.op in ('between', '>=', '<=')
+
+    def range_bounds(self):
+        if self.op == 'between':
+            return self.value, self.value2
+        if self.op == '>=':
+            return self.value, None
+        return None, self.value
+
+    def __repr__(self):
+        if self.op == 'between':
+            return f"{self.value} <= {self.column} <= {self.value2}"
+        if OPERATORS[self.op] == 0:
+            return f"{self.column} {self.op}"
+        return f"{self.column} {self.op} {self.value}"
+
+
+class FilterExpression:
+    """Clauses joined by their connectors, AND before OR"""
+
+    def __init__(self, clauses):
+        self.clauses = list(clauses)
+
+    def groups(self):
+        """Split into OR-ed groups of AND-ed clauses"""
+        groups = []
+        for i, clause in enumerate(self.clauses):
+            if i == 0 or clause.connector == 'OR':
+                groups.append([])
+            groups[-1].append(clause)
+        return groups
+
+    def columns(self):
+        return list(dict.fromkeys(clause.column for clause in self.clauses))
+
+    def to_list(self):
+        return [clause.to_dict() for clause in self.clauses]
+
+    @classmethod
+    def from_list(cls, items):
+        return cls(FilterClause.from_dict(item) for item in items)
+
+    def __len__(self):
+        return len(self.clauses)
+
+    def __repr__(self):
+        text = ''
+        for i, clause in enumerate(self.clauses):
+            text += (f" {clause.connector} " if i else '') + repr(clause)
+        return text
+
+
+def _numexpr_condition(clause):
+    """numexpr expression text for a clause on the variable x"""
+    if clause.op == 'between':
+        parts = []
+        if clause.value is not None:
+            parts.append('(x >= lo)')
+        if clause.value2 is not None:
+            parts.append('(x <= hi)')
+        return ' & '.join(parts)
+    if clause.op == 'is NaN':
+        return 'x != x'
+    if clause.op == 'is not NaN':
+        return 'x == x'
+    return f"x {clause.op} lo"
+
+
+def _numpy_condition(clause, x):
+    if clause.op == 'between':
+        mask = np.ones(len(x), dtype=bool)
+        if clause.value is not None:
+            mask &= x >= clause.value
+        if clause.value2 is not None:
+            mask &= x <= clause.value2
+        return mask
+    if clause.op == 'is NaN':
+        return np.isnan(x) if x.dtype.kind == 'f' else np.zeros(len(x), dtype=bool)
+    if clause.op == 'is not NaN':
+        return ~np.isnan(x) if x.dtype.kind == 'f' else np.ones(len(x), dtype=bool)
+    if clause.op == '>=':
+        return x >= clause.value
+    if clause.op == '>':
+        return x > clause.value
+    if clause.op == '<=':
+        return x <= clause.value
+    if clause.op == '<':
+        return x < clause.value
+    if clause.op == '==':
+        return x == clause.value
+    return x != clause.value
+
+
+def evaluate_clause(clause, values):
+    """
+    Evaluate one clause over a column.
+
+    Returns:
+    --------
+    numpy.ndarray of bool
+    """
+    values = np.asarray(values)
+    if values.dtype.kind not in 'biuf':
+        raise ValueError(f"Column '{clause.column}' is not numeric and cannot be filtered")
+
+    if numexpr is not None and values.dtype.kind in 'if':
+        local_dict = {'x': values, 'lo': clause.value, 'hi': clause.value2}
+        local_dict = {name: value for name, value in local_dict.items() if value is not None}
+        return numexpr.evaluate(_numexpr_condition(clause), local_dict=local_dict)
+
+    mask = np.empty(len(values), dtype=bool)
+    for start in range(0, len(values), EVAL_CHUNK_ROWS):
+        stop = start + EVAL_CHUNK_ROWS
+        mask[start:stop] = _numpy_condition(clause, values[start:stop])
+    return mask
+
+
+class FilterEngine:
+    """
+    Evaluates filter expressions on Datasets with a per-clause mask cache.
+
+    Masks are computed over all rows of a dataset's base and keyed by
+    (dataset id, clause), so they stay valid for as long as the dataset
+    exists and are reused across edits of other clauses.
+    """
+
+    def __init__(self, max_bytes=MAX_CACHED_MASK_BYTES):
+        self.max_bytes = max_bytes
+        self._masks = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def clause_mask(self, dataset, clause):
+        """Boolean mask of a clause over all rows of the dataset's base"""
+        key = (dataset.base_id, clause.key)
+        with self._lock:
+            mask = self._masks.get(key)
+            if mask is not None:
+                self._masks.move_to_end(key)
+                self.hits += 1
+                return mask
+
+        mask = dataset.base_mask(clause.column, lambda values: evaluate_clause(clause, values))
+        mask.flags.writeable = False
+
+        with self._lock:
+            self.misses += 1
+            self._masks[key] = mask
+            self._size += mask.nbytes
+            while self._size > self.max_bytes and len(self._masks) > 1:
+                _, dropped = self._masks.popitem(last=False)
+                self._size -= dropped.nbytes
+        return mask
+
+    def evaluate(self, dataset, expression):
+        """
+        Combine the clause masks of an expression.
+
+        Returns:
+        --------
+        numpy.ndarray of bool over all rows of the dataset's base
+        """
+        result = None
+        for group in expression.groups():
+            group_mask = None
+            for clause in group:
+                mask = self.clause_mask(dataset, clause)
+                group_mask = mask.copy() if group_mask is None else np.logical_and(group_mask, mask, out=group_mask)
+            result = group_mask if result is None else np.logical_or(result, group_mask, out=result)
+        return result
+
+    def apply(self, dataset, expression):
+        """
+        Filter a dataset.
+
+        Returns:
+        --------
+        Dataset view of the rows matching the expression
+        """
+        base = dataset.all_rows()
+        if len(expression) == 1 and expression.clauses[0].is_range():
+            # A single range uses the sort index, no mask needed
+            clause = expression.clauses[0]
+            return base.select_range(clause.column, *clause.range_bounds())
+        return base.select(self.evaluate(dataset, expression))
+
+    def clear(self):
+        with self._lock:
+            self._masks.clear()
+            self._size = 0
@@ -0,0 +1,69 @@
+"""
+Progress reporting and cancellation for file loaders.
+
+Loaders receive a LoadProgress, report the bytes they have consumed with
+advance() and call check_cancelled() between units of work. Cancelling sets
+a threading.Event from any thread; the loader then raises LoadCancelled at
+its next check.
+"""
+
+import threading
+
+
+class LoadCancelled(Exception):
+    """Raised inside a loader when the user cancelled the load"""
+
+
+class LoadProgress:
+    """
+    Byte based progress of one file load.
+
+    Parameters:
+    -----------
+    callback : callable, optional
+        Called as callback(bytes_done, bytes_total) after every advance()
+    cancel_event : threading.Event, optional
+        Set to request cancellation
+    """
+
+    def __init__(self, callback=None, cancel_event=None):
+        self.callback = callback
+        self.cancel_event = cancel_event or threading.Event()
+        self.total = 0
+        self.done = 0
+        self._lock = threading.Lock()
+
+    def set_total(self, total_bytes):
+        with self._lock:
+            self.total = max(0, int(total_bytes))
+            self.done = 0
+        self._notify()
+
+    def advance(self, n_bytes):
+        """Record consumed bytes, then raise LoadCancelled if cancellation was requested"""
+        with self._lock:
+            self.done = min(self.total, self.done + int(n_bytes)) if self.total else self.done + int(n_bytes)
+        self._notify()
+        self.check_cancelled()
+
+    def set_done(self, done_bytes):
+        with self._lock:
+            self.done = int(done_bytes)
+        self._notify()
+        self.check_cancelled()
+
+    def _notify(self):
+        if self.callback is not None:
+            self.callback(self.done, self.total)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise LoadCancelled("File loading cancelled")
+
@@ -0,0 +1,305 @@
+"""
+Fast LOWESS (locally weighted linear regression) for long signals.
+
+statsmodels' lowess fits a local line at every sample, which costs about
+n * frac * n operations and is unusable beyond a few hundred thousand
+samples. The smoothed curve however varies on the scale of the fit window
+(frac * n samples), so it is enough to fit at a grid of anchor samples a
+fraction of a window apart and interpolate linearly in between. The fits
+at all anchors are done at once with windowed weighted sums (tricube
+weights, k nearest neighbours, like statsmodels).
+
+The interpolation error is controlled: after fitting the anchors, the exact
+fit is computed at the midpoint of every anchor interval and intervals whose
+midpoint deviates by more than max_error are split, until every interval
+passes or is a single sample wide. Inputs of up to EXACT_MAX_POINTS samples
+are fitted at every sample (exact LOWESS).
+
+For evenly spaced X (the sample index) the curve between anchors is smooth
+and the check bounds the error everywhere. With uneven spacing the window
+radius jumps where the data gets denser or sparser, which kinks the curve
+between anchors, so intervals are split at their X midpoint, against half
+of max_error, and whenever they are wider than MAX_SPAN_PER_RADIUS of the
+window radius. The bound is then approximate: on strongly uneven test data
+(exponential spacing, clusters, steps in density) the largest deviation
+stayed within 1.3 times max_error.
+"""
+
+import numpy as np
+
+# Up to this many samples every sample is an anchor
+EXACT_MAX_POINTS = 5000
+
+# Initial anchor spacing: this many anchors per fit window
+ANCHORS_PER_WINDOW = 16
+
+# Anchor intervals wider than this fraction of the fit window radius are
+# always refined (uniform data starts at 1/8: ANCHORS_PER_WINDOW per window)
+MAX_SPAN_PER_RADIUS = 0.25
+
+# Default error bound, relative to the standard deviation of the data
+DEFAULT_RELATIVE_ERROR = 1e-3
+
+# Window samples evaluated at once (bounds the temporary arrays)
+FIT_CHUNK_ELEMENTS = 1024 * 1024
+
+# Robustness weights are zero beyond this many median absolute residuals
+ROBUST_SCALE = 6.0
+
+
+def _neighbourhoods(x, anchors, k):
+    """
+    Start of the k-nearest-neighbour window of each anchor (x sorted).
+
+    Starts centred on the anchor and slides towards the nearer side until
+    no sample outside the window is closer than the far end inside it.
+    """
+    n = len(x)
+    left = np.clip(anchors - k // 2, 0, n - k)
+    x_anchor = x[anchors]
+    for _ in range(n):
+        # Move right while the sample after the window is closer than the first one
+        can_right = left + k < n
+        right_next = x[np.minimum(left + k, n - 1)]
+        move_right = can_right & (right_next - x_anchor < x_anchor - x[left])
+        # Move left while the sample before the window is closer than the last one
+        can_left = left > 0
+        left_prev = x[np.maximum(left - 1, 0)]
+        move_left = can_left & ~move_right & (x_anchor - left_prev < x[left + k - 1] - x_anchor)
+        if not (move_right.any() or move_left.any()):
+            break
+        left = left + move_right - move_left
+    return left
+
+
+def _solve_line(s0, s1, s2, t0, t1, radius, y_anchor):
+    """Value at the anchor of the weighted line fit given the weighted sums (dx centred on the anchor)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = s1 / s0
+        mean_y = t0 / s0
+        variance = s2 / s0 - mean_x ** 2
+        slope = (t1 / s0 - mean_x * mean_y) / variance
+        value = mean_y - slope * mean_x
+        # Degenerate windows (all weight at one x) fall back to the weighted mean
+        flat = ~(variance > 1e-12 * (radius ** 2))
+        value[flat] = mean_y[flat]
+    # Windows without any weight (all robust weights zero): keep the data
+    missing = ~np.isfinite(value)
+    value[missing] = y_anchor[missing]
+    return value
+
+
+def _tricube(distance, radius):
+    return np.clip(1.0 - (distance / radius) ** 3, 0.0, None) ** 3
+
+
+def _fit_at(x, y, weights, anchors, k, uniform=False):
+    """
+    Local weighted linear fit at the anchor samples, and the radius of the
+    fit window (distance to its farthest sample) of each.
+
+    With uniformly spaced x, all anchors whose window is centred on them
+    share one tricube kernel, and the weighted sums become matrix-vector
+    products with it; windows cut by the data ends are weighted row by row.
+    """
+    fitted = np.empty(len(anchors))
+    radii = np.empty(len(anchors))
+    left_all = _neighbourhoods(x, anchors, k)
+    offsets = np.arange(k)
+    chunk = max(1, FIT_CHUNK_ELEMENTS // k)
+
+    centred = np.zeros(len(anchors), dtype=bool)
+    if uniform:
+        centred = anchors - left_all == k // 2
+        step = x[1] - x[0]
+        dx_kernel = (offsets - k // 2) * step
+        radius_kernel = max(k // 2, k - 1 - k // 2) * step
+        kernel = _tricube(np.abs(dx_kernel), radius_kernel)
+        kernel_dx = kernel * dx_kernel
+        kernel_dx2 = kernel_dx * dx_kernel
+        plain = bool(np.all(weights == 1.0))
+
+        rows = np.flatnonzero(centred)
+        for start in range(0, len(rows), chunk):
+            row = rows[start:start + chunk]
+            window = left_all[row][:, None] + offsets[None, :]
+            yw = y[window]
+            if plain:
+                n_rows = len(row)
+                s0 = np.full(n_rows, kernel.sum())
+                s1 = np.full(n_rows, kernel_dx.sum())
+                s2 = np.full(n_rows, kernel_dx2.sum())
+                t0 = yw @ kernel
+                t1 = yw @ kernel_dx
+            else:
+                bw = weights[window]
+                byw = bw * yw
+                s0 = bw @ kernel
+                s1 = bw @ kernel_dx
+                s2 = bw @ kernel_dx2
+                t0 = byw @ kernel
+                t1 = byw @ kernel_dx
+            radii[row] = radius_kernel
+            fitted[row] = _solve_line(s0, s1, s2, t0, t1, radii[row], y[anchors[row]])
+
+    rows = np.flatnonzero(~centred)
+    for start in range(0, len(rows), chunk):
+        row = rows[start:start + chunk]
+        anchor = anchors[row]
+        window = left_all[row][:, None] + offsets[None, :]
+        x_anchor = x[anchor]
+
+        # Tricube weights over the distance to the farthest window sample
+        dx = x[window] - x_anchor[:, None]
+        distance = np.abs(dx)
+        radius = distance.max(axis=1)
+        radius[radius <= 0] = 1.0
+        radii[row] = radius
+        w = _tricube(distance, radius[:, None])
+        w *= weights[window]
+
+        # Weighted least squares of a line, centred on the anchor for accuracy
+        yw = y[window]
+        wdx = w * dx
+        s0 = w.sum(axis=1)
+        s1 = wdx.sum(axis=1)
+        s2 = (wdx * dx).sum(axis=1)
+        t0 = (w * yw).sum(axis=1)
+        t1 = (wdx * yw).sum(axis=1)
+        fitted[row] = _solve_line(s0, s1, s2, t0, t1, radius, y[anchor])
+
+    return fitted, radii
+
+
+def _x_middles(x, left, right):
+    """
+    Sample nearest to the X midpoint of each interval, where the error of
+    linear interpolation peaks, kept within the central half of the samples
+    so that refinement still halves the intervals
+    """
+    middle = np.searchsorted(x, (x[left] + x[right]) / 2.0)
+    quarter = (right - left) // 4
+    return np.clip(middle, left + np.maximum(quarter, 1), right - np.maximum(quarter, 1))
+
+
+def _fit_curve(x, y, weights, k, step, max_error, uniform=False):
+    """Fit at an anchor grid, refine where interpolation is off, interpolate"""
+    n = len(x)
+    anchors = [np.unique(np.concatenate([np.arange(0, n, step), [n - 1]]))]
+    fitted, radius = _fit_at(x, y, weights, anchors[0], k, uniform)
+    values = [fitted]
+
+    # Intervals still to check, as (left, right) anchor samples, their fits and window radii
+    left, right = anchors[0][:-1], anchors[0][1:]
+    left_value, right_value = fitted[:-1], fitted[1:]
+    left_radius, right_radius = radius[:-1], radius[1:]
+    while True:
+        wide = right - left > 1
+        left, right = left[wide], right[wide]
+        left_value, right_value = left_value[wide], right_value[wide]
+        left_radius, right_radius = left_radius[wide], right_radius[wide]
+        if len(left) == 0:
+            break
+
+        # The midpoint fit is computed anyway, so it always becomes an anchor
+        middle = (left + right) // 2 if uniform else _x_middles(x, left, right)
+        exact, middle_radius = _fit_at(x, y, weights, middle, k, uniform)
+        anchors.append(middle)
+        values.append(exact)
+
+        t = (x[middle] - x[left]) / np.where(x[right] > x[left], x[right] - x[left], 1.0)
+        approx = left_value + t * (right_value - left_value)
+        # With uneven spacing a passing midpoint proves little where the fit
+        # window is narrow in X, and the curve kinks where the window starts
+        # to reach into denser or sparser data; a kink elsewhere in the
+        # interval can make the error up to twice that at the midpoint
+        failed = ((np.abs(exact - approx) > (max_error if uniform else max_error / 2.0)) |
+                  (x[right] - x[left] > MAX_SPAN_PER_RADIUS * np.minimum(left_radius, right_radius)))
+
+        # Both halves of a failed interval are checked again
+        left = np.concatenate([left[failed], middle[failed]])
+        right = np.concatenate([middle[failed], right[failed]])
+        left_value = np.concatenate([left_value[failed], exact[failed]])
+        right_value = np.concatenate([exact[failed], right_value[failed]])
+        left_radius = np.concatenate([left_radius[failed], middle_radius[failed]])
+        right_radius = np.concatenate([middle_radius[failed], right_radius[failed]])
+
+    anchors = np.concatenate(anchors)
+    values = np.concatenate(values)
+    order = np.argsort(anchors, kind='stable')
+    return np.interp(x, x[anchors[order]], values[order])
+
+
+def fast_lowess(y, x=None, frac=2.0 / 3.0, iterations=3, max_error=None):
+    """
+    LOWESS smoothing of a signal, approximated on an anchor grid.
+
+    Parameters:
+    -----------
+    y : array-like
+        Values to smooth; NaN samples are ignored by the fits and stay NaN
+    x : array-like, optional
+        Sample positions (default: the sample index); fastest for evenly
+        spaced data
+    frac : float
+        Fraction of the samples in each local fit (0-1]
+    iterations : int
+        Robustifying iterations (as statsmodels' `it`)
+    max_error : float, optional
+        Largest allowed difference between the interpolated and the exact
+        fit, in units of y (default: 1e-3 times the standard deviation of
+        y); approximate for unevenly spaced x (see the module docstring),
+        0 forces the exact fit
+
+    Returns:
+    --------
+    numpy.ndarray : Smoothed values in the order of y
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    x = np.arange(n, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+    if len(x) != n:
+        raise ValueError("x and y must have the same length")
+
+    result = np.full(n, np.nan)
+    valid = np.isfinite(y) & np.isfinite(x)
+    if valid.sum() < 2:
+        result[valid] = y[valid]
+        return result
+
+    order = None
+    if not np.all(x[1:] >= x[:-1]):
+        order = np.argsort(x, kind='stable')
+    xs = x if order is None else x[order]
+    ys = y if order is None else y[order]
+    valid_sorted = valid if order is None else valid[order]
+    xs = xs[valid_sorted]
+    ys = ys[valid_sorted]
+    m = len(xs)
+
+    k = min(max(int(frac * m + 1e-10), 2), m)
+    if max_error is None:
+        max_error = DEFAULT_RELATIVE_ERROR * float(np.std(ys))
+    step = 1 if m <= EXACT_MAX_POINTS or max_error <= 0 else max(1, k // ANCHORS_PER_WINDOW)
+
+    # Evenly spaced samples (the usual case) share one kernel
+    spacing = np.diff(xs)
+    uniform = m > 1 and spacing[0] > 0 and bool(np.allclose(spacing, spacing[0], rtol=1e-9, atol=0))
+
+    weights = np.ones(m)
+    fitted = _fit_curve(xs, ys, weights, k, step, max_error, uniform)
+    for _ in range(iterations):
+        residuals = np.abs(ys - fitted)
+        scale = np.median(residuals)
+        if scale <= 0:
+            break
+        u = residuals / (ROBUST_SCALE * scale)
+        weights = np.where(u < 1.0, (1.0 - u ** 2) ** 2, 0.0)
+        fitted = _fit_curve(xs, ys, weights, k, step, max_error, uniform)
+
+    smoothed = np.full(len(valid_sorted), np.nan)
+    smoothed[valid_sorted] = fitted
+    if order is None:
+        return smoothed
+    result[order] = smoothed
+    return result
@@ -0,0 +1,188 @@
+"""
+NaN-aware variants of the smoothing filters.
+
+Columns read with pd.to_numeric(errors='coerce') contain NaN wherever a
+value could not be parsed. scipy's filters either spread such a NaN over a
+whole window (gaussian_filter1d) or refuse the data (savgol_filter), so the
+smoothers here treat NaN samples as missing:
+
+- nan_gaussian_filter1d uses normalized convolution: the filtered data with
+  NaN set to zero, divided by the filtered validity mask.
+- nan_savgol_filter fits the local polynomial by weighted least squares
+  (weight 0 for missing samples) wherever a window contains a gap.
+- nan_median_filter takes the median of the valid samples of a window.
+- nan_segments applies a filter to each run of valid samples (for recursive
+  filters such as Butterworth, where one NaN would poison everything after).
+
+Samples whose window has no gap are computed by the plain scipy filter in
+one pass over the whole array, and only the samples near gaps are
+recomputed. NaN samples stay NaN in the output, so gaps remain visible.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.ndimage import gaussian_filter1d, maximum_filter1d, median_filter
+from scipy.signal import savgol_filter
+
+# Window elements gathered at once when recomputing samples near gaps
+GAP_BLOCK_ELEMENTS = 1024 * 1024
+
+
+def _near_gaps(invalid, window_length, mode='constant'):
+    """Samples whose centred window of window_length samples contains a missing one"""
+    return maximum_filter1d(invalid.view(np.uint8), size=window_length, mode=mode).astype(bool)
+
+
+def _blocks(rows, window_length):
+    """Split sample indices into blocks of at most GAP_BLOCK_ELEMENTS window elements"""
+    size = max(1, GAP_BLOCK_ELEMENTS // window_length)
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def nan_gaussian_filter1d(data, sigma, axis=0):
+    """
+    Gaussian filter that ignores NaN samples (normalized convolution).
+
+    Parameters:
+    -----------
+    data : array-like
+        Signal, or array of signals along axis
+    sigma : float
+        Standard deviation of the Gaussian kernel in samples
+
+    Returns:
+    --------
+    numpy.ndarray : smoothed data, NaN where data is NaN
+    """
+    data = np.asarray(data, dtype=np.float64)
+    valid = np.isfinite(data)
+    if valid.all():
+        return gaussian_filter1d(data, sigma=sigma, axis=axis)
+
+    smoothed = gaussian_filter1d(np.where(valid, data, 0.0), sigma=sigma, axis=axis)
+    weight = gaussian_filter1d(valid.astype(np.float64), sigma=sigma, axis=axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        smoothed /= weight
+    smoothed[~valid] = np.nan
+    return smoothed
+
+
+def _weighted_polyfit(values, weights, positions, polyorder):
+    """
+    Coefficients (lowest order first) of weighted least-squares polynomial
+    fits of many windows: values and weights are (rows, window) arrays,
+    positions the (window,) sample offsets.
+    """
+    basis = positions[:, None] ** np.arange(polyorder + 1)
+    normal = np.einsum('rw,wk,wl->rkl', weights, basis, basis)
+    rhs = np.einsum('rw,wk->rk', weights * values, basis)
+    # pinv: windows with fewer valid samples than coefficients still get a fit
+    return np.einsum('rkl,rl->rk', np.linalg.pinv(normal), rhs)
+
+
+def nan_savgol_filter(data, window_length, polyorder):
+    """
+    Savitzky-Golay filter that ignores NaN samples.
+
+    Windows without gaps give exactly savgol_filter's result (including
+    its polynomial fit of the first and last window at the ends); windows
+    with gaps are fitted to their valid samples only.
+
+    Parameters:
+    -----------
+    data : array-like
+        1-D signal
+    window_length : int
+        Odd window length, at most len(data)
+    polyorder : int
+        Polynomial order, less than window_length
+
+    Returns:
+    --------
+    numpy.ndarray : smoothed data, NaN where data is NaN
+    """
+    data = np.asarray(data, dtype=np.float64)
+    valid = np.isfinite(data)
+    if valid.all():
+        return savgol_filter(data, window_length, polyorder)
+
+    n = len(data)
+    half = window_length // 2
+    filled = np.where(valid, data, 0.0)
+    smoothed = savgol_filter(filled, window_length, polyorder)
+    offsets = np.arange(-half, half + 1, dtype=np.float64)
+
+    # Interior samples whose window has a gap: local weighted fits
+    rows = np.flatnonzero(_near_gaps(~valid, window_length) & valid)
+    rows = rows[(rows >= half) & (rows < n - half)]
+    for block in _blocks(rows, window_length):
+        window = block[:, None] + np.arange(-half, half + 1)
+        # Offsets are centred on the sample, so its value is the constant term
+        smoothed[block] = _weighted_polyfit(filled[window], valid[window].astype(np.float64),
+                                            offsets, polyorder)[:, 0]
+
+    # The first and last half windows come from one fit of the end window
+    x = np.arange(window_length, dtype=np.float64)
+    ends = ((0, np.arange(half)), (n - window_length, np.arange(window_length - half, window_length)))
+    for start, positions in ends:
+        edge = slice(start, start + window_length)
+        if valid[edge].all():
+            continue
+        coefficients = _weighted_polyfit(filled[None, edge], valid[None, edge].astype(np.float64),
+                                         x, polyorder)[0]
+        smoothed[start + positions] = (positions[:, None] ** np.arange(polyorder + 1)) @ coefficients
+
+    smoothed[~valid] = np.nan
+    return smoothed
+
+
+def nan_median_filter(data, size):
+    """
+    Median filter over the valid samples of each window.
+
+    Parameters:
+    -----------
+    data : array-like
+        1-D signal
+    size : int
+        Odd window length; the ends are mirrored as median_filter does
+
+    Returns:
+    --------
+    numpy.ndarray : smoothed data, NaN where data is NaN
+    """
+    data = np.asarray(data, dtype=np.float64)
+    valid = np.isfinite(data)
+    if valid.all():
+        return median_filter(data, size=size)
+
+    half = size // 2
+    smoothed = median_filter(np.where(valid, data, 0.0), size=size)
+    rows = np.flatnonzero(_near_gaps(~valid, size, mode='reflect') & valid)
+    # median_filter's 'reflect' mode repeats the edge sample (numpy 'symmetric')
+    windows = sliding_window_view(np.pad(data, half, mode='symmetric'), size)
+    for block in _blocks(rows, size):
+        smoothed[block] = np.nanmedian(windows[block], axis=1)
+    smoothed[~valid] = np.nan
+    return smoothed
+
+
+def nan_segments(func, data, min_length=2):
+    """
+    Apply func to each run of valid samples of a 1-D signal.
+
+    Runs shorter than min_length are kept as they are; NaN samples stay NaN.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    valid = np.isfinite(data)
+    if valid.all():
+        return func(data)
+
+    result = data.copy()
+    result[~valid] = np.nan
+    edges = np.flatnonzero(np.diff(np.concatenate([[False], valid, [False]]).astype(np.int8)))
+    for start, stop in zip(edges[::2], edges[1::2]):
+        if stop - start >= min_length:
+            result[start:stop] = func(data[start:stop])
+    return result
@@ -0,0 +1,493 @@
+"""
+Nonlinear least-squares models for curve fitting.
+
+curve_fit with a fixed starting point and finite-difference Jacobians
+needs many iterations on real data, and fails outright when the start is
+far from the solution (an exponential started at b = 0.1 on a time axis of
+thousands of seconds overflows). Every model here has:
+
+- the analytic Jacobian of the model function;
+- a closed-form or linearized initial estimate from the data (log-linear
+  regression for the exponential, an integral equation for the exponential
+  with offset, level crossings for the logistic and the step response),
+  which is usually close enough for a handful of iterations;
+- models whose shape does not depend on the origin of X are fitted on
+  X - min(X), so time stamps do not overflow the exponentials.
+
+fit_nonlinear fits a decimated subset of at most PREFIT_SAMPLES samples
+first and refines on all samples with Levenberg-Marquardt steps whose
+linear systems are accumulated chunk by chunk (the triangular factor of
+[J | r], as in poly_fit), so memory does not grow with the row count.
+"""
+
+import numpy as np
+from scipy.linalg import qr
+from scipy.optimize import least_squares
+
+# Samples used for the initial estimate and the pre-fit
+PREFIT_SAMPLES = 50000
+
+# Samples per chunk of the full-data refinement
+REFINE_CHUNK_ROWS = 64 * 1024
+
+# Levenberg-Marquardt iterations of the full-data refinement
+MAX_REFINE_ITERATIONS = 50
+
+# ln(81): X distance between the 10% and 90% levels of a logistic with k = 1
+LOGISTIC_10_90 = np.log(81.0)
+
+
+def _linear_fit(columns, y, weights=None):
+    """Least-squares coefficients of y on the given columns"""
+    design = np.column_stack(columns)
+    if weights is not None:
+        design = design * weights[:, None]
+        y = y * weights
+    return np.linalg.lstsq(design, y, rcond=None)[0]
+
+
+def _smoothed(y):
+    """Running mean over about 2% of the (sorted) samples, for level crossings"""
+    width = max(1, len(y) // 50)
+    if width == 1:
+        return y
+    sums = np.concatenate([[0.0], np.cumsum(y)])
+    head = width // 2
+    smooth = np.empty_like(y)
+    lo = np.maximum(np.arange(len(y)) - head, 0)
+    hi = np.minimum(lo + width, len(y))
+    smooth[:] = (sums[hi] - sums[lo]) / (hi - lo)
+    return smooth
+
+
+def _first_crossing(u, fraction, level):
+    """First X where the rising fraction reaches level (the last X if never)"""
+    index = np.flatnonzero(fraction >= level)
+    return u[index[0]] if len(index) else u[-1]
+
+
+def _signed(value):
+    """'+ value' or '- |value|', for the terms of an equation"""
+    return f"+ {value:.6g}" if value >= 0 else f"- {-value:.6g}"
+
+
+def _trend(y):
+    """+1 if the sorted samples rise overall, -1 if they fall"""
+    edge = max(1, len(y) // 10)
+    return 1.0 if np.mean(y[-edge:]) >= np.mean(y[:edge]) else -1.0
+
+
+class NonlinearModel:
+    """
+    Base class of the models: subclasses define the function, its Jacobian,
+    the initial estimate and the equation text.
+    """
+
+    name = ''
+    parameters = ()
+    # Fitted on X - min(X); False for models tied to X = 0
+    shift_x = True
+
+    def evaluate(self, u, p):
+        raise NotImplementedError
+
+    def jacobian(self, u, p):
+        """(samples, parameters) array of the partial derivatives"""
+        raise NotImplementedError
+
+    def initial_guess(self, u, y):
+        """Starting parameters from samples sorted by u"""
+        raise NotImplementedError
+
+    def equation(self, p, shift):
+        raise NotImplementedError
+
+    def valid(self, u):
+        """Samples inside the model's domain"""
+        return np.ones(len(u), dtype=bool)
+
+    @staticmethod
+    def _x(shift):
+        return f"(x - {shift:.10g})" if shift else "x"
+
+    @staticmethod
+    def _unshifted_amplitude(a, b, shift):
+        """a * e^(b (x - shift)) as a * e^(bx); None when that overflows"""
+        with np.errstate(over='ignore', under='ignore'):
+            amplitude = a * np.exp(-b * shift)
+        return amplitude if np.isfinite(amplitude) and (amplitude != 0 or a == 0) else None
+
+
+class ExponentialModel(NonlinearModel):
+    """y = a * e^(b x)"""
+
+    name = 'Exponential'
+    parameters = ('a', 'b')
+
+    def evaluate(self, u, p):
+        a, b = p
+        return a * np.exp(b * u)
+
+    def jacobian(self, u, p):
+        a, b = p
+        e = np.exp(b * u)
+        return np.column_stack([e, a * u * e])
+
+    def initial_guess(self, u, y):
+        # Log-linear fit of the samples with the dominant sign, weighted by
+        # |y| so the noisy samples near zero do not dominate the logarithm
+        sign = 1.0 if np.sum(y > 0) >= np.sum(y < 0) else -1.0
+        keep = sign * y > 0
+        if keep.sum() < 2:
+            return np.array([np.mean(y), 0.0])
+        magnitude = sign * y[keep]
+        ln_a, b = _linear_fit([np.ones(keep.sum()), u[keep]], np.log(magnitude), weights=magnitude)
+        return np.array([sign * np.exp(ln_a), b])
+
+    def equation(self, p, shift):
+        amplitude = self._unshifted_amplitude(p[0], p[1], shift)
+        if amplitude is not None:
+            return f"y = {amplitude:.6g} * e^({p[1]:.6g}x)"
+        return f"y = {p[0]:.6g} * e^({p[1]:.6g}{self._x(shift)})"
+
+
+class ExponentialOffsetModel(NonlinearModel):
+    """y = a * e^(b x) + c"""
+
+    name = 'Exponential + Offset'
+    parameters = ('a', 'b', 'c')
+
+    def evaluate(self, u, p):
+        a, b, c = p
+        return a * np.exp(b * u) + c
+
+    def jacobian(self, u, p):
+        a, b, _ = p
+        e = np.exp(b * u)
+        return np.column_stack([e, a * u * e, np.ones(len(u))])
+
+    def initial_guess(self, u, y):
+        # y - c = a e^(bu) satisfies y = y_0 + b * (integral of y) - b c u,
+        # linear in the running integral S: regress y on [1, u, S] for b
+        # (Jacquelin's method), then a and c on [e^(bu), 1]
+        integral = np.concatenate([[0.0], np.cumsum((y[1:] + y[:-1]) / 2.0 * np.diff(u))])
+        b = _linear_fit([np.ones(len(u)), u - u[0], integral], y)[2]
+        span = u[-1] - u[0]
+        if not np.isfinite(b) or span <= 0 or abs(b) * span > 700:
+            b = _trend(y) / span if span > 0 else 0.0
+        a, c = _linear_fit([np.exp(b * u), np.ones(len(u))], y)
+        return np.array([a, b, c])
+
+    def equation(self, p, shift):
+        amplitude = self._unshifted_amplitude(p[0], p[1], shift)
+        if amplitude is not None:
+            return f"y = {amplitude:.6g} * e^({p[1]:.6g}x) {_signed(p[2])}"
+        return f"y = {p[0]:.6g} * e^({p[1]:.6g}{self._x(shift)}) {_signed(p[2])}"
+
+
+class PowerLawModel(NonlinearModel):
+    """y = a * x^b (x > 0)"""
+
+    name = 'Power Law'
+    parameters = ('a', 'b')
+    shift_x = False
+
+    def valid(self, u):
+        return u > 0
+
+    def evaluate(self, u, p):
+        a, b = p
+        return a * np.power(u, b)
+
+    def jacobian(self, u, p):
+        a, b = p
+        power = np.power(u, b)
+        return np.column_stack([power, a * power * np.log(u)])
+
+    def initial_guess(self, u, y):
+        # Log-log linear fit, weighted by |y| as for the exponential
+        sign = 1.0 if np.sum(y > 0) >= np.sum(y < 0) else -1.0
+        keep = sign * y > 0
+        if keep.sum() < 2:
+            return np.array([np.mean(y), 0.0])
+        magnitude = sign * y[keep]
+        ln_a, b = _linear_fit([np.ones(keep.sum()), np.log(u[keep])], np.log(magnitude), weights=magnitude)
+        return np.array([sign * np.exp(ln_a), b])
+
+    def equation(self, p, shift):
+        return f"y = {p[0]:.6g} * x^{p[1]:.6g}"
+
+
+class LogarithmicModel(NonlinearModel):
+    """y = a + b * ln(x) (x > 0)"""
+
+    name = 'Logarithmic'
+    parameters = ('a', 'b')
+    shift_x = False
+
+    def valid(self, u):
+        return u > 0
+
+    def evaluate(self, u, p):
+        a, b = p
+        return a + b * np.log(u)
+
+    def jacobian(self, u, p):
+        return np.column_stack([np.ones(len(u)), np.log(u)])
+
+    def initial_guess(self, u, y):
+        # Linear in the parameters: the estimate is the least-squares solution
+        return _linear_fit([np.ones(len(u)), np.log(u)], y)
+
+    def equation(self, p, shift):
+        return f"y = {p[0]:.6g} {_signed(p[1])} * ln(x)"
+
+
+class LogisticModel(NonlinearModel):
+    """y = c + L / (1 + e^(-k (x - x0)))"""
+
+    name = 'Logistic'
+    parameters = ('L', 'k', 'x0', 'c')
+
+    def evaluate(self, u, p):
+        height, k, x0, c = p
+        return c + height / (1.0 + np.exp(-k * (u - x0)))
+
+    def jacobian(self, u, p):
+        height, k, x0, _ = p
+        s = 1.0 / (1.0 + np.exp(-k * (u - x0)))
+        slope = height * s * (1.0 - s)
+        return np.column_stack([s, slope * (u - x0), -slope * k, np.ones(len(u))])
+
+    def initial_guess(self, u, y):
+        # Baseline and height from the extremes of the smoothed samples, the
+        # midpoint and k from the 10%, 50% and 90% level crossings
+        smooth = _smoothed(y)
+        low, high = np.min(smooth), np.max(smooth)
+        if _trend(y) > 0:
+            c, height = low, high - low
+        else:
+            c, height = high, low - high
+        if height == 0:
+            return np.array([0.0, 0.0, np.mean(u), c])
+        fraction = (smooth - c) / height
+        x10, x0, x90 = (_first_crossing(u, fraction, level) for level in (0.1, 0.5, 0.9))
+        width = x90 - x10
+        if width <= 0:
+            width = (u[-1] - u[0]) / 10.0 or 1.0
+        return np.array([height, LOGISTIC_10_90 / width, x0, c])
+
+    def equation(self, p, shift):
+        return f"y = {p[3]:.6g} {_signed(p[0])} / (1 + e^(-{p[1]:.6g}(x - {p[2] + shift:.10g})))"
+
+
+class StepResponseModel(NonlinearModel):
+    """y = y0 + K * (1 - e^(-(x - t0) / tau)) for x >= t0, y0 before"""
+
+    name = 'Step Response (1st Order)'
+    parameters = ('y0', 'K', 't0', 'tau')
+
+    def evaluate(self, u, p):
+        y0, gain, t0, tau = p
+        return y0 + gain * (1.0 - np.exp(-np.maximum(u - t0, 0.0) / tau))
+
+    def jacobian(self, u, p):
+        _, gain, t0, tau = p
+        elapsed = np.maximum(u - t0, 0.0)
+        decay = np.exp(-elapsed / tau)
+        started = u > t0
+        return np.column_stack([
+            np.ones(len(u)),
+            1.0 - decay,
+            np.where(started, -gain * decay / tau, 0.0),
+            -gain * elapsed * decay / tau ** 2,
+        ])
+
+    def initial_guess(self, u, y):
+        # Levels from the first and last 5% of the samples; a first-order
+        # response reaches 5% of the step 0.051 tau and 63.2% one tau after t0
+        edge = max(1, len(y) // 20)
+        y0, y_end = np.mean(y[:edge]), np.mean(y[-edge:])
+        gain = y_end - y0
+        span = (u[-1] - u[0]) or 1.0
+        if gain == 0:
+            return np.array([y0, 0.0, u[0], span / 5.0])
+        fraction = (_smoothed(y) - y0) / gain
+        t5 = _first_crossing(u, fraction, 0.05)
+        t63 = _first_crossing(u, fraction, 1.0 - np.exp(-1.0))
+        tau = (t63 - t5) / (1.0 - 0.0513)
+        if tau <= 0:
+            tau = span / 5.0
+        return np.array([y0, gain, t5 - 0.0513 * tau, tau])
+
+    def equation(self, p, shift):
+        return (f"y = {p[0]:.6g} {_signed(p[1])} * (1 - e^(-(x - {p[2] + shift:.10g}) / {p[3]:.6g})), "
+                f"x ≥ {p[2] + shift:.10g}")
+
+
+NONLINEAR_MODELS = {model.name: model for model in (
+    ExponentialModel(),
+    ExponentialOffsetModel(),
+    PowerLawModel(),
+    LogarithmicModel(),
+    LogisticModel(),
+    StepResponseModel(),
+)}
+
+
+def _valid_mask(model, u, y):
+    mask = np.isfinite(u) & np.isfinite(y)
+    mask[mask] = model.valid(u[mask])
+    return mask
+
+
+def _decimated(u, y, mask, samples):
+    """Evenly spaced valid samples (at most `samples`), sorted by u"""
+    index = np.flatnonzero(mask)
+    if len(index) > samples:
+        index = index[np.linspace(0, len(index) - 1, samples).astype(np.int64)]
+    u_part, y_part = u[index], y[index]
+    order = np.argsort(u_part, kind='stable')
+    return u_part[order], y_part[order]
+
+
+def _least_squares(model, u, y, p0):
+    """Levenberg-Marquardt fit of samples held in memory"""
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        result = least_squares(lambda p: model.evaluate(u, p) - y, p0,
+                               jac=lambda p: model.jacobian(u, p), method='lm', x_scale='jac')
+    if not np.all(np.isfinite(result.x)):
+        raise ValueError(f"{model.name} fit did not converge")
+    return result.x
+
+
+def _factor(model, u, y, p):
+    """
+    Triangular factor of [J | r] over all valid samples, in chunks.
+
+    Returns:
+    --------
+    tuple : (R of J, Qᵀr, sum of squared residuals)
+    """
+    width = len(p) + 1
+    r = np.zeros((width, width))
+    ssr = 0.0
+    buffer = np.empty((width + REFINE_CHUNK_ROWS, width), order='F')
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        for start in range(0, len(u), REFINE_CHUNK_ROWS):
+            us = u[start:start + REFINE_CHUNK_ROWS]
+            ys = y[start:start + REFINE_CHUNK_ROWS]
+            mask = _valid_mask(model, us, ys)
+            if not mask.all():
+                us, ys = us[mask], ys[mask]
+            if len(us) == 0:
+                continue
+            residual = ys - model.evaluate(us, p)
+            ssr += float(residual @ residual)
+            if not np.isfinite(ssr):
+                return None, None, np.inf
+
+            block = buffer[:width + len(us)]
+            block[:width] = r
+            block[width:, :-1] = model.jacobian(us, p)
+            block[width:, -1] = residual
+            r = qr(block, mode='r', overwrite_a=True, check_finite=False)[0][:width]
+    return r[:-1, :-1], r[:-1, -1], ssr
+
+
+def _refine(model, u, y, p):
+    """Levenberg-Marquardt on all samples with chunk-accumulated linear systems"""
+    damping = 1e-3
+    r1, z, ssr = _factor(model, u, y, p)
+    if not np.isfinite(ssr):
+        raise ValueError(f"{model.name} fit diverged from its starting point")
+
+    for _ in range(MAX_REFINE_ITERATIONS):
+        # Marquardt scaling by the column norms of J keeps the step
+        # independent of the parameter units
+        scale = np.linalg.norm(r1, axis=0)
+        scale[scale == 0] = 1.0
+        while True:
+            system = np.vstack([r1, np.sqrt(damping) * np.diag(scale)])
+            step = np.linalg.lstsq(system, np.concatenate([z, np.zeros(len(p))]), rcond=None)[0]
+            trial = p + step
+            r1_new, z_new, ssr_new = _factor(model, u, y, trial)
+            if ssr_new <= ssr:
+                break
+            damping *= 10.0
+            if damping > 1e10:
+                return p, ssr
+        converged = ssr - ssr_new <= 1e-12 * ssr or np.linalg.norm(step) <= 1e-10 * (np.linalg.norm(p) + 1e-10)
+        p, r1, z, ssr = trial, r1_new, z_new, ssr_new
+        damping = max(damping / 10.0, 1e-12)
+        if converged:
+            break
+    return p, ssr
+
+
+def fit_nonlinear(x, y, model_name, prefit=True):
+    """
+    Fit one of NONLINEAR_MODELS.
+
+    Parameters:
+    -----------
+    x, y : array-like
+        Samples; non-finite pairs and samples outside the model's domain
+        (x <= 0 for the power law and logarithm) are skipped
+    model_name : str
+        Key of NONLINEAR_MODELS
+    prefit : bool
+        Fit a decimated subset of PREFIT_SAMPLES samples before refining on
+        all samples (only matters for longer columns)
+
+    Returns:
+    --------
+    tuple : (params, shift, r_squared, residual_rms, n_points) where the
+    model is evaluated at x - shift
+    """
+    model = NONLINEAR_MODELS[model_name]
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) != len(y):
+        raise ValueError("x and y must have the same length")
+
+    mask = _valid_mask(model, x, y)
+    n_points = int(np.count_nonzero(mask))
+    if n_points <= len(model.parameters):
+        raise ValueError(f"Not enough data points for a {model.name} fit. "
+                         f"Need at least {len(model.parameters) + 1} points, but only have {n_points} points.")
+
+    shift = float(np.min(x, where=mask, initial=np.inf)) if model.shift_x else 0.0
+    u = x - shift if shift else x
+
+    u_part, y_part = _decimated(u, y, mask, PREFIT_SAMPLES)
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        p = np.asarray(model.initial_guess(u_part, y_part), dtype=np.float64)
+    if not np.all(np.isfinite(p)):
+        raise ValueError(f"No initial estimate for a {model.name} fit of this data")
+
+    if n_points <= PREFIT_SAMPLES:
+        # The subset holds all samples
+        p = _least_squares(model, u_part, y_part, p)
+        with np.errstate(over='ignore', invalid='ignore'):
+            residual = y_part - model.evaluate(u_part, p)
+        ssr = float(residual @ residual)
+    else:
+        if prefit:
+            p = _least_squares(model, u_part, y_part, p)
+        p, ssr = _refine(model, u, y, p)
+
+    if not np.isfinite(ssr):
+        raise ValueError(f"{model.name} fit did not converge")
+    ss_tot = float(np.var(y, where=mask)) * n_points
+    if ss_tot == 0:
+        r_squared = 1.0 if ssr == 0 else 0.0
+    else:
+        r_squared = 1.0 - ssr / ss_tot
+    return p, shift, r_squared, float(np.sqrt(ssr / n_points)), n_points
+
+
+def evaluate_model(model_name, params, shift, x):
+    """Value of a fitted model at x"""
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        return NONLINEAR_MODELS[model_name].evaluate(np.asarray(x, dtype=np.float64) - shift, params)
@@ -0,0 +1,158 @@
+"""
+Polynomial least-squares fitting for long columns.
+
+np.polyfit builds the full n x (degree + 1) Vandermonde matrix of the raw
+X values: 800 MB for 10M samples at degree 9, and badly conditioned when X
+is far from zero (time stamps) or spans a wide range. ChunkedPolynomialFit
+instead:
+
+- maps X onto [-1, 1] and uses the Chebyshev polynomials as basis, whose
+  columns stay well conditioned at high degrees;
+- reads the samples in chunks of FIT_CHUNK_ROWS and keeps only the
+  triangular factor R of the QR decomposition of [basis | y] seen so far
+  (RᵀR is the normal matrix, without squaring its condition number): each
+  chunk is stacked under R and factorized again;
+- solves the small triangular system for the coefficients; the last
+  diagonal element of R is the residual norm, so R² needs no second pass.
+
+Memory use depends on the chunk size and degree only, not on the row count.
+"""
+
+import numpy as np
+from numpy.polynomial import Chebyshev, Polynomial
+from scipy.linalg import qr
+
+# Samples processed per chunk
+FIT_CHUNK_ROWS = 64 * 1024
+
+
+def _chebyshev_rows(t, degree, out):
+    """Chebyshev polynomials T_0..T_degree of t into the first columns of out"""
+    out[:, 0] = 1.0
+    if degree >= 1:
+        out[:, 1] = t
+    for k in range(2, degree + 1):
+        np.multiply(t, out[:, k - 1], out=out[:, k])
+        out[:, k] *= 2.0
+        out[:, k] -= out[:, k - 2]
+
+
+class ChunkedPolynomialFit:
+    """
+    Streaming polynomial least-squares fit on a fixed X range.
+
+    Parameters:
+    -----------
+    degree : int
+        Polynomial degree
+    x_min, x_max : float
+        Range of the X values, mapped onto [-1, 1]
+    """
+
+    def __init__(self, degree, x_min, x_max):
+        self.degree = int(degree)
+        if x_max <= x_min:
+            # A single X value: any range works, the fit is a constant
+            x_min, x_max = x_min - 1.0, x_min + 1.0
+        self.domain = (float(x_min), float(x_max))
+        self._scale = 2.0 / (self.domain[1] - self.domain[0])
+        self._center = (self.domain[0] + self.domain[1]) / 2.0
+
+        # Triangular factor of [basis | y], plus the running count, mean and
+        # sum of squared deviations of y for the total sum of squares
+        self._width = self.degree + 2
+        self._r = np.zeros((self._width, self._width))
+        self.count = 0
+        self._y_mean = 0.0
+        self._y_m2 = 0.0
+
+    def update(self, x, y):
+        """Add samples (non-finite pairs are skipped)"""
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if len(x) != len(y):
+            raise ValueError("x and y must have the same length")
+
+        width = self._width
+        buffer = np.empty((width + min(FIT_CHUNK_ROWS, len(x)), width), order='F')
+        for start in range(0, len(x), FIT_CHUNK_ROWS):
+            xs = x[start:start + FIT_CHUNK_ROWS]
+            ys = y[start:start + FIT_CHUNK_ROWS]
+            finite = np.isfinite(xs) & np.isfinite(ys)
+            if not finite.all():
+                xs, ys = xs[finite], ys[finite]
+            rows = len(xs)
+            if rows == 0:
+                continue
+
+            block = buffer[:width + rows]
+            block[:width] = self._r
+            _chebyshev_rows((xs - self._center) * self._scale, self.degree, block[width:])
+            block[width:, -1] = ys
+            self._r = qr(block, mode='r', overwrite_a=True, check_finite=False)[0][:width]
+
+            # Chan et al.'s pairwise update of the mean and squared deviations
+            mean = float(np.mean(ys))
+            m2 = float(np.sum((ys - mean) ** 2))
+            total = self.count + rows
+            delta = mean - self._y_mean
+            self._y_m2 += m2 + delta ** 2 * self.count * rows / total
+            self._y_mean += delta * rows / total
+            self.count = total
+        return self
+
+    def solve(self):
+        """
+        Coefficients of the fit.
+
+        Returns:
+        --------
+        tuple : (Chebyshev series on the X range, R-squared, residual RMS,
+        rank of the basis)
+        """
+        if self.count == 0:
+            raise ValueError("No valid data points for fitting")
+        triangle = self._r[:-1, :-1]
+        rhs = self._r[:-1, -1]
+        # lstsq on the small triangle also copes with too few distinct X values
+        coef, _, rank, _ = np.linalg.lstsq(triangle, rhs, rcond=None)
+        ss_res = self._r[-1, -1] ** 2 + np.sum((triangle @ coef - rhs) ** 2)
+
+        if self._y_m2 == 0:
+            r_squared = 1.0 if np.isclose(ss_res, 0.0) else 0.0
+        else:
+            r_squared = 1.0 - ss_res / self._y_m2
+        residual_rms = np.sqrt(ss_res / self.count)
+        return Chebyshev(coef, domain=self.domain), float(r_squared), float(residual_rms), int(rank)
+
+
+def fit_polynomial(x, y, degree):
+    """
+    Least-squares polynomial fit of y over x in chunks.
+
+    Parameters:
+    -----------
+    x, y : array-like
+        Samples; pairs with a non-finite value are skipped
+    degree : int
+        Polynomial degree
+
+    Returns:
+    --------
+    tuple : (coeffs, fit_func, r_squared, residual_rms, rank) where coeffs are the power
+    series coefficients from highest to lowest degree (as np.polyfit
+    returns them, for display) and fit_func evaluates the fit in the
+    Chebyshev basis, which stays accurate where the power form cancels
+    """
+    x = np.asarray(x, dtype=np.float64)
+    finite = np.isfinite(x)
+    finite_x = x if finite.all() else x[finite]
+    if len(finite_x) == 0:
+        raise ValueError("No valid data points for fitting")
+
+    fitter = ChunkedPolynomialFit(degree, float(finite_x.min()), float(finite_x.max()))
+    fit_func, r_squared, residual_rms, rank = fitter.update(x, y).solve()
+    coeffs = fit_func.convert(kind=Polynomial).coef
+    # Trailing zero coefficients are dropped by convert; polyfit keeps them
+    coeffs = np.pad(coeffs, (0, degree + 1 - len(coeffs)))[::-1]
+    return coeffs, fit_func, r_squared, residual_rms, rank
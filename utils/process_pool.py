@@ -0,0 +1,65 @@
+"""
+Shared process pool for CPU bound work (parsing, fitting).
+
+Starting worker processes and importing numpy/pandas in them is expensive,
+especially with the spawn start method used on Windows and in the frozen
+executable, so a single pool is created on first use and reused.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def default_worker_count():
+    """Number of worker processes used when the caller does not specify one"""
+    return max(1, os.cpu_count() or 1)
+
+
+def get_process_pool(workers=None):
+    """
+    Return the shared process pool, (re)creating it when more workers are needed.
+
+    Parameters:
+    -----------
+    workers : int, optional
+        Minimum number of worker processes
+
+    Returns:
+    --------
+    concurrent.futures.ProcessPoolExecutor
+    """
+    global _pool, _pool_workers
+    workers = workers or default_worker_count()
+    with _pool_lock:
+        if _pool is None or _pool_workers < workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            logging.info(f"Starting process pool with {workers} workers")
+            if os.name == 'posix':
+                # Started first so the workers share it: shared memory opened by a
+                # worker is then cleaned up with the parent's, not reported as leaked
+                resource_tracker.ensure_running()
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_process_pool():
+    """Stop the shared pool (called automatically at interpreter exit)"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+            _pool_workers = 0
+
+
+atexit.register(shutdown_process_pool)
@@ -0,0 +1,155 @@
+"""
+Butterworth and bilateral smoothing engines for long signals.
+
+butterworth_filtfilt is a zero-phase low-pass filter in second-order
+sections (numerically stable at high orders, unlike the transfer function
+form), run forward and backward over the signal in chunks that carry the
+filter state, so the result equals scipy's sosfiltfilt without holding
+several padded copies of a long signal in memory.
+
+bilateral_filter weights every sample of a window by its distance from the
+centre sample and by its difference in value, which smooths noise but keeps
+steps. The windows are sliding-window views of the data, evaluated a block
+of samples at a time to bound the temporary arrays.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import butter, sosfilt, sosfilt_zi
+
+# Samples filtered per sosfilt call
+FILTER_CHUNK_SAMPLES = 1024 * 1024
+
+# Window elements evaluated at once by the bilateral filter
+BILATERAL_BLOCK_ELEMENTS = 1024 * 1024
+
+
+@lru_cache(maxsize=32)
+def _butterworth_design(cutoff_freq, filter_order):
+    """Second-order sections of the low-pass and their steady-state initial conditions"""
+    sos = butter(filter_order, cutoff_freq, btype='low', output='sos')
+    return sos, sosfilt_zi(sos)
+
+
+def _edge_padding(sos, n_samples):
+    """Odd-extension length used by sosfiltfilt (limited to the data length, at least 1)"""
+    n_zeros = min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum())
+    return min(3 * (2 * len(sos) + 1 - n_zeros), n_samples - 1)
+
+
+def _filter_chunks(sos, data, out, state, reverse=False):
+    """Run the sections over data into out chunk by chunk (optionally from the end); returns the state"""
+    n = len(data)
+    starts = range(0, n, FILTER_CHUNK_SAMPLES)
+    if reverse:
+        starts = reversed(starts)
+    for start in starts:
+        stop = min(start + FILTER_CHUNK_SAMPLES, n)
+        chunk = data[start:stop]
+        if reverse:
+            filtered, state = sosfilt(sos, chunk[::-1], axis=0, zi=state)
+            out[start:stop] = filtered[::-1]
+        else:
+            out[start:stop], state = sosfilt(sos, chunk, axis=0, zi=state)
+    return state
+
+
+def butterworth_filtfilt(data, cutoff_freq, filter_order=4):
+    """
+    Zero-phase Butterworth low-pass filter.
+
+    Parameters:
+    -----------
+    data : array-like
+        Signal, or 2-D array of signals in columns (filtered along axis 0)
+    cutoff_freq : float
+        Cutoff frequency, normalized to the Nyquist frequency (0-1)
+    filter_order : int
+        Order of the filter; the forward-backward pass doubles the attenuation
+
+    Returns:
+    --------
+    numpy.ndarray : filtered signal, same as scipy.signal.sosfiltfilt
+    """
+    data = np.asarray(data, dtype=np.float64)
+    n = len(data)
+    if n < 2:
+        return data.copy()
+
+    sos, zi = _butterworth_design(float(cutoff_freq), int(filter_order))
+    pad = _edge_padding(sos, n)
+    zi = zi.reshape((len(sos), 2) + (1,) * (data.ndim - 1))
+
+    # Odd extension at both ends, so the filter starts and ends in a steady state
+    head = 2 * data[0] - data[pad:0:-1]
+    tail = 2 * data[-1] - data[-2:-pad - 2:-1]
+
+    # Forward pass: extension, signal, extension
+    result = np.empty_like(data)
+    _, state = sosfilt(sos, head, axis=0, zi=zi * head[0])
+    state = _filter_chunks(sos, data, result, state)
+    tail, state = sosfilt(sos, tail, axis=0, zi=state)
+
+    # Backward pass, starting from the end of the forward-filtered extension
+    _, state = sosfilt(sos, tail[::-1], axis=0, zi=zi * tail[-1])
+    _filter_chunks(sos, result, result, state, reverse=True)
+    return result
+
+
+def bilateral_filter(data, window_length, spatial_sigma=5.0, range_sigma=2.0):
+    """
+    Edge-preserving bilateral smoothing.
+
+    Parameters:
+    -----------
+    data : array-like
+        1-D signal; NaN samples get no weight and stay NaN
+    window_length : int
+        Samples in the window (odd; windows are cut at the ends of the data)
+    spatial_sigma : float
+        Width of the Gaussian weight over the distance in samples
+    range_sigma : float
+        Width of the Gaussian weight over the difference in value (units of data)
+
+    Returns:
+    --------
+    numpy.ndarray : smoothed signal
+    """
+    data = np.asarray(data, dtype=np.float64)
+    n = len(data)
+    half = int(window_length) // 2
+    if n == 0 or half == 0:
+        return data.copy()
+
+    window = 2 * half + 1
+    offsets = np.arange(-half, half + 1)
+    spatial = np.exp(-offsets ** 2 / (2.0 * spatial_sigma ** 2))
+    range_scale = -1.0 / (2.0 * range_sigma ** 2)
+
+    result = np.empty(n)
+    rows = max(1, BILATERAL_BLOCK_ELEMENTS // window)
+    for start in range(0, n, rows):
+        stop = min(start + rows, n)
+        # The block's samples plus half a window on either side, NaN beyond
+        # the ends of the data (no weight)
+        segment = data[max(start - half, 0):min(stop + half, n)]
+        if start < half or stop + half > n:
+            segment = np.concatenate([np.full(max(half - start, 0), np.nan), segment,
+                                      np.full(max(stop + half - n, 0), np.nan)])
+        block = sliding_window_view(segment, window)
+        weights = block - data[start:stop, None]
+        np.square(weights, out=weights)
+        weights *= range_scale
+        np.exp(weights, out=weights)
+        weights *= spatial
+        missing = np.isnan(weights)
+        if missing.any():
+            # NaN neighbours: zero weight and zero contribution
+            weights[missing] = 0.0
+            block = np.where(missing, 0.0, block)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[start:stop] = np.einsum('ij,ij->i', weights, block) / weights.sum(axis=1)
+    result[np.isnan(data)] = np.nan
+    return result
@@ -0,0 +1,147 @@
+"""
+In-memory cache of smoothed curves.
+
+Entries are keyed by the data version (Dataset.version: base data plus the
+selected rows, so a filter or a reload gives new keys), the column and the
+smoothing parameters that matter for the method, normalized the way
+apply_smoothing normalizes them. Toggling a column back on or returning to
+an earlier filter reuses the smoothed curve instead of recomputing it.
+The cache is bounded in bytes and evicts the least recently used curves.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.x_smoothing import X_AWARE_METHODS
+
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+
+# Parameters apply_smoothing reads for each method
+METHOD_PARAMETERS = {
+    'moving_average': ('window_length',),
+    'mean_line': ('window_length',),
+    'savitzky-golay': ('window_length', 'poly_order'),
+    'gaussian_filter': ('sigma',),
+    'exponential_moving_avg': ('alpha',),
+    'median_filter': ('window_length',),
+    'lowess_local_regression': ('lowess_frac',),
+    'butterworth_filter': ('cutoff_freq', 'filter_order'),
+    'bilateral_filter': ('window_length', 'spatial_sigma', 'range_sigma'),
+}
+
+
+def normalized_smoothing_params(smoothing_params, n_samples):
+    """
+    The parameters that determine the smoothed result, as a hashable tuple.
+
+    Settings the method ignores are dropped and the window is made odd and
+    clipped to the data length as apply_smoothing does, so equivalent
+    settings share one cache entry.
+    """
+    method = smoothing_params.get('method', 'moving_average')
+    names = METHOD_PARAMETERS.get(method)
+    if names is None:
+        # Unknown method: apply_smoothing falls back to a moving average
+        names = ('window_length',)
+    if smoothing_params.get('window_in_x', False) and method in X_AWARE_METHODS:
+        # The window is set in X units instead (the key holds the X column)
+        names = ('window_in_x', 'x_window')
+
+    values = []
+    for name in names:
+        value = smoothing_params.get(name)
+        if name == 'window_length' and value is not None:
+            value = int(value)
+            if value >= n_samples:
+                value = n_samples - 1
+            if value % 2 == 0:
+                value -= 1
+            value = max(value, 3)
+        elif isinstance(value, float):
+            value = round(value, 12)
+        values.append((name, value))
+    return (method,) + tuple(values)
+
+
+class SmoothingCache:
+    """
+    Size-bounded LRU cache of smoothed curves (thread-safe).
+
+    Parameters:
+    -----------
+    max_bytes : int
+        Memory budget of the cached arrays
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(version, column, smoothing_params, n_samples):
+        """Cache key of one column smoothed with smoothing_params (None if the data has no version)"""
+        if version is None:
+            return None
+        return version, column, normalized_smoothing_params(smoothing_params, n_samples)
+
+    def get(self, key):
+        """Cached curve (read-only array), or None"""
+        if key is None:
+            return None
+        with self._lock:
+            values = self._entries.get(key)
+            if values is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return values
+
+    def put(self, key, values):
+        """Store a smoothed curve; curves larger than the whole budget are not kept"""
+        if key is None:
+            return values
+        values = np.asarray(values)
+        if values.nbytes > self.max_bytes:
+            return values
+        values.flags.writeable = False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.nbytes
+            self._entries[key] = values
+            self._size += values.nbytes
+            while self._size > self.max_bytes:
+                _, dropped = self._entries.popitem(last=False)
+                self._size -= dropped.nbytes
+        return values
+
+    def invalidate(self, base_id):
+        """Drop all curves computed from one base dataset (after it was closed or reloaded)"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0].split('|', 1)[0] == base_id]:
+                self._size -= self._entries.pop(key).nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def size(self):
+        return self._size
+
+    def stats(self):
+        """Hit/miss counters and memory use"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries),
+                    'bytes': self._size, 'max_bytes': self.max_bytes}
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,90 @@
+"""
+Sort index of a numeric column.
+
+Built once per column of an immutable dataset: a monotonicity check and,
+for unsorted columns, a stable argsort permutation. Range filters then take
+two binary searches instead of comparing every value, and nearest-value
+lookups are correct for any column, not only sorted ones.
+"""
+
+import numpy as np
+
+
+class SortIndex:
+    """
+    Binary-searchable view of one column.
+
+    NaN values never match a range and are never returned as nearest.
+
+    Parameters:
+    -----------
+    values : array-like
+        Column values (numeric)
+    """
+
+    def __init__(self, values):
+        values = np.asarray(values)
+        self.n = len(values)
+        finite = ~np.isnan(values) if values.dtype.kind == 'f' else np.ones(self.n, dtype=bool)
+        self.n_valid = int(np.count_nonzero(finite))
+
+        # Non-decreasing without NaN: the column itself is the sorted order
+        self.monotonic = self.n_valid == self.n and bool(np.all(values[1:] >= values[:-1]))
+        if self.monotonic:
+            self.order = None
+            self.sorted_values = values
+        else:
+            # Stable argsort puts NaN last, the first n_valid entries are the finite values
+            self.order = np.argsort(values, kind='stable')
+            self.sorted_values = values[self.order[:self.n_valid]]
+
+    def _bounds(self, min_val, max_val):
+        lo = 0 if min_val is None else int(np.searchsorted(self.sorted_values, min_val, side='left'))
+        hi = self.n_valid if max_val is None else int(np.searchsorted(self.sorted_values, max_val, side='right'))
+        return lo, max(lo, hi)
+
+    def range_slice(self, min_val=None, max_val=None):
+        """
+        Rows with min_val <= value <= max_val as a slice (monotonic columns only).
+
+        Returns:
+        --------
+        slice
+        """
+        if not self.monotonic:
+            raise ValueError("range_slice requires a monotonic column")
+        lo, hi = self._bounds(min_val, max_val)
+        return slice(lo, hi)
+
+    def range_positions(self, min_val=None, max_val=None):
+        """
+        Row positions with min_val <= value <= max_val, in row order.
+
+        O(log n) for monotonic columns (plus the size of the result), otherwise
+        O(log n + k log k) for k matching rows.
+
+        Returns:
+        --------
+        numpy.ndarray of int64
+        """
+        lo, hi = self._bounds(min_val, max_val)
+        if self.monotonic:
+            return np.arange(lo, hi, dtype=np.int64)
+        return np.sort(self.order[lo:hi]).astype(np.int64, copy=False)
+
+    def nearest(self, value):
+        """
+        Row position of the value closest to value, or -1 if the column has no finite value.
+
+        Ties go to the smaller value, then to the earlier row.
+        """
+        if self.n_valid == 0:
+            return -1
+        i = int(np.searchsorted(self.sorted_values, value, side='left'))
+        if i >= self.n_valid:
+            i = self.n_valid - 1
+        elif i > 0 and abs(self.sorted_values[i - 1] - value) <= abs(self.sorted_values[i] - value):
+            i -= 1
+            # Several rows may hold the same value, return the first of them
+            i = int(np.searchsorted(self.sorted_values, self.sorted_values[i], side='left'))
+        return i if self.monotonic else int(self.order[i])
@@ -0,0 +1,492 @@
+"""
+Lazy, multi-rate access to TDMS files.
+
+Opening a TDMS file only reads its metadata (groups, channel names, lengths,
+data types and waveform properties). Channel data is streamed from disk the
+first time a column is plotted, filtered or summarized and kept in an LRU
+cache bounded by a memory budget, so files with hundreds of channels and
+several GB of data can be opened without loading them.
+
+Channels are kept at their native length. Each one has its own time base
+from the TDMS waveform properties wf_start_offset / wf_increment (sample
+index if they are missing). Channels are only aligned when two of them are
+combined: LazyTdmsFrame exposes a DataFrame-like view on the time grid of
+the longest channel, and channel_xy() returns a channel against its own time
+or against another channel resampled onto its samples. Columns of the view
+are resampled only at the rows that are read, and filter conditions are
+evaluated at a channel's native samples (grid_mask).
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from nptdms import TdmsFile
+
+# Decoded channel data kept in memory per file
+DEFAULT_CHANNEL_CACHE_BYTES = 1024 ** 3
+
+# Channel properties kept in the metadata (waveform time base)
+WAVEFORM_PROPERTIES = ('wf_start_offset', 'wf_increment', 'wf_start_time', 'wf_samples', 'unit_string')
+
+# Virtual column holding the time of the frame's row grid
+TIME_COLUMN = 'Time'
+
+
+class TimeBase:
+    """Uniform sampling of a channel: t[i] = start + i * increment"""
+
+    def __init__(self, start, increment, length):
+        self.start = float(start)
+        self.increment = float(increment) if increment else 1.0
+        self.length = int(length)
+
+    def times(self):
+        return self.start + np.arange(self.length) * self.increment
+
+    @property
+    def end(self):
+        return self.start + (self.length - 1) * self.increment
+
+    def nearest_index(self, t):
+        """Nearest sample index for times t, or -1 outside the channel"""
+        index = np.rint((np.asarray(t, dtype=np.float64) - self.start) / self.increment).astype(np.int64)
+        index[(index < 0) | (index >= self.length)] = -1
+        return index
+
+    def __eq__(self, other):
+        return (isinstance(other, TimeBase) and self.start == other.start
+                and self.increment == other.increment and self.length == other.length)
+
+    def __repr__(self):
+        return f"TimeBase(start={self.start}, increment={self.increment}, length={self.length})"
+
+
+class TdmsChannelInfo:
+    """Metadata of one TDMS channel, available without reading its data"""
+
+    def __init__(self, group, channel, length, dtype, properties):
+        self.group = group
+        self.channel = channel
+        self.name = f"{group}/{channel}"
+        self.length = length
+        self.dtype = dtype
+        self.properties = properties
+        self.time_base = TimeBase(properties.get('wf_start_offset', 0.0),
+                                  properties.get('wf_increment', 1.0), length)
+
+    @property
+    def is_numeric(self):
+        return self.dtype.kind in 'biuf'
+
+    def __repr__(self):
+        return f"TdmsChannelInfo({self.name!r}, length={self.length}, dtype={self.dtype})"
+
+
+def align_to_times(info, data, times):
+    """
+    Resample channel data onto arbitrary times.
+
+    Numeric channels are linearly interpolated, other channels take the
+    nearest sample. Times outside the channel are NaN (None/NaT).
+    """
+    if info.is_numeric:
+        return np.interp(times, info.time_base.times(), data.astype(np.float64, copy=False),
+                         left=np.nan, right=np.nan)
+
+    index = info.time_base.nearest_index(times)
+    if len(data) == 0:
+        return np.full(len(times), None, dtype=object)
+    result = data[np.maximum(index, 0)]
+    if data.dtype.kind in 'mM':
+        result[index < 0] = np.array('NaT', dtype=data.dtype)
+    else:
+        result = result.astype(object)
+        result[index < 0] = None
+    return result
+
+
+class LazyTdmsFile:
+    """
+    An open TDMS file whose channels are decoded on demand at native length.
+
+    Parameters:
+    -----------
+    file_name : str
+        Path to the TDMS file
+    cache_bytes : int
+        Memory budget for decoded channels; least recently used channels are
+        dropped when it is exceeded
+    """
+
+    def __init__(self, file_name, cache_bytes=DEFAULT_CHANNEL_CACHE_BYTES):
+        self.file_name = file_name
+        self.cache_bytes = cache_bytes
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()
+        self._cache_size = 0
+        self.touched = []
+
+        stat = os.stat(file_name)
+        self.file_key = f"{os.path.abspath(file_name)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+        # Streaming mode: only the segment metadata is read here
+        self._tdms = TdmsFile.open(file_name)
+        self.channels = OrderedDict()
+        for group in self._tdms.groups():
+            for channel in group.channels():
+                properties = {key: channel.properties[key] for key in WAVEFORM_PROPERTIES
+                              if key in channel.properties}
+                info = TdmsChannelInfo(group.name, channel.name, len(channel),
+                                       self._channel_dtype(channel), properties)
+                self.channels[info.name] = info
+
+        self.has_time_base = any('wf_increment' in info.properties for info in self.channels.values())
+
+        # Row grid of the frame: time base of the longest channel
+        longest = max(self.channels.values(), key=lambda info: info.length, default=None)
+        self.grid = longest.time_base if longest else TimeBase(0.0, 1.0, 0)
+        self.n_rows = self.grid.length
+
+        rates = {info.time_base.increment for info in self.channels.values()}
+        logging.info(f"Opened {os.path.basename(file_name)} lazily: "
+                     f"{len(self.channels)} channels, {self.n_rows} rows, {len(rates)} sample rate(s)")
+
+    @staticmethod
+    def _channel_dtype(channel):
+        try:
+            return np.dtype(channel.dtype)
+        except TypeError:
+            # Strings and timestamps have no plain numpy dtype
+            return np.dtype(object)
+
+    def read_channel(self, name):
+        """
+        Return the native samples of a channel (ValueError once the file is closed).
+
+        Parameters:
+        -----------
+        name : str
+            Channel name as "group/channel"
+
+        Returns:
+        --------
+        numpy.ndarray (read-only, shared with the cache)
+        """
+        with self._lock:
+            # A reader may still hold a dataset that was replaced and closed
+            if self._tdms is None:
+                raise ValueError("TDMS file is closed")
+            data = self._cache.get(name)
+            if data is not None:
+                self._cache.move_to_end(name)
+                return data
+
+            info = self.channels[name]
+            data = np.asarray(self._tdms[info.group][info.channel][:])
+            data.flags.writeable = False
+
+            self._cache[name] = data
+            self._cache_size += data.nbytes
+            if name not in self.touched:
+                self.touched.append(name)
+            self._evict(keep=name)
+            return data
+
+    def _evict(self, keep):
+        while self._cache_size > self.cache_bytes and len(self._cache) > 1:
+            name, data = next(iter(self._cache.items()))
+            if name == keep:
+                break
+            del self._cache[name]
+            self._cache_size -= data.nbytes
+            logging.debug(f"Dropped TDMS channel {name} from memory ({data.nbytes / 1e6:.1f} MB)")
+
+    def read_aligned(self, name, times):
+        """Read a channel resampled onto the given times (ValueError once the file is closed)"""
+        return align_to_times(self.channels[name], self.read_channel(name), times)
+
+    def close(self):
+        with self._lock:
+            self._cache.clear()
+            self._cache_size = 0
+            if self._tdms is not None:
+                self._tdms.close()
+                self._tdms = None
+
+
+class LazyTdmsFrame:
+    """
+    DataFrame-like view of a LazyTdmsFile with an optional row selection.
+
+    Rows are the samples of the longest channel; other channels are resampled
+    onto the selected rows when accessed as columns. Copies and row
+    selections share the underlying file and channel cache.
+    """
+
+    def __init__(self, source, rows=None):
+        self._source = source
+        # None means all rows, otherwise a sorted integer array of grid positions
+        self._rows = rows
+        names = list(source.channels.keys())
+        if source.has_time_base and TIME_COLUMN not in source.channels:
+            names.insert(0, TIME_COLUMN)
+        self.columns = pd.Index(names)
+
+    @property
+    def source(self):
+        return self._source
+
+    @property
+    def index(self):
+        if self._rows is None:
+            return pd.RangeIndex(self._source.n_rows)
+        return pd.Index(self._rows)
+
+    @property
+    def shape(self):
+        return len(self), len(self.columns)
+
+    @property
+    def empty(self):
+        return len(self) == 0 or len(self.columns) == 0
+
+    def __len__(self):
+        return self._source.n_rows if self._rows is None else len(self._rows)
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    def is_multi_rate(self):
+        """True if channels have different time bases, so each should be plotted on its own X"""
+        grid = self._source.grid
+        return any(info.time_base != grid for info in self._source.channels.values())
+
+    def _positions(self, rows=None):
+        """Grid positions of rows (relative to this view; None = all of its rows)"""
+        if rows is None:
+            return self._rows
+        return rows if self._rows is None else self._rows[rows]
+
+    def _grid_times(self, positions):
+        grid = self._source.grid
+        if positions is None:
+            return grid.times()
+        if isinstance(positions, slice):
+            positions = np.arange(*positions.indices(grid.length))
+        return grid.start + positions * grid.increment
+
+    def is_resampled(self, column):
+        """True if a column is interpolated onto the row grid (its channel has another time base)"""
+        info = self._source.channels.get(column)
+        return info is not None and info.time_base != self._source.grid
+
+    def column_values(self, column, rows=None):
+        """
+        Values of a column at the selected grid rows.
+
+        Parameters:
+        -----------
+        column : str
+            Column name
+        rows : slice or numpy.ndarray, optional
+            Positions within the rows of this view (None = all of them);
+            channels at another rate are resampled at these rows only
+
+        Returns:
+        --------
+        numpy.ndarray : A view of the cached channel for channels on the
+        grid and slices of rows, otherwise a new array
+        """
+        positions = self._positions(rows)
+        if column == TIME_COLUMN and column not in self._source.channels:
+            return self._grid_times(positions)
+        if not self.is_resampled(column):
+            data = self._source.read_channel(column)
+            return data if positions is None else data[positions]
+        return self._source.read_aligned(column, self._grid_times(positions))
+
+    def grid_mask(self, column, condition):
+        """
+        Evaluate a condition on a column's native samples and spread it over
+        all grid rows, instead of resampling the column onto the grid.
+
+        Each row takes the result of the channel sample nearest in time;
+        rows outside the channel take the result of the condition on NaN.
+
+        Parameters:
+        -----------
+        column : str
+            Column name
+        condition : callable
+            Maps an array of values to a boolean array of the same length
+
+        Returns:
+        --------
+        numpy.ndarray of bool, one entry per grid row
+        """
+        if column == TIME_COLUMN and column not in self._source.channels:
+            return condition(self._grid_times(None))
+        if not self.is_resampled(column):
+            return condition(self._source.read_channel(column))
+
+        info = self._source.channels[column]
+        grid = self._source.grid
+        native = condition(self._source.read_channel(column))
+        outside = bool(condition(np.array([np.nan]))[0])
+        # First grid row nearest to each sample (and the end of the last one),
+        # rounded exactly like TimeBase.nearest_index
+        base = info.time_base
+        samples = np.arange(base.length + 1)
+        first = np.ceil((base.start + (samples - 0.5) * base.increment - grid.start) / grid.increment)
+
+        def nearest(rows):
+            return np.rint((grid.start + rows * grid.increment - base.start) / base.increment)
+
+        first += nearest(first) < samples
+        first -= nearest(first - 1) >= samples
+        first = np.clip(first, 0, grid.length).astype(np.int64)
+        counts = np.concatenate([[first[0]], np.diff(first), [grid.length - first[-1]]])
+        return np.repeat(np.concatenate([[outside], native, [outside]]), counts)
+
+    def _channel_selection(self, column):
+        """Boolean mask of a channel's native samples that fall on selected grid rows"""
+        info = self._source.channels[column]
+        if self._rows is None:
+            return None
+        selected = np.zeros(self._source.n_rows, dtype=bool)
+        selected[self._rows] = True
+        if info.time_base == self._source.grid:
+            return selected
+        grid_index = self._source.grid.nearest_index(info.time_base.times())
+        return (grid_index >= 0) & selected[np.maximum(grid_index, 0)]
+
+    def channel_xy(self, x_column, y_column):
+        """
+        X and Y samples of a channel at its native rate.
+
+        Against the time column a channel is returned with its own time base.
+        Against another channel, the Y channel is resampled onto the X
+        channel's samples (the only place two rates are combined).
+
+        Returns:
+        --------
+        (numpy.ndarray, numpy.ndarray)
+        """
+        channels = self._source.channels
+        if y_column not in channels:
+            return self[x_column].values, self[y_column].values
+
+        if x_column == TIME_COLUMN and x_column not in channels:
+            info = channels[y_column]
+            x_data = info.time_base.times()
+            y_data = self._source.read_channel(y_column)
+            selection = self._channel_selection(y_column)
+        elif x_column in channels:
+            info = channels[x_column]
+            x_data = self._source.read_channel(x_column)
+            if channels[y_column].time_base == info.time_base:
+                y_data = self._source.read_channel(y_column)
+            else:
+                y_data = self._source.read_aligned(y_column, info.time_base.times())
+            selection = self._channel_selection(x_column)
+        else:
+            return self[x_column].values, self[y_column].values
+
+        if selection is not None:
+            x_data, y_data = x_data[selection], y_data[selection]
+        return x_data, y_data
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self.columns:
+                raise KeyError(key)
+            return pd.Series(self.column_values(key), index=self.index, name=key, copy=False)
+
+        if isinstance(key, (list, pd.Index)) and all(isinstance(k, str) for k in key):
+            return pd.DataFrame({k: self.column_values(k) for k in key}, index=self.index)
+
+        # Boolean row selection relative to the current rows
+        mask = np.asarray(key, dtype=bool)
+        if len(mask) != len(self):
+            raise ValueError(f"Boolean mask of length {len(mask)} does not match {len(self)} rows")
+        rows = np.flatnonzero(mask) if self._rows is None else self._rows[mask]
+        return LazyTdmsFrame(self._source, rows)
+
+    def take(self, rows):
+        """View of the given grid row positions (sorted integer array)"""
+        rows = np.asarray(rows, dtype=np.int64)
+        return LazyTdmsFrame(self._source, rows if self._rows is None else self._rows[rows])
+
+    def copy(self, deep=True):
+        """Return a new view of the same rows (channel data is shared and read-only)"""
+        return LazyTdmsFrame(self._source, self._rows)
+
+    @property
+    def loaded_columns(self):
+        """Columns that have been accessed at least once, in access order"""
+        return [name for name in self._source.touched if name in self._source.channels]
+
+    def fingerprint(self):
+        """Cheap identity of the rows and loaded columns, used to skip redundant statistics"""
+        digest = hashlib.md5(self._source.file_key.encode('utf-8'))
+        digest.update('|'.join(self.loaded_columns).encode('utf-8'))
+        if self._rows is not None:
+            digest.update(self._rows.tobytes())
+        return digest.hexdigest()
+
+    def describe(self, columns=None):
+        """
+        Summary statistics like DataFrame.describe(), over native samples.
+
+        Only the channels that have already been plotted or filtered are
+        summarized unless columns are given, so no channel is read just for
+        the statistics table.
+        """
+        columns = self.loaded_columns if columns is None else list(columns)
+        stats = {}
+        for name in columns:
+            if name not in self._source.channels or not self._source.channels[name].is_numeric:
+                continue
+            data = self._source.read_channel(name)
+            selection = self._channel_selection(name)
+            if selection is not None:
+                data = data[selection]
+            stats[name] = pd.Series(data).describe()
+        return pd.DataFrame(stats)
+
+    def to_dataframe(self):
+        """Read every channel, aligned to the row grid, into a regular DataFrame"""
+        return pd.DataFrame({name: self.column_values(name) for name in self.columns}, index=self.index)
+
+    def to_csv(self, *args, **kwargs):
+        return self.to_dataframe().to_csv(*args, **kwargs)
+
+    def to_excel(self, *args, **kwargs):
+        return self.to_dataframe().to_excel(*args, **kwargs)
+
+    def close(self):
+        self._source.close()
+
+    def __reduce__(self):
+        # Sessions store the data itself, not the open file
+        return pd.DataFrame, (self.to_dataframe(),)
+
+    def __repr__(self):
+        return (f"LazyTdmsFrame({os.path.basename(self._source.file_name)!r}, "
+                f"{len(self)} rows x {len(self.columns)} channels)")
+
+
+def open_tdms_lazy(file_name, cache_bytes=DEFAULT_CHANNEL_CACHE_BYTES):
+    """
+    Open a TDMS file without reading channel data.
+
+    Returns:
+    --------
+    LazyTdmsFrame
+    """
+    return LazyTdmsFrame(LazyTdmsFile(file_name, cache_bytes))
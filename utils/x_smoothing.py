@@ -0,0 +1,210 @@
+"""
+Smoothing with windows measured in X units (e.g. seconds).
+
+Loggers that record bursts at a high rate followed by slow idle periods
+produce data whose sample spacing varies by orders of magnitude, and a
+window of a fixed number of samples then covers milliseconds in one place
+and minutes in another. Here the window of every sample is the samples
+within a distance in X instead:
+
+- x_rolling_mean: mean of the samples within width / 2 on either side,
+  from cumulative sums, O(n) after the window bounds are found.
+- x_rolling_median: median of the same windows.
+- x_gaussian_filter: Gaussian weights over the real X distances.
+
+The window bounds of all samples come from one vectorized binary search of
+the sorted X values, so no resampling onto a dense grid is needed. NaN
+samples get no weight and stay NaN, like the sample-based smoothers.
+"""
+
+import numpy as np
+
+# Methods that can use windows in X units
+X_AWARE_METHODS = ('moving_average', 'mean_line', 'median_filter', 'gaussian_filter')
+
+# Gaussian weights beyond this many sigma are ignored
+GAUSSIAN_TRUNCATE = 4.0
+
+# Window elements gathered at once by the median and the Gaussian
+GATHER_BLOCK_ELEMENTS = 1024 * 1024
+
+
+def x_window_bounds(x, half_width):
+    """
+    Sample range [lo, hi) within half_width of each sample (x sorted ascending).
+    """
+    lo = np.searchsorted(x, x - half_width, side='left')
+    hi = np.searchsorted(x, x + half_width, side='right')
+    return lo, hi
+
+
+def _gather_blocks(lo, hi):
+    """
+    Sample indices in blocks of windows of similar length (so little is
+    wasted padding them to the longest one), each holding about
+    GATHER_BLOCK_ELEMENTS values. Yields (rows, longest window).
+    """
+    lengths = hi - lo
+    order = np.argsort(lengths, kind='stable')
+    start = 0
+    while start < len(order):
+        # Ascending lengths: the block's longest window is its last one
+        candidates = lengths[order[start:start + GATHER_BLOCK_ELEMENTS]]
+        fits = np.arange(1, len(candidates) + 1) * np.maximum(candidates, 1) <= GATHER_BLOCK_ELEMENTS
+        rows = max(1, int(np.argmin(fits)) if not fits.all() else len(fits))
+        yield order[start:start + rows], int(candidates[rows - 1])
+        start += rows
+
+
+def _gather(values, lo, rows, width):
+    """(rows, width) windows starting at lo[rows]; positions beyond the data repeat the last value"""
+    index = lo[rows, None] + np.arange(width)
+    return values[np.minimum(index, len(values) - 1)], index
+
+
+def x_rolling_mean(x, y, width):
+    """
+    Mean of the samples within width / 2 of each sample in X.
+
+    Parameters:
+    -----------
+    x : numpy.ndarray
+        Sample positions, sorted ascending
+    y : numpy.ndarray
+        Values (NaN samples are skipped)
+    width : float
+        Window width in X units
+
+    Returns:
+    --------
+    numpy.ndarray : smoothed values, NaN where y is NaN
+    """
+    valid = np.isfinite(y)
+    # Centering keeps the cumulative sums accurate on long signals with an offset
+    offset = float(np.mean(y[valid])) if valid.any() else 0.0
+    sums = np.concatenate([[0.0], np.cumsum(np.where(valid, y - offset, 0.0))])
+    counts = np.concatenate([[0], np.cumsum(valid)])
+
+    lo, hi = x_window_bounds(x, width / 2.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        smoothed = (sums[hi] - sums[lo]) / (counts[hi] - counts[lo]) + offset
+    smoothed[~valid] = np.nan
+    return smoothed
+
+
+def x_rolling_median(x, y, width):
+    """
+    Median of the samples within width / 2 of each sample in X.
+
+    Parameters and result as for x_rolling_mean.
+    """
+    valid = np.isfinite(y)
+    lo, hi = x_window_bounds(x, width / 2.0)
+    smoothed = np.full(len(y), np.nan)
+    for rows, longest in _gather_blocks(lo, hi):
+        windows, index = _gather(y, lo, rows, longest)
+        windows[index >= hi[rows, None]] = np.nan
+        # NaN sorts last, so the median sits in the first `count` values
+        windows.sort(axis=1)
+        count = np.isfinite(windows).sum(axis=1)
+        block = np.arange(len(rows))
+        lower = windows[block, np.maximum(count - 1, 0) // 2]
+        upper = windows[block, np.minimum(count // 2, longest - 1)]
+        smoothed[rows] = np.where(count > 0, (lower + upper) / 2.0, np.nan)
+    smoothed[~valid] = np.nan
+    return smoothed
+
+
+def x_gaussian_filter(x, y, sigma):
+    """
+    Gaussian-weighted mean over the real X distance of the samples.
+
+    Parameters:
+    -----------
+    x : numpy.ndarray
+        Sample positions, sorted ascending
+    y : numpy.ndarray
+        Values (NaN samples are skipped)
+    sigma : float
+        Standard deviation of the Gaussian in X units; samples further away
+        than GAUSSIAN_TRUNCATE sigma are ignored
+
+    Returns:
+    --------
+    numpy.ndarray : smoothed values, NaN where y is NaN
+    """
+    valid = np.isfinite(y)
+    lo, hi = x_window_bounds(x, GAUSSIAN_TRUNCATE * sigma)
+    smoothed = np.full(len(y), np.nan)
+    for rows, longest in _gather_blocks(lo, hi):
+        windows, index = _gather(y, lo, rows, longest)
+        distance, _ = _gather(x, lo, rows, longest)
+        distance -= x[rows, None]
+        distance /= sigma
+        np.square(distance, out=distance)
+        distance *= -0.5
+        weights = np.exp(distance, out=distance)
+        missing = np.isnan(windows) | (index >= hi[rows, None])
+        weights[missing] = 0.0
+        windows[missing] = 0.0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            smoothed[rows] = np.einsum('ij,ij->i', weights, windows) / weights.sum(axis=1)
+    smoothed[~valid] = np.nan
+    return smoothed
+
+
+def apply_x_smoothing(x, y, method, x_window):
+    """
+    Smooth y with a window of x_window X units.
+
+    Parameters:
+    -----------
+    x : array-like
+        X values of the samples (any order; NaN X gives NaN)
+    y : array-like
+        Values, or a 2-D array of columns sharing x
+    method : str
+        One of X_AWARE_METHODS
+    x_window : float
+        Window width in X units; the Gaussian uses sigma = x_window / 4, so
+        the window holds about 95% of its weight
+
+    Returns:
+    --------
+    numpy.ndarray : smoothed values in the order of y
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) != len(y):
+        raise ValueError("x and y must have the same length")
+    if not x_window > 0:
+        raise ValueError("The X window must be positive")
+
+    if method in ('moving_average', 'mean_line'):
+        smooth = x_rolling_mean
+        width = x_window
+    elif method == 'median_filter':
+        smooth = x_rolling_median
+        width = x_window
+    elif method == 'gaussian_filter':
+        smooth = x_gaussian_filter
+        width = x_window / 4.0
+    else:
+        raise ValueError(f"Method {method} has no X window")
+
+    # Sort once by X (shared by all columns); NaN X samples are left out
+    known = np.isfinite(x)
+    order = None
+    if not known.all() or not np.all(x[1:] >= x[:-1]):
+        order = np.flatnonzero(known)
+        order = order[np.argsort(x[order], kind='stable')]
+    xs = x if order is None else x[order]
+
+    columns = y.reshape(len(y), -1)
+    result = np.full(columns.shape, np.nan)
+    for i in range(columns.shape[1]):
+        if order is None:
+            result[:, i] = smooth(xs, columns[:, i], width)
+        else:
+            result[order, i] = smooth(xs, columns[order, i], width)
+    return result.reshape(y.shape)